@@ -142,7 +142,9 @@ generate_email_report() {
 $(python3 scripts/scrape_wee.py 2>&1 | grep -E "(✅|❌|📊|💰)" || echo "No results found")
 
 📈 DATA SUMMARY:
-$(if [ -f "data/processed/wee_prices.csv" ]; then
+$(if [ -d "data/processed/prices" ]; then
+    python3 scripts/price_store.py summary 2>/dev/null || echo "Could not read the Parquet price store"
+elif [ -f "data/processed/wee_prices.csv" ]; then
     echo "CSV file size: $(ls -lh data/processed/wee_prices.csv | awk '{print $5}')"
     echo "Total records: $(wc -l < data/processed/wee_prices.csv)"
     echo "Latest products found:"
@@ -168,6 +170,9 @@ except Exception as e:
     print(f'  Firebase not available: {str(e)[:50]}...')
 " 2>/dev/null || echo "  Firebase integration not available")
 
+🗄️ LOCAL PRICE STORE:
+$(python3 scripts/sqlite_store.py 2>/dev/null || echo "  SQLite price store not available")
+
 📋 TRACKED PRODUCTS:
 $(python3 -c "
 import json
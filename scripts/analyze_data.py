@@ -2,16 +2,22 @@
 
 import pandas as pd
 import os
+import sys
 
-def analyze_scraped_data():
-    csv_file = "data/processed/wee_prices.csv"
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from price_parsing import parse_price_series
+from price_store import load_price_frame
+
+def analyze_scraped_data(days=None):
+    """Summarize stored prices, all of them or only the last `days` days"""
+    df = load_price_frame(days=days, expand=True)
     
-    if not os.path.exists(csv_file):
-        print(f"❌ CSV file not found: {csv_file}")
+    if df is None:
+        print("❌ No price data found (data/processed/prices or data/processed/wee_prices.csv)")
         return
     
-    df = pd.read_csv(csv_file)
-    
     print("📊 Weee! Price Tracker - Data Analysis")
     print("=" * 50)
     print(f"Total records: {len(df)}")
@@ -32,7 +38,7 @@ def analyze_scraped_data():
     print("💰 Price Analysis:")
     print("-" * 30)
     # Extract numeric prices for analysis
-    df['Price_Numeric'] = df['Price'].str.replace('$', '').str.replace(',', '').astype(float, errors='ignore')
+    df['Price_Numeric'] = parse_price_series(df['Price'])
     numeric_prices = df['Price_Numeric'].dropna()
     
     if len(numeric_prices) > 0:
@@ -47,4 +53,5 @@ def analyze_scraped_data():
     print(f"Total value of products: ${latest_scrape['Price_Numeric'].sum():.2f}")
 
 if __name__ == "__main__":
-    analyze_scraped_data()
+    # python scripts/analyze_data.py [days]
+    analyze_scraped_data(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# scripts/backfill_product_aggregates.py
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from firebase_manager import FirebaseManager
+
+def main():
+    """Fill in latestPrice, min/max and observation counts on products from their price history"""
+    dry_run = '--dry-run' in sys.argv
+    print("📊 Backfilling product price aggregates" + (" (dry run)" if dry_run else ""))
+    print("=" * 50)
+
+    try:
+        firebase = FirebaseManager()
+    except Exception as e:
+        print(f"❌ Firebase connection failed: {e}")
+        return False
+
+    updated = firebase.backfill_product_aggregates(dry_run=dry_run)
+    if dry_run:
+        print(f"📋 {updated} products would be updated")
+    else:
+        print(f"✅ Updated aggregates of {updated} products")
+    return True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# scripts/benchmark_extraction.py - Compare card extraction strategies on recorded pages
+
+import os
+import sys
+import time
+import gzip
+import random
+from bs4 import BeautifulSoup
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from extraction_engine import CONTAINER_SELECTORS, CardExtractor, CascadeExtractor
+from snapshot_archive import SNAPSHOT_DIR, load_manifest, snapshot_path
+
+SAMPLE_NAMES = [
+    "Maggi Masala Instant Noodles 9.8 oz",
+    "Laxmi Toor Dal Split Pigeon Peas 4 lb",
+    "Lee Kum Kee Supreme Soy Sauce 500 ml",
+    "Yoshinoya Beef Bowl Frozen 170 g",
+    "Deep Paneer Paratha Frozen 4 pcs 13 oz",
+    "Nissin Cup Noodles Shrimp 2.25 oz",
+    "Amul Ghee Clarified Butter 1 L"
+]
+
+def sample_page(cards=200, seed=42):
+    """Build a listing page shaped like the sale page, for when no snapshots exist"""
+    rng = random.Random(seed)
+    parts = ["<html><body><header class='site-header'><nav class='menu-item'>Deals</nav></header><main>"]
+    for i in range(cards):
+        parts.append(
+            f'<div data-testid="wid-product-card-container" class="product-card-wrapper">'
+            f'<a href="/en/product/{i}"><div class="image-box"><img src="/img/{i}.jpg"></div></a>'
+            f'<div class="card-body"><div class="tag-row"><span class="badge">Sale</span></div>'
+            f'<div data-role="product-name" class="name-line">{rng.choice(SAMPLE_NAMES)}</div>'
+            f'<div data-testid="wid-product-card-price" class="price-row">'
+            f'<span>${rng.randint(1, 30)}.{rng.randint(10, 99)}</span>'
+            f'<del>${rng.randint(31, 40)}.99</del></div>'
+            f'<div data-role="product-unit-price">${rng.randint(1, 9)}.{rng.randint(10, 99)}/lb</div>'
+            f'<button class="add-to-cart">Add</button></div></div>'
+        )
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+def load_recorded_pages(snapshot_dir=SNAPSHOT_DIR):
+    """Read each distinct archived page body once"""
+    pages = {}
+    for entry in load_manifest(snapshot_dir):
+        content_hash = entry['content_hash']
+        path = snapshot_path(content_hash, snapshot_dir)
+        if content_hash in pages or not os.path.exists(path):
+            continue
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            pages[content_hash] = (entry['url'], f.read())
+    return list(pages.values())
+
+def find_cards(soup):
+    """Select product cards the same way parse_product_data does"""
+    for selector in CONTAINER_SELECTORS:
+        items = soup.select(selector)
+        if items:
+            return selector, items
+    return None, []
+
+def time_extractor(extractor, items, url, repeat):
+    """Best wall time over several runs, plus the extracted fields"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [extractor.extract(item, url) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+def benchmark(pages, repeat=5):
+    """Time the select_one cascade against the single-pass extractor"""
+    cascade, single_pass = CascadeExtractor(), CardExtractor()
+    total_cascade = total_single = 0.0
+    mismatches = 0
+
+    print(f"{'Page':<50} {'Cards':>6} {'Cascade ms':>11} {'Single ms':>10} {'Speedup':>8}")
+    print("-" * 89)
+
+    for url, html in pages:
+        soup = BeautifulSoup(html, "html.parser")
+        selector, items = find_cards(soup)
+        if not items:
+            print(f"{url[:50]:<50} {'0':>6}  (no product cards)")
+            continue
+
+        cascade_time, cascade_results = time_extractor(cascade, items, url, repeat)
+        single_time, single_results = time_extractor(single_pass, items, url, repeat)
+        mismatches += sum(1 for a, b in zip(cascade_results, single_results) if a != b)
+        total_cascade += cascade_time
+        total_single += single_time
+
+        speedup = cascade_time / single_time if single_time else float('inf')
+        print(f"{url[:50]:<50} {len(items):>6} {cascade_time * 1000:>11.2f} {single_time * 1000:>10.2f} {speedup:>7.1f}x")
+
+    print("-" * 89)
+    if total_single:
+        print(f"⏱️ Total: cascade {total_cascade * 1000:.2f} ms, single pass {total_single * 1000:.2f} ms "
+              f"({total_cascade / total_single:.1f}x faster)")
+    if mismatches:
+        print(f"❌ {mismatches} cards extracted differently")
+    else:
+        print("✅ Both extractors produced identical fields for every card")
+    return mismatches == 0
+
+def main():
+    """Main benchmark function"""
+    snapshot_dir = sys.argv[1] if len(sys.argv) > 1 else SNAPSHOT_DIR
+
+    print("🏁 Card Extraction Benchmark")
+    print("=" * 40)
+
+    pages = load_recorded_pages(snapshot_dir)
+    if pages:
+        print(f"📄 Using {len(pages)} recorded pages from {snapshot_dir}\n")
+    else:
+        print(f"⚠️ No recorded pages in {snapshot_dir}, using a generated sample page\n")
+        pages = [("sample://sale", sample_page())]
+
+    success = benchmark(pages)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/canonical.py
+
+import re
+import unicodedata
+
+# Canonical unit -> spellings seen in product names and unit strings
+UNIT_ALIASES = {
+    'fl oz': r'fl\.?\s*oz|fluid\s+ounces?',
+    'lb': r'lbs?|pounds?',
+    'oz': r'oz|ounces?',
+    'kg': r'kgs?|kilos?|kilograms?',
+    'g': r'g|gms?|gr|grams?',
+    'ml': r'ml|millilit(?:er|re)s?',
+    'l': r'l|ltrs?|lit(?:er|re)s?',
+    'gal': r'gals?|gallons?',
+    'qt': r'qts?|quarts?',
+    'ct': r'ct|count|pcs?|pieces?|pk|packs?',
+}
+UNITS = list(UNIT_ALIASES)
+
+NUMBER = r'(?:\d[\d,]*(?:\.\d+)?|\.\d+)'
+
+# A quantity or range followed by a unit: "2lb", "0.9 - 1.1 lb", "500 Grams", "4 pcs"
+SIZE_PATTERN = re.compile(
+    rf'(?<![\w.])({NUMBER})(?:\s*(?:-|–|to)\s*({NUMBER}))?\s*'
+    + '(?:' + '|'.join(f'(?P<u{i}>{UNIT_ALIASES[unit]})' for i, unit in enumerate(UNITS)) + ')'
+    + r'(?![a-z])',
+    re.IGNORECASE
+)
+NUMBER_PATTERN = re.compile(NUMBER)
+
+def normalize_number(text):
+    """Number without thousands separators or insignificant zeros: '1,000.50' -> '1000.5'"""
+    text = text.replace(',', '')
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    text = text.lstrip('0')
+    return '0' + text if not text or text.startswith('.') else text
+
+def size_unit(match):
+    """Canonical unit of a SIZE_PATTERN match"""
+    return UNITS[int(match.lastgroup[1:])]
+
+def normalize_size(match):
+    low, high = normalize_number(match.group(1)), match.group(2)
+    quantity = f"{low}-{normalize_number(high)}" if high else low
+    return f" {quantity} {size_unit(match)} "
+
+def canonical_product_key(name):
+    """Stable identity of a product name across spelling variants
+
+    Case, full-width characters, punctuation, whitespace and unit spellings
+    are normalized, so "Yoshinoya Beef in Sauce, Frozen 170 g"
+    and "Yoshinoya Beef in Sauce -  Frozen 170 Grams" share one key.
+    Sizes are kept in their own unit; 16 oz and 1 lb stay different keys.
+    """
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKC', str(name)).lower()
+    text = re.sub(r"['’`]", '', text).replace('&', ' and ')
+    text = SIZE_PATTERN.sub(normalize_size, text)
+    text = NUMBER_PATTERN.sub(lambda m: normalize_number(m.group()), text)
+    text = re.sub(r'[^\w\s.-]', ' ', text)
+    # Dots and hyphens only survive inside numbers and ranges
+    text = re.sub(r'(?<!\d)[.-]|[.-](?!\d)', ' ', text)
+    return ' '.join(text.split())
@@ -0,0 +1,151 @@
+# scripts/change_detection.py
+
+import os
+import json
+from datetime import timedelta
+import pandas as pd
+from canonical import canonical_product_key
+
+# Store only price transitions; unchanged products just get their last-seen time bumped
+STORE_CHANGES_ONLY = os.getenv('STORE_CHANGES_ONLY', 'true').lower() == 'true'
+LAST_SEEN_FILE = os.getenv('LAST_SEEN_FILE', 'data/processed/last_seen.json')
+# Spacing of the observations readers rebuild from stored transitions
+OBSERVATION_INTERVAL_HOURS = float(os.getenv('OBSERVATION_INTERVAL_HOURS', '24'))
+
+def load_last_seen(filename=LAST_SEEN_FILE):
+    """Per canonical product key: name, last stored price string, since when and last seen"""
+    if not os.path.exists(filename):
+        return {}
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+class ChangeDetector:
+    """Split a run's products into price transitions and unchanged heartbeats
+
+    Each product is compared against the last price stored for it. Only
+    products whose price string differs (or that were never seen) need a
+    new price record; the rest only move their last-seen time forward,
+    which readers use to extend the last stored price up to now. A new
+    price is only remembered once mark_stored() confirms it was written,
+    so a price whose write failed is a change again on the next run.
+    """
+
+    def __init__(self, filename=LAST_SEEN_FILE):
+        self.filename = filename  # None keeps the state in memory only
+        self.state = load_last_seen(filename) if filename else {}
+
+    def split(self, products):
+        """(changed, unchanged) products; the last-seen time of unchanged ones moves forward"""
+        changed, unchanged = [], []
+        run_prices = {}  # price strings changed earlier in this run
+        for product in products:
+            key = canonical_product_key(product['Product Name'])
+            timestamp = product['Timestamp']
+            state = self.state.get(key)
+            price_str = run_prices.get(key, state and state['price_str'])
+            if price_str == product['Price']:
+                if state is not None and key not in run_prices:
+                    state['last_seen'] = max(state['last_seen'], timestamp)
+                unchanged.append(product)
+                continue
+            run_prices[key] = product['Price']
+            changed.append(product)
+        return changed, unchanged
+
+    def touch(self, products):
+        """Move the last-seen time of known products seen without a price (their page did not change)"""
+        for product in products:
+            state = self.state.get(canonical_product_key(product['Product Name']))
+            if state is not None:
+                state['last_seen'] = max(state['last_seen'], product['Timestamp'])
+
+    def mark_stored(self, products):
+        """Remember the prices of changed products that were written to the stores"""
+        for product in products:
+            self.state[canonical_product_key(product['Product Name'])] = {
+                'name': product['Product Name'],
+                'price_str': product['Price'],
+                'since': product['Timestamp'],
+                'last_seen': product['Timestamp']
+            }
+
+    def save(self):
+        if not self.filename:
+            return
+        os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+        tmp_path = f"{self.filename}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.filename)
+
+def observation_interval():
+    return timedelta(hours=OBSERVATION_INTERVAL_HOURS)
+
+def expand_points(points, last_seen_at=None, interval=None):
+    """Observations rebuilt from run-length encoded price points
+
+    points are dicts with a 'scraped_at' datetime, one per price
+    transition. Each price holds until the next transition, and the last
+    one until last_seen_at. Observations are taken every interval from
+    the first transition, at every transition and at last_seen_at.
+    """
+    if not points:
+        return []
+    interval = interval or observation_interval()
+    points = sorted(points, key=lambda point: point['scraped_at'])
+    first = points[0]['scraped_at']
+    end = max(last_seen_at or first, points[-1]['scraped_at'])
+    times = {point['scraped_at'] for point in points} | {end}
+    at = first
+    while at < end:
+        times.add(at)
+        at += interval
+
+    observations, current = [], 0
+    for at in sorted(times):
+        while current + 1 < len(points) and points[current + 1]['scraped_at'] <= at:
+            current += 1
+        observations.append(dict(points[current], scraped_at=at))
+    return observations
+
+def naive_timestamp(value):
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_convert(None) if timestamp.tzinfo else timestamp
+
+def expand_frame(df, last_seen=None, interval=None):
+    """Price rows expanded from transitions back to regular observations per product
+
+    last_seen maps canonical product keys to the time they were last seen
+    (ISO strings or datetimes); rows of products not in it end at their
+    last transition.
+    """
+    if df is None or df.empty:
+        return df
+    interval = interval or observation_interval()
+    last_seen = last_seen or {}
+    columns = list(df.columns)
+    df = df.copy()
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce', format='ISO8601')
+    df = df[df['Timestamp'].notna()].sort_values('Timestamp', kind='stable')
+    names = df['Product Name'].astype(object)
+    keys = {name: canonical_product_key(name) for name in names.unique()}
+    df['_key'] = names.map(keys)
+
+    pieces = []
+    for key, group in df.groupby('_key', sort=False):
+        group = group.drop_duplicates('Timestamp', keep='last').set_index('Timestamp')
+        end = group.index[-1]
+        if key in last_seen:
+            end = max(end, naive_timestamp(last_seen[key]))
+        grid = pd.date_range(group.index[0], end, freq=interval)
+        index = group.index.union(grid).union(pd.DatetimeIndex([end]))
+        pieces.append(group.reindex(index, method='ffill').rename_axis('Timestamp').reset_index())
+    expanded = pd.concat(pieces, ignore_index=True).sort_values('Timestamp', kind='stable')
+    return expanded[columns].reset_index(drop=True)
+
+def last_seen_times(filename=LAST_SEEN_FILE):
+    """Canonical product key -> last seen time, from the heartbeat file"""
+    return {key: state['last_seen'] for key, state in load_last_seen(filename).items()}
@@ -0,0 +1,122 @@
+# scripts/crawler.py
+
+import asyncio
+import hashlib
+import os
+import re
+from collections import defaultdict
+from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
+
+CRAWL_CONCURRENCY_PER_HOST = int(os.getenv('CRAWL_CONCURRENCY_PER_HOST', '4'))
+CRAWL_MAX_PAGES = int(os.getenv('CRAWL_MAX_PAGES', '50'))
+CRAWL_PAGE_PARAM = os.getenv('CRAWL_PAGE_PARAM', 'page')
+
+# Listing pages link to their products; a page without any is past the end
+PRODUCT_LINK_MARKER = '/product/'
+
+def page_url(url, page, param=CRAWL_PAGE_PARAM):
+    """Return the URL of a given page of a paginated listing"""
+    parts = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != param]
+    if page > 1:
+        query.append((param, str(page)))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+def discover_page_count(html, param=CRAWL_PAGE_PARAM):
+    """Find the highest page number linked from a listing page"""
+    pattern = re.compile(r'(?:[?&]|&amp;)' + re.escape(param) + r'=(\d+)')
+    numbers = [int(n) for n in pattern.findall(html)]
+    return max(numbers) if numbers else None
+
+def content_hash(html):
+    """Hash page content so repeated pages can be recognised"""
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+def page_exists(page):
+    """A page exists if it was fetched now or is known unchanged from before"""
+    return page['content_hash'] is not None
+
+class CatalogCrawler:
+    """Fetch every page of several category listings concurrently
+
+    fetch is called with a URL and must return a page record with at least
+    'url', 'html' and 'content_hash' keys. 'html' may be None for a page the
+    server reported as unchanged, as long as its previous hash is known.
+    """
+
+    def __init__(self, fetch, concurrency_per_host=CRAWL_CONCURRENCY_PER_HOST,
+                 max_pages=CRAWL_MAX_PAGES, page_param=CRAWL_PAGE_PARAM):
+        self.fetch = fetch
+        self.concurrency_per_host = max(1, concurrency_per_host)
+        self.max_pages = max(1, max_pages)
+        self.page_param = page_param
+        self._semaphores = defaultdict(lambda: asyncio.Semaphore(self.concurrency_per_host))
+
+    async def fetch_page(self, url):
+        """Fetch one page, holding a slot of the host's concurrency limit"""
+        host = urlparse(url).netloc
+        async with self._semaphores[host]:
+            # fetch is a blocking callable, so run it on a worker thread
+            return await asyncio.to_thread(self.fetch, url)
+
+    async def crawl_category(self, url):
+        """Fetch all pages of a single category listing"""
+        first = await self.fetch_page(url)
+        if not page_exists(first):
+            return []
+
+        pages = [first]
+        # An unchanged first page has no body to read pagination links from
+        page_count = discover_page_count(first['html'], self.page_param) if first['html'] else None
+
+        next_page = 2
+        if page_count:
+            # Pagination links show at least this many pages, fetch them all at once
+            page_count = min(page_count, self.max_pages)
+            rest = await asyncio.gather(*[
+                self.fetch_page(page_url(url, n, self.page_param))
+                for n in range(2, page_count + 1)
+            ])
+            found = [page for page in rest if page_exists(page)]
+            pages.extend(found)
+            if len(found) < len(rest):
+                return pages  # a linked page is already missing, so this is the end
+            # Windowed pagination ("1 2 3 … next") only links the first few
+            # pages; keep probing past the highest one linked
+            next_page = page_count + 1
+
+        return await self.probe_pages(url, pages, next_page)
+
+    async def probe_pages(self, url, pages, next_page):
+        """Probe pages from next_page on in batches until one comes back empty,
+        repeats an earlier page, or has no products on it"""
+        seen_hashes = {page['content_hash'] for page in pages}
+        while next_page <= self.max_pages:
+            batch_end = min(next_page + self.concurrency_per_host, self.max_pages + 1)
+            batch = await asyncio.gather(*[
+                self.fetch_page(page_url(url, n, self.page_param))
+                for n in range(next_page, batch_end)
+            ])
+            for page in batch:
+                if not page_exists(page) or page['content_hash'] in seen_hashes:
+                    return pages
+                if page['html'] and PRODUCT_LINK_MARKER not in page['html']:
+                    return pages
+                seen_hashes.add(page['content_hash'])
+                pages.append(page)
+            next_page = batch_end
+
+        return pages
+
+    async def crawl(self, category_urls):
+        """Crawl all categories concurrently and return their pages in order"""
+        unique_urls = list(dict.fromkeys(category_urls))
+        results = await asyncio.gather(*[self.crawl_category(url) for url in unique_urls])
+        return [page for pages in results for page in pages]
+
+def crawl_catalog(category_urls, fetch, **kwargs):
+    """Synchronous entry point: crawl category listings and return fetched pages"""
+    crawler = CatalogCrawler(fetch, **kwargs)
+    pages = asyncio.run(crawler.crawl(category_urls))
+    print(f"🕸️ Crawled {len(pages)} pages from {len(set(category_urls))} categories")
+    return pages
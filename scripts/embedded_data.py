@@ -0,0 +1,163 @@
+# scripts/embedded_data.py
+
+import re
+import json
+from urllib.parse import urljoin
+
+# State blobs storefronts embed in the page, in the order they are trusted
+NEXT_DATA_PATTERN = re.compile(
+    r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+INITIAL_STATE_PATTERN = re.compile(
+    r'window\.(?:__INITIAL_STATE__|__PRELOADED_STATE__|__NUXT__)\s*=\s*', re.S
+)
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]*\btype=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+
+# Keys product objects use for each field, most specific first
+NAME_KEYS = ('product_name', 'productName', 'name', 'title')
+PRICE_KEYS = ('price', 'sale_price', 'salePrice', 'current_price', 'currentPrice', 'final_price')
+UNIT_PRICE_KEYS = ('unit_price', 'unitPrice', 'price_per_unit', 'pricePerUnit', 'unit_price_str')
+UNIT_KEYS = ('unit', 'unit_name', 'unitName', 'price_unit')
+BRAND_KEYS = ('brand', 'brand_name', 'brandName')
+CATEGORY_KEYS = ('category', 'category_name', 'categoryName')
+URL_KEYS = ('url', 'view_link', 'product_url', 'productUrl', 'link', 'href')
+CURRENCY_KEYS = ('priceCurrency', 'currency')
+
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£'}
+
+def find_blobs(html):
+    """Yield (source, decoded JSON) for every state blob in the page, without parsing the DOM"""
+    decoder = json.JSONDecoder()
+
+    for match in NEXT_DATA_PATTERN.finditer(html):
+        try:
+            yield '__NEXT_DATA__', json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+
+    for match in INITIAL_STATE_PATTERN.finditer(html):
+        try:
+            # The assignment is followed by a JS object literal; decode just that value
+            value, _ = decoder.raw_decode(html, match.end())
+            yield 'window state', value
+        except json.JSONDecodeError:
+            continue
+
+    for match in JSON_LD_PATTERN.finditer(html):
+        try:
+            yield 'json-ld', json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+
+def first_value(obj, keys):
+    """The first non-empty value among keys"""
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+def plain_text(value):
+    """Reduce a name-like value (string, {'name': ...} object or list) to a string"""
+    if isinstance(value, dict):
+        value = first_value(value, ('name', 'title', 'label'))
+    elif isinstance(value, list):
+        value = next((plain_text(v) for v in reversed(value) if plain_text(v)), None)
+    if value is None or isinstance(value, (dict, list)):
+        return ""
+    return str(value).strip()
+
+def format_price(value, currency=None):
+    """Render a price the way it appears on the page, e.g. '$3.49'"""
+    if isinstance(value, dict):
+        currency = currency or first_value(value, CURRENCY_KEYS)
+        value = first_value(value, ('amount', 'value', 'price', 'lowPrice'))
+    if value is None or isinstance(value, (list, bool)):
+        return ""
+    symbol = CURRENCY_SYMBOLS.get(str(currency or 'USD').upper(), '$')
+    if isinstance(value, (int, float)):
+        return f"{symbol}{value:.2f}"
+    text = str(value).strip()
+    if text and not any(s in text for s in CURRENCY_SYMBOLS.values()):
+        try:
+            return f"{symbol}{float(text.replace(',', '')):.2f}"
+        except ValueError:
+            pass
+    return text
+
+def offer_price(offers):
+    """Price and currency from a JSON-LD offers value (object, list or AggregateOffer)"""
+    if isinstance(offers, list):
+        offers = next((o for o in offers if isinstance(o, dict) and first_value(o, ('price', 'lowPrice'))), None)
+    if not isinstance(offers, dict):
+        return None, None
+    return first_value(offers, ('price', 'lowPrice')), first_value(offers, CURRENCY_KEYS)
+
+def is_product(obj):
+    """Whether a JSON object describes a single product"""
+    types = obj.get('@type')
+    if types == 'Product' or (isinstance(types, list) and 'Product' in types):
+        return True
+    return first_value(obj, NAME_KEYS) is not None and (
+        first_value(obj, PRICE_KEYS) is not None or 'offers' in obj
+    )
+
+def product_fields(obj, base_url=None):
+    """Map a product object to the fields parse_product_data records"""
+    price, currency = first_value(obj, PRICE_KEYS), first_value(obj, CURRENCY_KEYS)
+    if price is None:
+        price, offer_currency = offer_price(obj.get('offers'))
+        currency = currency or offer_currency
+
+    unit = first_value(obj, UNIT_PRICE_KEYS)
+    if isinstance(unit, (int, float)) and not isinstance(unit, bool):
+        unit_name = plain_text(first_value(obj, UNIT_KEYS))
+        unit = format_price(unit, currency) + (f"/{unit_name}" if unit_name else "")
+
+    link = first_value(obj, URL_KEYS)
+    link = link if isinstance(link, str) else None
+
+    return {
+        'name': plain_text(first_value(obj, NAME_KEYS)),
+        'price': format_price(price, currency),
+        'unit': plain_text(unit),
+        'brand': plain_text(first_value(obj, BRAND_KEYS)),
+        'category': plain_text(first_value(obj, CATEGORY_KEYS)),
+        'link': urljoin(base_url, link) if link and base_url else link
+    }
+
+def find_products(data, base_url=None):
+    """Collect product objects anywhere in a decoded blob, in document order"""
+    found = []
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            if is_product(obj):
+                found.append(product_fields(obj, base_url))
+                continue  # variants and offers inside a product are not products of their own
+            stack.extend(reversed(list(obj.values())))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+    return [fields for fields in found if fields['name']]
+
+def extract_embedded_products(html, base_url=None):
+    """Products from the first kind of embedded blob that lists any, as (source, [fields])
+
+    Blobs of one kind are combined (pages often carry one JSON-LD block per
+    product), but different kinds are never mixed since they usually
+    describe the same products twice.
+    """
+    if not html:
+        return None, []
+    found_in, products = None, []
+    for source, data in find_blobs(html):
+        if products and source != found_in:
+            break  # blobs are yielded kind by kind, so the first kind with products is done
+        blob_products = find_products(data, base_url)
+        if blob_products:
+            found_in = source
+            products.extend(blob_products)
+    return found_in, products
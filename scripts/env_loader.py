@@ -43,18 +43,48 @@ def load_environment():
         tracked_products = ["Maggi Masala Instant Noodles 9.8 oz", "Lee Kum Kee Supreme Soy Sauce 500 ml"]
     
     # Web Scraping
+    try:
+        category_urls = json.loads(os.getenv('CATEGORY_URLS', '[]'))
+    except json.JSONDecodeError:
+        category_urls = []
+    
     scraping_config = {
         'base_url': os.getenv('BASE_URL', 'https://www.sayweee.com/en/category/sale'),
         'request_timeout': int(os.getenv('REQUEST_TIMEOUT', '10')),
-        'max_retries': int(os.getenv('MAX_RETRIES', '3'))
+        'max_retries': int(os.getenv('MAX_RETRIES', '3')),
+        'retry_backoff_factor': float(os.getenv('RETRY_BACKOFF_FACTOR', '0.5')),
+        'retry_backoff_jitter': float(os.getenv('RETRY_BACKOFF_JITTER', '0.5')),
+        'http_pool_size': int(os.getenv('HTTP_POOL_SIZE', '10')),
+        'category_urls': category_urls,
+        'crawl_concurrency_per_host': int(os.getenv('CRAWL_CONCURRENCY_PER_HOST', '4')),
+        'crawl_max_pages': int(os.getenv('CRAWL_MAX_PAGES', '50')),
+        'parser_backend': os.getenv('PARSER_BACKEND', 'lxml'),
+        'parse_full_page': os.getenv('PARSE_FULL_PAGE', 'true').lower() == 'true',
+        'parse_time_budget_seconds': float(os.getenv('PARSE_TIME_BUDGET_SECONDS', '10')),
+        'parse_max_page_chars': int(os.getenv('PARSE_MAX_PAGE_CHARS', '5000000'))
     }
     
     # Data Storage
     data_config = {
         'data_dir': os.getenv('DATA_DIR', 'data/processed'),
         'price_history_file': os.getenv('PRICE_HISTORY_FILE', 'price_history.json'),
+        'price_log_compact_lines': int(os.getenv('PRICE_LOG_COMPACT_LINES', '1000')),
         'alert_history_file': os.getenv('ALERT_HISTORY_FILE', 'alert_history.json'),
-        'csv_output_file': os.getenv('CSV_OUTPUT_FILE', 'wee_prices.csv')
+        'csv_output_file': os.getenv('CSV_OUTPUT_FILE', 'wee_prices.csv'),
+        'fetch_state_file': os.getenv('FETCH_STATE_FILE', 'data/processed/fetch_state.json'),
+        'snapshot_dir': os.getenv('SNAPSHOT_DIR', 'data/raw'),
+        'snapshot_enabled': os.getenv('SNAPSHOT_ENABLED', 'true').lower() == 'true',
+        'selector_profile_file': os.getenv('SELECTOR_PROFILE_FILE', 'data/processed/selector_profiles.json'),
+        'match_cache_file': os.getenv('MATCH_CACHE_FILE', 'data/processed/match_cache.json'),
+        'match_cache_size': int(os.getenv('MATCH_CACHE_SIZE', '50000')),
+        'match_keywords_file': os.getenv('MATCH_KEYWORDS_FILE', 'config/match_keywords.json'),
+        'storage_format': os.getenv('STORAGE_FORMAT', 'parquet'),
+        'price_store_dir': os.getenv('PRICE_STORE_DIR', 'data/processed/prices'),
+        'local_store': os.getenv('LOCAL_STORE', 'sqlite'),
+        'sqlite_db_file': os.getenv('SQLITE_DB_FILE', 'data/processed/prices.db'),
+        'store_changes_only': os.getenv('STORE_CHANGES_ONLY', 'true').lower() == 'true',
+        'last_seen_file': os.getenv('LAST_SEEN_FILE', 'data/processed/last_seen.json'),
+        'observation_interval_hours': float(os.getenv('OBSERVATION_INTERVAL_HOURS', '24'))
     }
     
     # Logging
@@ -79,6 +109,7 @@ def load_environment():
         'email_config': email_config,
         'alert_settings': alert_settings,
         'tracked_products': tracked_products,
+        'match_threshold': float(os.getenv('MATCH_THRESHOLD', '0.6')),
         'scraping_config': scraping_config,
         'data_config': data_config,
         'logging_config': logging_config,
@@ -107,17 +138,43 @@ EMAIL_SUBJECT_PREFIX=🚨 Weee! Price Drop Alert:
 
 # Product Tracking
 TRACKED_PRODUCTS=["Maggi Masala Instant Noodles 9.8 oz", "Lee Kum Kee Supreme Soy Sauce 500 ml"]
+MATCH_THRESHOLD=0.6
 
 # Web Scraping
 BASE_URL=https://www.sayweee.com/en/category/sale
 REQUEST_TIMEOUT=10
 MAX_RETRIES=3
+RETRY_BACKOFF_FACTOR=0.5
+RETRY_BACKOFF_JITTER=0.5
+HTTP_POOL_SIZE=10
+CATEGORY_URLS=["https://www.sayweee.com/en/category/snacks"]
+CRAWL_CONCURRENCY_PER_HOST=4
+CRAWL_MAX_PAGES=50
+PARSER_BACKEND=lxml
+PARSE_FULL_PAGE=true
+PARSE_TIME_BUDGET_SECONDS=10
+PARSE_MAX_PAGE_CHARS=5000000
 
 # Data Storage
 DATA_DIR=data/processed
 PRICE_HISTORY_FILE=price_history.json
+PRICE_LOG_COMPACT_LINES=1000
 ALERT_HISTORY_FILE=alert_history.json
 CSV_OUTPUT_FILE=wee_prices.csv
+FETCH_STATE_FILE=data/processed/fetch_state.json
+SNAPSHOT_DIR=data/raw
+SNAPSHOT_ENABLED=true
+SELECTOR_PROFILE_FILE=data/processed/selector_profiles.json
+MATCH_CACHE_FILE=data/processed/match_cache.json
+MATCH_CACHE_SIZE=50000
+MATCH_KEYWORDS_FILE=config/match_keywords.json
+STORAGE_FORMAT=parquet
+PRICE_STORE_DIR=data/processed/prices
+LOCAL_STORE=sqlite
+SQLITE_DB_FILE=data/processed/prices.db
+STORE_CHANGES_ONLY=true
+LAST_SEEN_FILE=data/processed/last_seen.json
+OBSERVATION_INTERVAL_HOURS=24
 
 # Logging
 LOG_LEVEL=INFO
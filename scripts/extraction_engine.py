@@ -0,0 +1,274 @@
+# scripts/extraction_engine.py
+
+import re
+from functools import lru_cache
+from urllib.parse import urljoin
+import soupsieve as sv
+from bs4 import Tag
+
+# Selectors that might contain product information, in order of preference
+CONTAINER_SELECTORS = [
+    'div[data-testid="wid-product-card-container"]',  # Original selector
+    '[data-testid*="product"]',  # Any element with product in data-testid
+    '.product-card',
+    '.product-item',
+    'article',
+    '[class*="product"]',
+    '[class*="Product"]',
+    'div[class*="card"]',
+    'a[href*="/product/"]',  # Links to product pages
+    'div[class*="item"]',  # Generic item containers
+    'div[class*="product-item"]',  # Product items
+    'div[class*="product-card"]'  # Product cards
+]
+
+NAME_SELECTORS = [
+    'div[data-role="product-name"]',
+    '[data-testid*="name"]',
+    '[data-testid*="title"]',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    '.product-name',
+    '.title',
+    '.name',
+    'a[href*="/product/"]',
+    'span[class*="name"]',
+    'span[class*="title"]',
+    'div[class*="name"]',
+    'div[class*="title"]',
+    'p[class*="name"]',
+    'p[class*="title"]'
+]
+
+PRICE_SELECTORS = [
+    'div[data-testid="wid-product-card-price"]',
+    '[data-testid*="price"]',
+    '.price',
+    '[class*="price"]',
+    '[class*="Price"]',
+    'span[class*="price"]',
+    'div[class*="price"]',
+    'p[class*="price"]'
+]
+
+UNIT_PRICE_SELECTORS = [
+    'div[data-role="product-unit-price"]',
+    '[data-testid*="unit"]',
+    '.unit-price',
+    '.unit'
+]
+
+PRODUCT_LINK_SELECTOR = 'a[href*="/product/"]'
+
+# Used when no name selector matches: product-like words in the card text
+NAME_FALLBACK_KEYWORDS = ['noodles', 'sauce', 'soy', 'maggi', 'lee kum', 'barramundi', 'fish']
+
+PRICE_PATTERN = re.compile(r'\$[\d,]+\.?\d*')
+
+# tag, tag.class, tag[attr="value"] or tag[attr*="value"], each part optional
+SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?'
+    r'(?:\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?P<op>\*?=)"(?P<value>[^"]*)"\])?$'
+)
+
+def is_valid_name(text):
+    return bool(text) and len(text) > 3  # Ensure it's a meaningful name
+
+def is_valid_price(text):
+    return bool(text) and ('$' in text or '€' in text or '£' in text)
+
+def is_valid_unit(text):
+    return True
+
+@lru_cache(maxsize=None)
+def compile_selector(selector):
+    """Compile a CSS selector into (index key, predicate over a single element)
+
+    The simple selectors used for product cards are matched directly, which
+    is much cheaper than a general CSS engine, and are keyed by the attribute
+    (or tag name) an element must have to possibly match. Anything else goes
+    to soupsieve with no key, meaning it has to be tested on every element.
+    """
+    m = SIMPLE_SELECTOR.match(selector)
+    if not m or not (m.group('tag') or m.group('cls') or m.group('attr')):
+        return None, sv.compile(selector).match
+
+    tag_name, cls = m.group('tag'), m.group('cls')
+    attr, op, value = m.group('attr'), m.group('op'), m.group('value')
+
+    def match(tag):
+        if tag_name and tag.name != tag_name:
+            return False
+        if cls:
+            return cls in tag.get('class', ())
+        if attr:
+            actual = tag.get(attr)
+            if actual is None:
+                return False
+            if isinstance(actual, list):  # multi-valued attributes such as class
+                actual = ' '.join(actual)
+            return actual == value if op == '=' else bool(value) and value in actual
+        return True
+
+    key = 'class' if cls else attr or tag_name
+    return key, match
+
+class CardExtractor:
+    """Extract name, price, unit price and link from a product card in one pass
+
+    The card's subtree is walked once. Selectors are indexed by the attribute
+    or tag name they need, so each element is only tested against selectors
+    that could match it. For every field the first element matching each
+    selector is kept as a candidate, ranked by the selector's position in its
+    list, and the best valid candidate wins. Selectors ranked below an already
+    valid candidate are no longer tested, and the walk stops early once every
+    field has its top-ranked candidate.
+    """
+
+    def __init__(self, name_selectors=NAME_SELECTORS, price_selectors=PRICE_SELECTORS,
+                 unit_selectors=UNIT_PRICE_SELECTORS, link_selector=PRODUCT_LINK_SELECTOR):
+        self.selectors = {
+            'name': list(name_selectors),
+            'price': list(price_selectors),
+            'unit': list(unit_selectors)
+        }
+        self.validators = {'name': is_valid_name, 'price': is_valid_price, 'unit': is_valid_unit}
+        self.link_selector = link_selector
+        self.link_key, self.match_link = self.compile(link_selector)
+
+        # index key -> [(field, rank, predicate)]; rules without a key always run
+        self.rules = {}
+        self.unkeyed_rules = []
+        for field, selectors in self.selectors.items():
+            for idx, selector in enumerate(selectors):
+                key, match = self.compile(selector)
+                if key:
+                    self.rules.setdefault(key, []).append((field, idx, match))
+                else:
+                    self.unkeyed_rules.append((field, idx, match))
+
+    # Element access, overridden by extractors for other parse trees
+
+    def compile(self, selector):
+        return compile_selector(selector)
+
+    def elements(self, item):
+        """Descendant elements of a card, in document order"""
+        return (tag for tag in item.descendants if isinstance(tag, Tag))
+
+    def keys(self, tag):
+        """Tag name and attribute names, used to look up candidate selectors"""
+        return (tag.name, *tag.attrs)
+
+    def text(self, tag):
+        return tag.get_text(strip=True)
+
+    def collect(self, item):
+        """Walk the card once and collect the first match of every selector"""
+        found = {field: {} for field in self.selectors}
+        best = {field: len(sels) for field, sels in self.selectors.items()}
+        link = item.get('href') if self.match_link(item) else None
+        rules = self.rules
+
+        for tag in self.elements(item):
+            keys = self.keys(tag)
+            text = None
+            for key in (*keys, None):
+                tag_rules = rules.get(key) if key is not None else self.unkeyed_rules
+                if not tag_rules:
+                    continue
+                for field, idx, match in tag_rules:
+                    if idx >= best[field] or idx in found[field] or not match(tag):
+                        continue
+                    if text is None:
+                        text = self.text(tag)
+                    found[field][idx] = text
+                    if self.validators[field](text):
+                        best[field] = idx
+
+            if link is None and (self.link_key is None or self.link_key in keys) and self.match_link(tag):
+                link = tag.get('href')
+
+            if link is not None and not any(best.values()):
+                break  # every field already has its top-ranked candidate
+
+        return found, link
+
+    def rank(self, field, candidates):
+        """Pick a field's value from its candidates, best-ranked valid one first
+
+        Mirrors the selector cascade: if no candidate is valid, the last
+        candidate looked at is returned without a winning selector.
+        """
+        value, selector = None, None
+        for idx in sorted(candidates):
+            value = candidates[idx]
+            if self.validators[field](value):
+                selector = self.selectors[field][idx]
+                break
+        return value, selector
+
+    def extract(self, item, base_url=None):
+        """Return the card's fields and the selectors that produced them"""
+        found, link = self.collect(item)
+        fields = {}
+        for field in self.selectors:
+            fields[field], fields[f'{field}_selector'] = self.rank(field, found[field])
+
+        # The card's full text is only needed for fallbacks, and only once
+        all_text = None
+        if not fields['name']:
+            all_text = self.text(item)
+            for line in all_text.split('\n'):
+                line = line.strip()
+                if len(line) > 10 and any(keyword in line.lower() for keyword in NAME_FALLBACK_KEYWORDS):
+                    fields['name'] = line
+                    break
+
+        if not fields['price']:
+            if all_text is None:
+                all_text = self.text(item)
+            price_match = PRICE_PATTERN.search(all_text)
+            if price_match:
+                fields['price'] = price_match.group()
+
+        fields['link'] = urljoin(base_url, link) if link and base_url else link
+        return fields
+
+class CascadeExtractor(CardExtractor):
+    """Reference extractor running one select_one query per selector
+
+    This is how parse_product_data used to read cards; it is kept to check
+    and benchmark CardExtractor against.
+    """
+
+    def extract(self, item, base_url=None):
+        fields = {}
+        for field, selectors in self.selectors.items():
+            value, winner = None, None
+            for selector in selectors:
+                elem = item.select_one(selector)
+                if elem:
+                    value = elem.get_text(strip=True)
+                    if self.validators[field](value):
+                        winner = selector
+                        break
+            fields[field], fields[f'{field}_selector'] = value, winner
+
+        if not fields['name']:
+            all_text = item.get_text(strip=True)
+            for line in all_text.split('\n'):
+                line = line.strip()
+                if len(line) > 10 and any(keyword in line.lower() for keyword in NAME_FALLBACK_KEYWORDS):
+                    fields['name'] = line
+                    break
+
+        if not fields['price']:
+            all_text = item.get_text(strip=True)
+            price_match = PRICE_PATTERN.search(all_text)
+            if price_match:
+                fields['price'] = price_match.group()
+
+        link_elem = item if self.match_link(item) else item.select_one(self.link_selector)
+        link = link_elem.get('href') if link_elem else None
+        fields['link'] = urljoin(base_url, link) if link and base_url else link
+        return fields
@@ -0,0 +1,56 @@
+# scripts/fetch_state.py
+
+import os
+import json
+from datetime import datetime
+
+FETCH_STATE_FILE = os.getenv('FETCH_STATE_FILE', 'data/processed/fetch_state.json')
+
+def load_fetch_state(filename=FETCH_STATE_FILE):
+    """Load the validators and content hash recorded for each fetched URL"""
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+    return {}
+
+def save_fetch_state(state, filename=FETCH_STATE_FILE):
+    """Save per-URL fetch state for the next run"""
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump(state, f, indent=2)
+
+def conditional_headers(entry):
+    """Build conditional GET headers from a URL's last fetch state"""
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def record_fetch(state, url, response, content_hash):
+    """Remember a successful fetch's validators and content hash"""
+    previous = state.get(url, {})
+    state[url] = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_hash': content_hash,
+        'fetched_at': datetime.now().isoformat()
+    }
+    # What the last parse found stays until the page is parsed again
+    for field in ('products', 'match_fingerprint'):
+        if field in previous:
+            state[url][field] = previous[field]
+
+def record_parse(state, url, product_names, match_fingerprint):
+    """Remember the tracked products a parse of the page found, and the match settings it used"""
+    if url in state:
+        state[url]['products'] = list(product_names)
+        state[url]['match_fingerprint'] = match_fingerprint
+
+def known_products(state, url):
+    """Names of the tracked products found when the page was last parsed"""
+    return state.get(url, {}).get('products', [])
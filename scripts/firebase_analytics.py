@@ -10,6 +10,7 @@ import pandas as pd
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from firebase_manager import FirebaseManager
+from canonical import canonical_product_key
 
 class FirebaseAnalytics:
     def __init__(self):
@@ -21,9 +22,10 @@ class FirebaseAnalytics:
             if product_name:
                 # Get specific product trends
                 products = self.firebase.get_tracked_products()
+                product_key = canonical_product_key(product_name)
                 product_id = None
                 for product in products:
-                    if product['name'] == product_name:
+                    if canonical_product_key(product['name']) == product_key:
                         product_id = product['id']
                         break
                 
@@ -1,6 +1,7 @@
 # scripts/firebase_manager.py
 from firebase_admin import firestore
-from datetime import datetime
+from google.api_core.exceptions import FailedPrecondition
+from datetime import datetime, timezone
 import logging
 from decimal import Decimal
 import os
@@ -11,104 +12,547 @@ from dotenv import load_dotenv
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from config.firebase_config import db
+from canonical import canonical_product_key
+from change_detection import expand_points
 
 load_dotenv()
 
+BATCH_LIMIT = 500  # Firestore's maximum number of writes in one batch
+IN_QUERY_LIMIT = 30  # Firestore's maximum number of values in an 'in' filter
+
+def product_document(product_data, product_key):
+    """Fields of a new product document"""
+    return {
+        'productName': product_data['name'],
+        'productKey': product_key,
+        'brand': product_data.get('brand'),
+        'category': product_data.get('category'),
+        'unitSize': product_data.get('unit_size'),
+        'createdAt': datetime.now(),
+        'updatedAt': datetime.now(),
+        'enabled': True,
+        'priority': 1
+    }
+
+def price_document(product_id, price_data):
+    """Fields of a priceHistory document"""
+    return {
+        'productId': product_id,
+        'price': float(price_data['price']) if price_data['price'] else None,
+        'priceStr': price_data['price_str'],
+        'unitPrice': float(price_data.get('unit_price')) if price_data.get('unit_price') else None,
+        'unitPriceBasis': price_data.get('unit_price_basis'),
+        'unitPriceStr': price_data.get('unit_price_str', ''),
+        'sourceUrl': price_data.get('source_url'),
+        'sourceSelector': price_data.get('source_selector'),
+        'scrapedAt': price_data.get('scraped_at') or datetime.now(),
+        'createdAt': datetime.now()
+    }
+
+def alert_document(product_id, old_price, new_price, savings, savings_percentage):
+    """Fields of an alerts document"""
+    return {
+        'productId': product_id,
+        'oldPrice': float(old_price),
+        'newPrice': float(new_price),
+        'savingsAmount': float(savings),
+        'savingsPercentage': float(savings_percentage),
+        'alertSentAt': datetime.now(),
+        'alertType': 'email',
+        'sent': False
+    }
+
+def naive_time(value):
+    """Firestore returns timestamps as UTC-aware datetimes; compare them as the naive times they were written as"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def price_aggregates(product, record):
+    """Product aggregate fields after adding one priceHistory record to them
+    
+    product holds the current fields (latestPrice, latestScrapedAt,
+    minPrice, maxPrice, observationCount); missing ones count as no data.
+    """
+    price, scraped_at = record.get('price'), naive_time(record.get('scrapedAt'))
+    fields = {'observationCount': (product.get('observationCount') or 0) + 1}
+    if price:
+        fields['minPrice'] = price if product.get('minPrice') is None else min(product['minPrice'], price)
+        fields['maxPrice'] = price if product.get('maxPrice') is None else max(product['maxPrice'], price)
+    latest = naive_time(product.get('latestScrapedAt'))
+    if latest is None or (scraped_at is not None and scraped_at >= latest):
+        fields.update({'latestPrice': price, 'latestPriceStr': record.get('priceStr'), 'latestScrapedAt': scraped_at})
+    return fields
+
+def latest_price_of(product):
+    """Latest price dict from a product document's aggregates, or None if it has none"""
+    if not product.get('latestScrapedAt'):
+        return None
+    return {
+        'price': product.get('latestPrice'),
+        'price_str': product.get('latestPriceStr'),
+        'scraped_at': naive_time(product['latestScrapedAt'])
+    }
+
+@firestore.transactional
+def write_price_record(transaction, product_ref, price_ref, record):
+    """Add a priceHistory record and fold it into its product's aggregates atomically"""
+    product = product_ref.get(transaction=transaction)
+    transaction.set(price_ref, record)
+    if product.exists:
+        transaction.update(product_ref, price_aggregates(product.to_dict(), record))
+
+class BatchWriter:
+    """Queue Firestore writes and commit them in batches of up to BATCH_LIMIT
+    
+    on_commit, if given, is called after every batch that was committed.
+    """
+    
+    def __init__(self, db, on_commit=None):
+        self.db = db
+        self.batch = db.batch()
+        self.pending = 0
+        self.commits = 0
+        self.on_commit = on_commit
+    
+    def set(self, doc_ref, data):
+        self.batch.set(doc_ref, data)
+        self._queued()
+    
+    def update(self, doc_ref, data):
+        self.batch.update(doc_ref, data)
+        self._queued()
+    
+    def delete(self, doc_ref):
+        self.batch.delete(doc_ref)
+        self._queued()
+    
+    def reserve(self, writes):
+        """Commit first if the next `writes` writes would not fit in the current batch"""
+        if self.pending + writes > BATCH_LIMIT:
+            self.commit()
+    
+    def _queued(self):
+        self.pending += 1
+        if self.pending >= BATCH_LIMIT:
+            self.commit()
+    
+    def commit(self):
+        if self.pending:
+            self.batch.commit()
+            self.commits += 1
+            self.batch = self.db.batch()
+            self.pending = 0
+            if self.on_commit:
+                self.on_commit()
+
 class FirebaseManager:
+    """Firestore access for products, price history and alerts
+    
+    Product ids and latest prices are cached in memory: both are loaded
+    with a single query of the products collection the first time they are
+    needed and kept up to date by the writes made through this manager.
+    Call invalidate() to pick up changes made elsewhere.
+    
+    Each product document carries running aggregates of its price history
+    (latestPrice, latestScrapedAt, minPrice, maxPrice, observationCount),
+    updated in the same transaction or batch as the price records, so the
+    latest price of a product is a single document read.
+    """
+    
     def __init__(self):
         self.db = db
         self.logger = logging.getLogger(__name__)
+        self._product_ids = None
+        self._latest_prices = None
         
         if not self.db:
             raise Exception("Firebase not initialized")
     
     def save_product(self, product_data):
-        """Save or update product information"""
+        """Save or update product information, keyed on the canonical product name"""
         try:
             # Check if product exists
             products_ref = self.db.collection('products')
-            query = products_ref.where('productName', '==', product_data['name'])
-            docs = query.stream()
+            product_key = canonical_product_key(product_data['name'])
+            product_id = self._product_id_cache().get(product_key)
             
-            product_doc = None
-            for doc in docs:
-                product_doc = doc
-                break
-            
-            if product_doc:
+            if product_id:
                 # Update existing product
-                product_doc.reference.update({
+                products_ref.document(product_id).update({
+                    'productKey': product_key,
                     'category': product_data.get('category'),
                     'updatedAt': datetime.now()
                 })
-                return product_doc.id
+                return product_id
             else:
                 # Create new product
-                doc_ref = products_ref.add({
-                    'productName': product_data['name'],
-                    'brand': product_data.get('brand'),
-                    'category': product_data.get('category'),
-                    'unitSize': product_data.get('unit_size'),
-                    'createdAt': datetime.now(),
-                    'updatedAt': datetime.now(),
-                    'enabled': True,
-                    'priority': 1
-                })
+                doc_ref = products_ref.add(product_document(product_data, product_key))
+                self._product_ids[product_key] = doc_ref[1].id
                 return doc_ref[1].id
                 
         except Exception as e:
             self.logger.error(f"Error saving product: {e}")
             return None
     
+    def invalidate(self):
+        """Drop the cached product ids and latest prices; they are reloaded on next use"""
+        self._product_ids = None
+        self._latest_prices = None
+    
+    def _load_products(self):
+        """Fill the product id and latest price caches with one query of the products collection"""
+        product_ids, latest_prices, not_backfilled = {}, {}, []
+        for doc in self.db.collection('products').stream():
+            data = doc.to_dict()
+            # Products saved before canonical keys only carry their exact name
+            product_key = data.get('productKey') or canonical_product_key(data.get('productName'))
+            product_ids.setdefault(product_key, doc.id)
+            latest_price = latest_price_of(data)
+            if latest_price is None and 'observationCount' not in data:
+                not_backfilled.append(doc.id)
+            elif latest_price:
+                latest_prices[doc.id] = latest_price
+        if not_backfilled:
+            self.logger.warning(f"{len(not_backfilled)} products have no price aggregates yet, reading their "
+                                f"latest prices from price history (run scripts/backfill_product_aggregates.py once)")
+            latest_prices.update(self._latest_from_histories(not_backfilled))
+        self._product_ids, self._latest_prices = product_ids, latest_prices
+    
+    def _product_id_cache(self):
+        """Canonical product key -> product id"""
+        if self._product_ids is None:
+            self._load_products()
+        return self._product_ids
+    
+    def _latest_price_cache(self):
+        """Product id -> latest price"""
+        if self._latest_prices is None:
+            self._load_products()
+        return self._latest_prices
+    
+    def _remember_price(self, product_id, latest_price):
+        """Keep a written price in the cache if it is the product's newest"""
+        if self._latest_prices is None or not latest_price['scraped_at']:
+            return
+        latest_price = dict(latest_price, scraped_at=naive_time(latest_price['scraped_at']))
+        cached = self._latest_prices.get(product_id)
+        if cached is None or latest_price['scraped_at'] >= cached['scraped_at']:
+            self._latest_prices[product_id] = latest_price
+    
+    def get_product_id(self, product_name):
+        """Id of the product document for a name (matched on its canonical key), or None"""
+        return self._product_id_cache().get(canonical_product_key(product_name))
+    
+    def save_prices_bulk(self, records, check_drops=True):
+        """Save a whole run of (product_name, price_data) pairs in a few round-trips
+        
+        Existing products and their latest prices come from the cache. Each
+        product's upsert (with its updated aggregates), price records and
+        price-drop alerts are queued together, so they are committed in the
+        same WriteBatch of up to BATCH_LIMIT writes. Drops are checked
+        against the latest price before each record, unless check_drops is
+        False (replays of old snapshots must not raise alerts).
+        
+        A run is not atomic: it is committed batch by batch, and a failing
+        batch leaves the batches before it in place. Returns (the records
+        that were committed, alert dicts with the product_name for them).
+        """
+        saved, alerts = [], []
+        queued = []  # (records, alerts) of each product in the open batch
+        
+        def committed():
+            for product_records, product_alerts in queued:
+                saved.extend(product_records)
+                alerts.extend(product_alerts)
+            queued.clear()
+        
+        try:
+            products_ref = self.db.collection('products')
+            existing = self._product_id_cache()
+            latest = self._latest_price_cache()
+            writer = BatchWriter(self.db, on_commit=committed)
+            now = datetime.now()
+            
+            # The run's records per product, oldest first
+            groups = {}
+            for product_name, price_data in sorted(records, key=lambda record: record[1].get('scraped_at') or now):
+                groups.setdefault(canonical_product_key(product_name), []).append((product_name, price_data))
+            
+            for product_key, group in groups.items():
+                product_name, first_data = group[0]
+                product_ref = products_ref.document(existing[product_key]) if product_key in existing else products_ref.document()
+                previous = latest.get(product_ref.id)
+                
+                documents, product_alerts, alert_details = [], [], []
+                for name, price_data in group:
+                    record = price_document(product_ref.id, price_data)
+                    documents.append(record)
+                    current_price = record['price']
+                    if check_drops and previous and previous['price'] and current_price and current_price < previous['price']:
+                        savings = previous['price'] - current_price
+                        savings_percentage = (savings / previous['price']) * 100
+                        product_alerts.append(alert_document(product_ref.id, previous['price'], current_price, savings, savings_percentage))
+                        alert_details.append({
+                            'product_name': name,
+                            'old_price': previous['price'],
+                            'new_price': current_price,
+                            'savings': savings,
+                            'savings_percentage': savings_percentage
+                        })
+                    previous = {'price': current_price, 'price_str': record['priceStr'], 'scraped_at': record['scrapedAt']}
+                
+                writer.reserve(1 + len(documents) + len(product_alerts))
+                # Queued before its writes: the last of them may fill the batch and commit it
+                queued.append((group, alert_details))
+                if product_key in existing:
+                    writer.update(product_ref, {
+                        'productKey': product_key,
+                        'category': first_data.get('category'),
+                        'updatedAt': datetime.now(),
+                        **self._aggregate_transforms(product_ref.id, documents)
+                    })
+                else:
+                    aggregates = {}
+                    for record in documents:
+                        aggregates.update(price_aggregates(aggregates, record))
+                    writer.set(product_ref, {**product_document({
+                        'name': product_name,
+                        'brand': first_data.get('brand'),
+                        'category': first_data.get('category'),
+                        'unit_size': first_data.get('unit')
+                    }, product_key), **aggregates})
+                for record in documents:
+                    writer.set(self.db.collection('priceHistory').document(), record)
+                for alert in product_alerts:
+                    writer.set(self.db.collection('alerts').document(), alert)
+                
+                existing[product_key] = product_ref.id
+                self._remember_price(product_ref.id, previous)
+            
+            writer.commit()
+            self.logger.info(f"Saved {len(saved)} price records in {writer.commits} batch(es)")
+            
+        except Exception as e:
+            self.logger.error(f"Error saving prices in bulk after {len(saved)} of {len(records)} records: {e}")
+            self.invalidate()  # the cache may hold writes that were never committed
+        return saved, alerts
+    
+    def _aggregate_transforms(self, product_id, documents):
+        """Aggregate updates for an existing product, applied server-side in a batch
+        
+        Count, minimum and maximum use Firestore's atomic transforms; the
+        latest price is only replaced when the new records are newer than
+        the cached one.
+        """
+        prices = [record['price'] for record in documents if record['price']]
+        fields = {'observationCount': firestore.Increment(len(documents))}
+        if prices:
+            fields['minPrice'] = firestore.Minimum(min(prices))
+            fields['maxPrice'] = firestore.Maximum(max(prices))
+        newest = max(documents, key=lambda record: naive_time(record['scrapedAt']))
+        cached = self._latest_price_cache().get(product_id)
+        if cached is None or naive_time(newest['scrapedAt']) >= cached['scraped_at']:
+            fields.update({'latestPrice': newest['price'], 'latestPriceStr': newest['priceStr'],
+                           'latestScrapedAt': newest['scrapedAt']})
+        return fields
+    
+    def touch_products(self, seen):
+        """Batched touch_product for (product_name, seen_at) pairs; returns how many were found"""
+        try:
+            products_ref = self.db.collection('products')
+            writer = BatchWriter(self.db)
+            touched = 0
+            for product_name, seen_at in seen:
+                product_id = self.get_product_id(product_name)
+                if product_id:
+                    writer.update(products_ref.document(product_id), {'lastSeenAt': seen_at or datetime.now()})
+                    touched += 1
+            writer.commit()
+            return touched
+        except Exception as e:
+            self.logger.error(f"Error updating last seen times: {e}")
+            return 0
+    
+    def merge_duplicate_products(self, dry_run=False):
+        """Collapse product documents whose names share a canonical key
+        
+        The oldest document of each group is kept; price history and alerts
+        of the others are re-pointed to it in batched writes, and each
+        duplicate is deleted in the batch that moves its last records, so no
+        record is ever left pointing at a deleted product.
+        Returns the number of duplicate documents found.
+        """
+        try:
+            writer = BatchWriter(self.db)
+            groups = {}
+            for doc in self.db.collection('products').stream():
+                key = canonical_product_key(doc.to_dict().get('productName'))
+                groups.setdefault(key, []).append(doc)
+            
+            duplicates = 0
+            for key, docs in groups.items():
+                docs.sort(key=lambda doc: (doc.create_time is None, doc.create_time))
+                keeper = docs[0]
+                duplicates += len(docs) - 1
+                if dry_run:
+                    for doc in docs[1:]:
+                        print(f"🔁 Would merge '{doc.to_dict().get('productName')}' into '{keeper.to_dict().get('productName')}'")
+                    continue
+                
+                if keeper.to_dict().get('productKey') != key:
+                    writer.update(keeper.reference, {'productKey': key})
+                for doc in docs[1:]:
+                    records = [
+                        record
+                        for collection in ('priceHistory', 'alerts')
+                        for record in self.db.collection(collection).where('productId', '==', doc.id).stream()
+                    ]
+                    for record in records[:-1]:
+                        writer.update(record.reference, {'productId': keeper.id})
+                    writer.reserve(2)
+                    if records:
+                        writer.update(records[-1].reference, {'productId': keeper.id})
+                    writer.delete(doc.reference)
+            writer.commit()
+            self.invalidate()
+            return duplicates
+            
+        except Exception as e:
+            self.logger.error(f"Error merging duplicate products: {e}")
+            return 0
+    
+    def touch_product(self, product_name, seen_at=None):
+        """Record that a product was seen at an unchanged price; no price record is written"""
+        try:
+            product_id = self.get_product_id(product_name)
+            if product_id is None:
+                return False
+            self.db.collection('products').document(product_id).update({'lastSeenAt': seen_at or datetime.now()})
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating last seen time: {e}")
+            return False
+    
+    def _observations(self, price_docs, last_seen_at):
+        """Stored price changes of one product expanded into regular observations"""
+        points = []
+        for doc in price_docs:
+            data = doc.to_dict()
+            if data.get('scrapedAt'):
+                points.append({'price': data.get('price'), 'price_str': data.get('priceStr'),
+                               'scraped_at': naive_time(data['scrapedAt'])})
+        return expand_points(points, naive_time(last_seen_at))
+    
     def save_price_record(self, product_id, price_data):
-        """Save price record to Firestore"""
+        """Save price record to Firestore, updating the product's aggregates in the same transaction"""
         try:
-            price_history_ref = self.db.collection('priceHistory')
-            doc_ref = price_history_ref.add({
-                'productId': product_id,
-                'price': float(price_data['price']) if price_data['price'] else None,
-                'priceStr': price_data['price_str'],
-                'unitPrice': float(price_data.get('unit_price')) if price_data.get('unit_price') else None,
-                'unitPriceStr': price_data.get('unit_price_str', ''),
-                'sourceUrl': price_data.get('source_url'),
-                'sourceSelector': price_data.get('source_selector'),
-                'scrapedAt': datetime.now(),
-                'createdAt': datetime.now()
-            })
-            return doc_ref[1].id
+            price_ref = self.db.collection('priceHistory').document()
+            record = price_document(product_id, price_data)
+            write_price_record(self.db.transaction(), self.db.collection('products').document(product_id), price_ref, record)
+            self._remember_price(product_id, {'price': record['price'], 'price_str': record['priceStr'],
+                                              'scraped_at': record['scrapedAt']})
+            return price_ref.id
             
         except Exception as e:
             self.logger.error(f"Error saving price record: {e}")
             return None
     
     def get_latest_price(self, product_id):
-        """Get the latest price for a product"""
+        """Get the latest price for a product: from the cache, else one read of its product document"""
         try:
-            price_history_ref = self.db.collection('priceHistory')
-            # Simplified query to avoid index requirements
-            query = price_history_ref.where('productId', '==', product_id)
-            docs = query.stream()
+            if self._latest_prices is not None:
+                return self._latest_prices.get(product_id)
+            product_doc = self.db.collection('products').document(product_id).get()
+            if not product_doc.exists:
+                return None
+            data = product_doc.to_dict()
+            if 'observationCount' not in data:
+                return self._latest_from_history(product_id)  # not backfilled yet
+            return latest_price_of(data)
             
-            latest_price = None
-            latest_time = None
-            
-            for doc in docs:
+        except Exception as e:
+            self.logger.error(f"Error getting latest price: {e}")
+            return None
+    
+    def _indexed(self, run_query, fallback, index):
+        """Run an ordered, limited query; without its composite index deployed, fall back to a scan
+        
+        The indexes are defined in firestore.indexes.json; Firestore answers
+        FailedPrecondition for a query whose index doesn't exist (yet).
+        """
+        try:
+            return run_query()
+        except FailedPrecondition as e:
+            self.logger.warning(f"Missing Firestore index on {index}, falling back to a scan "
+                                f"(deploy it with: firebase deploy --only firestore:indexes): {e}")
+            return fallback()
+    
+    def _latest_from_history(self, product_id):
+        """Latest price record of a product, read from its price history"""
+        history = self.db.collection('priceHistory').where('productId', '==', product_id)
+        docs = self._indexed(
+            lambda: list(history.order_by('scrapedAt', direction=firestore.Query.DESCENDING).limit(1).stream()),
+            lambda: list(history.stream()),
+            'priceHistory (productId, scrapedAt)'
+        )
+        latest_price = None
+        for doc in docs:
+            data = doc.to_dict()
+            scraped_at = naive_time(data.get('scrapedAt'))
+            if scraped_at and (latest_price is None or scraped_at > latest_price['scraped_at']):
+                latest_price = {'price': data.get('price'), 'price_str': data.get('priceStr'), 'scraped_at': scraped_at}
+        return latest_price
+    
+    def _latest_from_histories(self, product_ids):
+        """Product id -> latest price record for several products, read with one
+        'in' query of price history per IN_QUERY_LIMIT products"""
+        latest_prices = {}
+        history = self.db.collection('priceHistory')
+        for start in range(0, len(product_ids), IN_QUERY_LIMIT):
+            for doc in history.where('productId', 'in', product_ids[start:start + IN_QUERY_LIMIT]).stream():
                 data = doc.to_dict()
-                scraped_at = data.get('scrapedAt')
-                
-                if scraped_at and (latest_time is None or scraped_at > latest_time):
-                    latest_time = scraped_at
-                    latest_price = {
-                        'price': data.get('price'),
-                        'price_str': data.get('priceStr'),
-                        'scraped_at': scraped_at
-                    }
+                scraped_at = naive_time(data.get('scrapedAt'))
+                latest_price = latest_prices.get(data.get('productId'))
+                if scraped_at and (latest_price is None or scraped_at > latest_price['scraped_at']):
+                    latest_prices[data['productId']] = {'price': data.get('price'), 'price_str': data.get('priceStr'),
+                                                        'scraped_at': scraped_at}
+        return latest_prices
+    
+    def backfill_product_aggregates(self, dry_run=False):
+        """Compute every product's price aggregates from its full price history
+        
+        Reads priceHistory once and writes the aggregates of all products in
+        batches. Products without any price records are reset to a count of
+        zero. Returns the number of products updated.
+        """
+        try:
+            aggregates = {}
+            records = sorted((doc.to_dict() for doc in self.db.collection('priceHistory').stream()),
+                             key=lambda record: naive_time(record.get('scrapedAt')) or datetime.min)
+            for record in records:
+                product = aggregates.setdefault(record.get('productId'), {})
+                product.update(price_aggregates(product, record))
             
-            return latest_price
+            writer = BatchWriter(self.db)
+            updated = 0
+            for doc in self.db.collection('products').stream():
+                fields = aggregates.get(doc.id, {'observationCount': 0})
+                fields = {**{'latestPrice': None, 'latestPriceStr': None, 'latestScrapedAt': None,
+                             'minPrice': None, 'maxPrice': None}, **fields}
+                if dry_run:
+                    print(f"📊 {doc.to_dict().get('productName')}: {fields['observationCount']} records, "
+                          f"latest {fields['latestPrice']}, range {fields['minPrice']} - {fields['maxPrice']}")
+                else:
+                    writer.update(doc.reference, fields)
+                updated += 1
+            writer.commit()
+            self.invalidate()
+            return updated
             
         except Exception as e:
-            self.logger.error(f"Error getting latest price: {e}")
-            return None
+            self.logger.error(f"Error backfilling product aggregates: {e}")
+            return 0
     
     def check_price_drop(self, product_id, current_price):
         """Check if there's a price drop and create alert"""
@@ -134,16 +578,7 @@ class FirebaseManager:
         """Create a price alert record"""
         try:
             alerts_ref = self.db.collection('alerts')
-            doc_ref = alerts_ref.add({
-                'productId': product_id,
-                'oldPrice': float(old_price),
-                'newPrice': float(new_price),
-                'savingsAmount': float(savings),
-                'savingsPercentage': float(savings_percentage),
-                'alertSentAt': datetime.now(),
-                'alertType': 'email',
-                'sent': False
-            })
+            doc_ref = alerts_ref.add(alert_document(product_id, old_price, new_price, savings, savings_percentage))
             return doc_ref[1].id
             
         except Exception as e:
@@ -151,31 +586,31 @@ class FirebaseManager:
             return None
     
     def get_price_trends(self, product_id, days=30):
-        """Get price trends for a product"""
+        """Get price trends for a product
+        
+        Reads only the price records inside the window, plus the one in
+        effect when it starts, with range queries on (productId, scrapedAt).
+        """
         try:
             from datetime import timedelta
             
-            price_history_ref = self.db.collection('priceHistory')
-            # Simplified query to avoid index requirements
-            query = price_history_ref.where('productId', '==', product_id)
-            docs = query.stream()
-            
-            trends = []
             cutoff_date = datetime.now() - timedelta(days=days)
+            history = self.db.collection('priceHistory').where('productId', '==', product_id)
             
-            for doc in docs:
-                data = doc.to_dict()
-                scraped_at = data.get('scrapedAt')
-                
-                # Filter by date in Python instead of Firestore
-                if scraped_at and scraped_at >= cutoff_date:
-                    trends.append({
-                        'price': data.get('price'),
-                        'price_str': data.get('priceStr'),
-                        'scraped_at': scraped_at
-                    })
+            def window_records():
+                newest_first = firestore.Query.DESCENDING
+                in_window = history.where('scrapedAt', '>=', cutoff_date).order_by('scrapedAt', direction=newest_first)
+                before = history.where('scrapedAt', '<', cutoff_date).order_by('scrapedAt', direction=newest_first).limit(1)
+                return list(in_window.stream()) + list(before.stream())
             
-            # Sort in Python instead of Firestore
+            docs = self._indexed(window_records, lambda: list(history.stream()), 'priceHistory (productId, scrapedAt)')
+            
+            # Only price changes are stored; expand them up to the last time the product was seen
+            product_doc = self.db.collection('products').document(product_id).get()
+            last_seen_at = product_doc.to_dict().get('lastSeenAt') if product_doc.exists else None
+            
+            trends = [observation for observation in self._observations(docs, last_seen_at)
+                      if observation['scraped_at'] >= cutoff_date]
             trends.sort(key=lambda x: x.get('scraped_at', datetime.min), reverse=True)
             return trends[:days]
             
@@ -189,41 +624,49 @@ class FirebaseManager:
             from datetime import timedelta
             
             alerts_ref = self.db.collection('alerts')
-            # Simplified query to avoid index requirements
-            docs = alerts_ref.stream()
-            
-            savings = []
             cutoff_date = datetime.now() - timedelta(days=days)
             
+            def scan_alerts():
+                # Filter and sort in Python when the index is missing
+                recent = [doc for doc in alerts_ref.stream()
+                          if doc.to_dict().get('alertSentAt') and naive_time(doc.to_dict()['alertSentAt']) >= cutoff_date]
+                recent.sort(key=lambda doc: doc.to_dict().get('savingsPercentage') or 0, reverse=True)
+                return recent[:10]
+            
+            docs = self._indexed(
+                lambda: list(alerts_ref.where('alertSentAt', '>=', cutoff_date)
+                             .order_by('savingsPercentage', direction=firestore.Query.DESCENDING).limit(10).stream()),
+                scan_alerts,
+                'alerts (savingsPercentage, alertSentAt)'
+            )
+            
+            savings = []
             for doc in docs:
                 data = doc.to_dict()
-                alert_sent_at = data.get('alertSentAt')
+                # Get product name
+                product_doc = self.db.collection('products').document(data['productId']).get()
+                product_name = product_doc.to_dict()['productName'] if product_doc.exists else 'Unknown'
                 
-                # Filter by date in Python instead of Firestore
-                if alert_sent_at and alert_sent_at >= cutoff_date:
-                    # Get product name
-                    product_doc = self.db.collection('products').document(data['productId']).get()
-                    product_name = product_doc.to_dict()['productName'] if product_doc.exists else 'Unknown'
-                    
-                    savings.append({
-                        'product_name': product_name,
-                        'old_price': data.get('oldPrice'),
-                        'new_price': data.get('newPrice'),
-                        'savings_amount': data.get('savingsAmount'),
-                        'savings_percentage': data.get('savingsPercentage'),
-                        'alert_sent_at': alert_sent_at
-                    })
-            
-            # Sort in Python instead of Firestore
-            savings.sort(key=lambda x: x.get('savings_percentage', 0), reverse=True)
-            return savings[:10]
+                savings.append({
+                    'product_name': product_name,
+                    'old_price': data.get('oldPrice'),
+                    'new_price': data.get('newPrice'),
+                    'savings_amount': data.get('savingsAmount'),
+                    'savings_percentage': data.get('savingsPercentage'),
+                    'alert_sent_at': data.get('alertSentAt')
+                })
+            return savings
             
         except Exception as e:
             self.logger.error(f"Error getting biggest savings: {e}")
             return []
     
     def get_product_statistics(self):
-        """Get overall product statistics"""
+        """Get overall product statistics
+
+        total_price_records counts stored price changes; the average is
+        taken over the observations they expand to.
+        """
         try:
             # Get total products
             products_ref = self.db.collection('products')
@@ -240,18 +683,27 @@ class FirebaseManager:
             alerts = list(alerts_ref.stream())
             total_alerts = len(alerts)
             
+            # Expand each product's price changes into observations
+            records_by_product = {}
+            for doc in price_records:
+                records_by_product.setdefault(doc.to_dict().get('productId'), []).append(doc)
+            last_seen = {doc.id: doc.to_dict().get('lastSeenAt') for doc in products}
+            prices = []
+            for product_id, docs in records_by_product.items():
+                observations = self._observations(docs, last_seen.get(product_id))
+                prices.extend(point['price'] for point in observations if point['price'])
+            
             # Calculate average price
-            total_price = sum([doc.to_dict().get('price', 0) for doc in price_records if doc.to_dict().get('price')])
-            avg_price = total_price / len(price_records) if price_records else 0
+            avg_price = sum(prices) / len(prices) if prices else 0
             
             # Get min and max prices
-            prices = [doc.to_dict().get('price', 0) for doc in price_records if doc.to_dict().get('price')]
             min_price = min(prices) if prices else 0
             max_price = max(prices) if prices else 0
             
             return {
                 'total_products': total_products,
                 'total_price_records': total_price_records,
+                'total_observations': len(prices),
                 'total_alerts': total_alerts,
                 'avg_price': avg_price,
                 'min_price': min_price,
@@ -316,23 +768,24 @@ class FirebaseManager:
             })
             
             if product_id:
+                # Check for price drops against the price before this one
+                current_price = price_data.get('price')
+                alert = self.check_price_drop(product_id, current_price) if current_price else None
+                if alert:
+                    print(f"💰 Price drop detected: {product_name} - ${alert['old_price']} → ${alert['new_price']} (Save ${alert['savings']:.2f})")
+                
                 # Save price record
-                price_record_id = self.save_price_record(product_id, {
+                self.save_price_record(product_id, {
                     'price': price_data.get('price'),
                     'price_str': price_data.get('price_str'),
                     'unit_price': price_data.get('unit_price'),
+                    'unit_price_basis': price_data.get('unit_price_basis'),
                     'unit_price_str': price_data.get('unit_price_str'),
                     'source_url': price_data.get('source_url'),
-                    'source_selector': price_data.get('source_selector')
+                    'source_selector': price_data.get('source_selector'),
+                    'scraped_at': price_data.get('scraped_at')
                 })
                 
-                # Check for price drops
-                current_price = price_data.get('price')
-                if current_price:
-                    alert = self.check_price_drop(product_id, current_price)
-                    if alert:
-                        print(f"💰 Price drop detected: {product_name} - ${alert['old_price']} → ${alert['new_price']} (Save ${alert['savings']:.2f})")
-                
                 return True
             return False
             
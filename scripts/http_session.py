@@ -0,0 +1,64 @@
+# scripts/http_session.py
+
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Retry and timeout settings (see .env.template)
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '10'))
+RETRY_BACKOFF_FACTOR = float(os.getenv('RETRY_BACKOFF_FACTOR', '0.5'))
+RETRY_BACKOFF_JITTER = float(os.getenv('RETRY_BACKOFF_JITTER', '0.5'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+
+# Rate limiting and server errors are usually transient, so they are retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+def create_session(max_retries=MAX_RETRIES, pool_size=HTTP_POOL_SIZE):
+    """Create a keep-alive session that retries transient failures with backoff"""
+    retry = Retry(
+        total=max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        backoff_jitter=RETRY_BACKOFF_JITTER,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session():
+    """Return the shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def fetch(url, headers=None, timeout=None):
+    """GET a URL through the shared session"""
+    return get_session().get(url, headers=headers, timeout=timeout or REQUEST_TIMEOUT)
@@ -0,0 +1,87 @@
+# scripts/match_cache.py
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+
+MATCH_CACHE_FILE = os.getenv('MATCH_CACHE_FILE', 'data/processed/match_cache.json')
+MATCH_CACHE_SIZE = int(os.getenv('MATCH_CACHE_SIZE', '50000'))
+
+MISS = object()  # a cached decision can itself be None
+
+def tracked_fingerprint(tracked, version=1, keyword_pairs=(), settings=None):
+    """Hash of the tracked list, keyword tables, matcher version and scoring
+    settings (threshold, weights) that cached decisions depend on"""
+    payload = json.dumps({
+        'version': version,
+        'tracked': list(tracked),
+        'keywords': [list(pair) for pair in keyword_pairs],
+        'settings': settings or {}
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class MatchCache:
+    """Size-bounded LRU of product name -> (matched tracked entry, score), kept on disk
+
+    The file records the fingerprint of the tracked list it was built for;
+    a cache written for a different list is ignored, so editing
+    TRACKED_PRODUCTS invalidates it automatically. Hits only reorder the
+    entries in memory; that order is written out with the next new decision,
+    so warm runs that add nothing leave the file alone.
+    """
+
+    def __init__(self, fingerprint, filename=MATCH_CACHE_FILE, max_entries=MATCH_CACHE_SIZE):
+        self.fingerprint = fingerprint
+        self.filename = filename
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # least recently used first
+        self.hits = self.misses = 0
+        self.changed = False
+
+    def load(self):
+        """Read the cache file if it was written for the same tracked list"""
+        if not os.path.exists(self.filename):
+            return self
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return self
+        if data.get('fingerprint') != self.fingerprint:
+            print("🔄 Tracked products changed, starting a new match cache")
+            return self
+        for name, entry, score in data.get('entries', [])[-self.max_entries:]:
+            self.entries[name] = (entry, score)
+        return self
+
+    def get(self, name):
+        """Cached (entry, score) for a name, or MISS"""
+        value = self.entries.get(name, MISS)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(name)
+        return value
+
+    def put(self, name, entry, score=None):
+        self.entries[name] = (entry, score)
+        self.entries.move_to_end(name)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.changed = True
+
+    def save(self):
+        """Write the cache back if anything was added, atomically"""
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        tmp_path = f"{self.filename}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'fingerprint': self.fingerprint,
+                'entries': [[name, entry, score] for name, (entry, score) in self.entries.items()]
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.filename)
+        self.changed = False
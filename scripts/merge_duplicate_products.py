@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# scripts/merge_duplicate_products.py
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from firebase_manager import FirebaseManager
+
+def main():
+    """Merge product documents that are spelling variants of one product"""
+    dry_run = '--dry-run' in sys.argv
+    print("🔁 Merging duplicate products" + (" (dry run)" if dry_run else ""))
+    print("=" * 50)
+
+    try:
+        firebase = FirebaseManager()
+    except Exception as e:
+        print(f"❌ Firebase connection failed: {e}")
+        return False
+
+    duplicates = firebase.merge_duplicate_products(dry_run=dry_run)
+    if dry_run:
+        print(f"📋 {duplicates} duplicate product documents would be merged")
+    else:
+        print(f"✅ Merged {duplicates} duplicate product documents")
+        if duplicates:
+            print("💡 Run scripts/backfill_product_aggregates.py to refresh the merged products' price aggregates")
+    return True
+
+if __name__ == "__main__":
+    main()
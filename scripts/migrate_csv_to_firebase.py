@@ -11,7 +11,9 @@ import logging
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from firebase_manager import FirebaseManager
-from scrape_wee import extract_price_value
+from price_parsing import parse_price_series
+from unit_price import compute_unit_prices
+from price_store import load_price_frame
 
 def migrate_csv_to_firebase():
     """Migrate existing CSV data to Firebase"""
@@ -20,14 +22,18 @@ def migrate_csv_to_firebase():
         firebase = FirebaseManager()
         logger = logging.getLogger(__name__)
         
-        # Read existing CSV
-        csv_file = 'data/processed/wee_prices.csv'
-        if not os.path.exists(csv_file):
-            print(f"❌ CSV file not found: {csv_file}")
+        # Read stored prices (Parquet partitions, or the CSV file before them)
+        df = load_price_frame()
+        if df is None:
+            print("❌ No price data found (data/processed/prices or data/processed/wee_prices.csv)")
             return False
         
-        df = pd.read_csv(csv_file)
-        print(f"📊 Found {len(df)} records in CSV file")
+        print(f"📊 Found {len(df)} stored price records")
+        
+        # Numeric and normalized unit prices for the whole file at once
+        df = df.reset_index(drop=True)
+        price_values = parse_price_series(df['Price'])
+        unit_prices = compute_unit_prices(df['Product Name'], df.get('Unit', pd.Series('', index=df.index)), price_values)
         
         # Track migration progress
         migrated_count = 0
@@ -44,17 +50,14 @@ def migrate_csv_to_firebase():
                 timestamp = row.get('Timestamp', '')
                 source = row.get('Source', '')
                 
-                # Extract price value - handle both string and float prices
-                if isinstance(price_str, str):
-                    price_value = extract_price_value(price_str)
-                else:
-                    price_value = float(price_str) if price_str else None
+                price_value = None if pd.isna(price_values.at[index]) else float(price_values.at[index])
                 
                 # Prepare price data
                 price_data = {
                     'price': price_value,
                     'price_str': price_str,
-                    'unit_price': None,
+                    'unit_price': None if pd.isna(unit_prices.at[index, 'unit_price']) else float(unit_prices.at[index, 'unit_price']),
+                    'unit_price_basis': unit_prices.at[index, 'basis'],
                     'unit_price_str': unit,
                     'source_url': None,
                     'source_selector': source,
@@ -0,0 +1,143 @@
+# scripts/parser_backends.py
+
+import os
+from functools import lru_cache
+from bs4 import BeautifulSoup
+from extraction_engine import CardExtractor, SIMPLE_SELECTOR
+
+# Try to import lxml (bs4's lxml builder and the raw lxml path both need it)
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    from cssselect import GenericTranslator
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# html.parser | lxml (BeautifulSoup on lxml) | lxml-xpath (raw lxml, no soup)
+PARSER_BACKEND = os.getenv('PARSER_BACKEND', 'lxml')
+
+# Text inside these tags is not part of an element's visible text
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+class SoupBackend:
+    """Parse with BeautifulSoup on top of the given tree builder"""
+
+    extractor_class = CardExtractor
+
+    def __init__(self, features):
+        self.name = features
+        self.features = features
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.features)
+
+    def select(self, document, selector):
+        return document.select(selector)
+
+def element_text(el):
+    """Visible text of an lxml element, joined like bs4's get_text(strip=True)"""
+    parts = []
+
+    def walk(node):
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(el)
+    return ''.join(part.strip() for part in parts if part.strip())
+
+@lru_cache(maxsize=None)
+def compile_lxml_selector(selector):
+    """lxml counterpart of extraction_engine.compile_selector"""
+    m = SIMPLE_SELECTOR.match(selector)
+    if not m or not (m.group('tag') or m.group('cls') or m.group('attr')):
+        xpath = etree.XPath(GenericTranslator().css_to_xpath(selector, prefix='self::'))
+        return None, lambda el: bool(xpath(el))
+
+    tag_name, cls = m.group('tag'), m.group('cls')
+    attr, op, value = m.group('attr'), m.group('op'), m.group('value')
+
+    def match(el):
+        if tag_name and el.tag != tag_name:
+            return False
+        if cls:
+            return cls in (el.get('class') or '').split()
+        if attr:
+            actual = el.get(attr)
+            if actual is None:
+                return False
+            if attr == 'class':  # bs4 stores class as a list and rejoins it with single spaces
+                actual = ' '.join(actual.split())
+            return actual == value if op == '=' else bool(value) and value in actual
+        return True
+
+    key = 'class' if cls else attr or tag_name
+    return key, match
+
+class LxmlCardExtractor(CardExtractor):
+    """CardExtractor working directly on lxml.html elements"""
+
+    def compile(self, selector):
+        return compile_lxml_selector(selector)
+
+    def elements(self, item):
+        return (el for el in item.iterdescendants() if isinstance(el.tag, str))
+
+    def keys(self, el):
+        return (el.tag, *el.attrib)
+
+    def text(self, el):
+        return element_text(el)
+
+class LxmlBackend:
+    """Parse with lxml.html and query with XPath compiled from CSS, skipping bs4"""
+
+    name = 'lxml-xpath'
+    extractor_class = LxmlCardExtractor
+
+    def parse(self, html):
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode('utf-8'))
+        except etree.ParserError:
+            return None  # empty document
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def compiled(selector):
+        return CSSSelector(selector, translator='html')
+
+    def select(self, document, selector):
+        if document is None:
+            return []
+        return self.compiled(selector)(document)
+
+def available_backends():
+    """Names of the backends usable in this environment"""
+    names = ['html.parser']
+    if LXML_AVAILABLE:
+        names += ['lxml', 'lxml-xpath']
+    return names
+
+@lru_cache(maxsize=None)
+def get_backend(name=None):
+    """Return the configured parser backend, falling back to html.parser"""
+    name = name or PARSER_BACKEND
+    if name not in ('html.parser', 'lxml', 'lxml-xpath'):
+        print(f"⚠️ Unknown parser backend '{name}', using html.parser")
+        name = 'html.parser'
+    if name != 'html.parser' and not LXML_AVAILABLE:
+        print(f"⚠️ lxml not installed, using html.parser instead of {name}")
+        name = 'html.parser'
+
+    if name == 'lxml-xpath':
+        return LxmlBackend()
+    return SoupBackend(name)
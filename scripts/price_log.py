@@ -0,0 +1,116 @@
+# scripts/price_log.py
+
+import os
+import json
+
+# Compact the change log into the snapshot once it holds this many changes
+PRICE_LOG_COMPACT_LINES = int(os.getenv('PRICE_LOG_COMPACT_LINES', '1000'))
+
+def log_path(snapshot_file):
+    """Change log kept next to a snapshot: price_history.json -> price_history.jsonl"""
+    return f"{os.path.splitext(snapshot_file)[0]}.jsonl"
+
+def write_snapshot(history, snapshot_file):
+    """Write the full history atomically and drop the change log it now contains"""
+    os.makedirs(os.path.dirname(snapshot_file) or '.', exist_ok=True)
+    tmp_path = f"{snapshot_file}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, snapshot_file)
+    # A crash before this point leaves a log whose changes are already in
+    # the snapshot; replaying them again gives the same state
+    if os.path.exists(log_path(snapshot_file)):
+        os.remove(log_path(snapshot_file))
+
+class PriceHistoryLog:
+    """Price history as a JSON snapshot plus an append-only log of changes
+
+    Opening it loads the snapshot and replays the log into an in-memory
+    dict. Recording a price only appends one line when the entry actually
+    changed, so a run costs writes in proportion to its price changes,
+    not to the size of the history. Once the log holds
+    PRICE_LOG_COMPACT_LINES changes, closing the history folds them into a
+    new snapshot.
+    """
+
+    def __init__(self, snapshot_file, compact_lines=PRICE_LOG_COMPACT_LINES):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_path(snapshot_file)
+        self.compact_lines = compact_lines
+        self.entries = {}
+        self.log_lines = 0
+        self.appended = 0
+        self._log = None
+        self._torn = False  # log ends without a newline; start appends on a fresh line
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r') as f:
+                    self.entries = json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                self.entries = {}
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'r') as f:
+            for line in f:
+                self._torn = not line.endswith('\n')
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line torn by a crash mid-write
+                self.log_lines += 1
+                if change.get('deleted'):
+                    self.entries.pop(change['key'], None)
+                else:
+                    self.entries[change['key']] = change['value']
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        return self.entries.get(key, default)
+
+    def _append(self, change):
+        if self._log is None:
+            os.makedirs(os.path.dirname(self.log_file) or '.', exist_ok=True)
+            self._log = open(self.log_file, 'a')
+            if self._torn:
+                self._log.write('\n')
+                self._torn = False
+        self._log.write(json.dumps(change) + '\n')
+        self.log_lines += 1
+        self.appended += 1
+
+    def record(self, key, value):
+        """Set an entry; only appended to the log if it differs from the current one"""
+        if self.entries.get(key) == value:
+            return False
+        self.entries[key] = value
+        self._append({'key': key, 'value': value})
+        return True
+
+    def delete(self, key):
+        if key in self.entries:
+            del self.entries[key]
+            self._append({'key': key, 'deleted': True})
+
+    def compact(self):
+        """Fold the log into a fresh snapshot"""
+        self._close_log()
+        write_snapshot(self.entries, self.snapshot_file)
+        self.log_lines = 0
+
+    def _close_log(self):
+        if self._log is not None:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._log = None
+
+    def close(self):
+        """Make appended changes durable, compacting if the log has grown long enough"""
+        self._close_log()
+        if self.log_lines >= self.compact_lines:
+            self.compact()
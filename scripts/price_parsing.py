@@ -0,0 +1,28 @@
+# scripts/price_parsing.py
+
+import numpy as np
+import pandas as pd
+
+# First amount in a price string: "$1,234.56", "Price: $8.25", "$3.99 - $5.99"
+PRICE_PATTERN = r'(\d[\d,]*(?:\.\d+)?|\.\d+)'
+
+def parse_price_series(prices):
+    """Numeric prices of a whole column at once, NaN where there is no price
+
+    Currency symbols, labels and thousands separators are ignored; a price
+    range counts as its first (lowest listed) amount; 'N/A', 'Free', empty
+    and missing values become NaN. Numbers already parsed pass through, so
+    columns read back from CSV as floats work too.
+
+    A price history repeats the same few price strings over and over, so
+    each distinct string is parsed once and the results are spread back
+    over the column by position.
+    """
+    prices = pd.Series(prices)
+    if pd.api.types.is_numeric_dtype(prices):
+        return prices.astype(float)
+    codes, uniques = pd.factorize(prices, use_na_sentinel=True)
+    amounts = pd.Series(uniques, dtype=object).astype('string').str.extract(PRICE_PATTERN, expand=False)
+    values = pd.to_numeric(amounts.str.replace(',', '', regex=False), errors='coerce').astype(float).to_numpy()
+    parsed = np.append(values, np.nan)[codes]  # code -1 (missing) picks the trailing NaN
+    return pd.Series(parsed, index=prices.index, name=prices.name)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# scripts/price_store.py
+
+import os
+import sys
+import glob
+from datetime import datetime, date, timedelta
+import pandas as pd
+from price_parsing import parse_price_series
+from canonical import canonical_product_key
+from change_detection import LAST_SEEN_FILE, last_seen_times, expand_frame
+
+# pyarrow is optional; without it prices are stored in the CSV file only
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+STORAGE_FORMAT = os.getenv('STORAGE_FORMAT', 'parquet').lower()  # parquet, csv or both
+PRICE_STORE_DIR = os.getenv('PRICE_STORE_DIR', 'data/processed/prices')
+CSV_FILE = "data/processed/wee_prices.csv"
+
+# Column -> pyarrow type; every partition file is written with this schema
+COLUMN_TYPES = {
+    'Product Name': 'string',
+    'Price': 'string',
+    'Price Value': 'float64',
+    'Unit': 'string',
+    'Brand': 'string',
+    'Category': 'string',
+    'Timestamp': 'timestamp',
+    'Source': 'string',
+    'Source URL': 'string',
+    'Tracked Product': 'string',
+    'Match Score': 'float64',
+    'Unit Price': 'float64',
+    'Unit Price Basis': 'string',
+}
+
+def parquet_schema():
+    types = {'string': pa.string(), 'float64': pa.float64(), 'timestamp': pa.timestamp('us')}
+    return pa.schema([(column, types[kind]) for column, kind in COLUMN_TYPES.items()])
+
+def typed_frame(products):
+    """Products as a DataFrame with exactly the stored columns and their types"""
+    df = pd.DataFrame(products)
+    for column in COLUMN_TYPES:
+        if column not in df:
+            df[column] = None
+    df['Price Value'] = pd.to_numeric(df['Price Value'], errors='coerce').fillna(parse_price_series(df['Price']))
+    for column, kind in COLUMN_TYPES.items():
+        if kind == 'string':
+            df[column] = df[column].astype(object).where(df[column].notna(), None)
+            df[column] = df[column].map(lambda value: value if value is None else str(value))
+        elif kind == 'float64':
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
+        else:
+            df[column] = pd.to_datetime(df[column], errors='coerce', format='ISO8601').astype('datetime64[us]')
+    return df[list(COLUMN_TYPES)]
+
+def partition_dir(day, root=PRICE_STORE_DIR):
+    return os.path.join(root, f"date={day.isoformat()}")
+
+def partition_day(path):
+    """Date of a date=YYYY-MM-DD partition directory, or None"""
+    name = os.path.basename(os.path.normpath(path))
+    try:
+        return date.fromisoformat(name.split('=', 1)[1]) if name.startswith('date=') else None
+    except ValueError:
+        return None
+
+def write_partitions(products, root=PRICE_STORE_DIR):
+    """Write products as one new Parquet file per day they were scraped
+
+    Existing files are never rewritten; each run adds its own part file to
+    the partitions of the days it covers. Returns the paths written.
+    """
+    df = typed_frame(products)
+    df = df[df['Timestamp'].notna()]
+    run_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    written = []
+    for day, rows in df.groupby(df['Timestamp'].dt.date):
+        directory = partition_dir(day, root)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{run_id}.parquet")
+        table = pa.Table.from_pandas(rows, schema=parquet_schema(), preserve_index=False)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+def partition_files(start=None, end=None, root=PRICE_STORE_DIR):
+    """Part files of the partitions between start and end (inclusive), oldest first
+
+    Partitions outside the range are skipped by their directory name alone,
+    so a query over recent days never opens older files.
+    """
+    files = []
+    for directory in sorted(glob.glob(os.path.join(root, 'date=*'))):
+        day = partition_day(directory)
+        if day is None or (start and day < start) or (end and day > end):
+            continue
+        files.extend(sorted(glob.glob(os.path.join(directory, 'part-*.parquet'))))
+    return files
+
+def as_date(value):
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value))
+
+def read_prices(start=None, end=None, days=None, columns=None, root=PRICE_STORE_DIR):
+    """Stored price rows scraped between start and end (dates or 'YYYY-MM-DD'), or in the last `days` days"""
+    start, end = as_date(start), as_date(end)
+    if days is not None:
+        start = date.today() - timedelta(days=days - 1)
+    files = partition_files(start, end, root) if PARQUET_AVAILABLE else []
+    if not files:
+        return pd.DataFrame(columns=columns or list(COLUMN_TYPES))
+    table = pa.concat_tables(pq.read_table(path, columns=columns, schema=parquet_schema()) for path in files)
+    return table.to_pandas()
+
+def has_partitions(root=PRICE_STORE_DIR):
+    return PARQUET_AVAILABLE and bool(glob.glob(os.path.join(root, 'date=*', 'part-*.parquet')))
+
+def carry_in_rows(start, keys, root=PRICE_STORE_DIR):
+    """Last row before start of each product in keys, read from the newest partitions back
+
+    With only price changes stored, a product's price at the start of a
+    window can come from a row written long before it; older partitions
+    are only opened until every product has been found.
+    """
+    missing, rows = set(keys), []
+    for path in reversed(partition_files(end=start - timedelta(days=1), root=root)):
+        if not missing:
+            break
+        df = pq.read_table(path, schema=parquet_schema()).to_pandas()
+        df = df.sort_values('Timestamp', kind='stable').assign(_key=df['Product Name'].map(canonical_product_key))
+        df = df[df['_key'].isin(missing)].drop_duplicates('_key', keep='last')
+        missing -= set(df['_key'])
+        rows.append(df.drop(columns='_key'))
+    return pd.concat(rows, ignore_index=True) if rows else None
+
+def load_price_frame(days=None, root=PRICE_STORE_DIR, csv_file=CSV_FILE, expand=False, last_seen_file=LAST_SEEN_FILE):
+    """Price rows for analysis: the Parquet store if it has data, else the CSV file
+
+    With expand, stored price changes are expanded back into regular
+    observations that run up to each product's last-seen time (see
+    change_detection), so analysis sees every run, not only the changes.
+    """
+    start = date.today() - timedelta(days=days - 1) if days is not None else None
+    last_seen = last_seen_times(last_seen_file) if expand else {}
+    if has_partitions(root):
+        df = read_prices(start=start, root=root)
+        if expand and start is not None:
+            carried = carry_in_rows(start, last_seen, root)
+            if carried is not None:
+                df = pd.concat([carried, df], ignore_index=True)
+    elif os.path.exists(csv_file):
+        df = pd.read_csv(csv_file)
+    else:
+        return None
+    if expand:
+        df = expand_frame(df, last_seen)
+    if start is not None:
+        timestamps = pd.to_datetime(df['Timestamp'], errors='coerce', format='ISO8601')
+        df = df[timestamps.dt.date >= start].reset_index(drop=True)
+    return df
+
+def save_products(products, csv_writer=None, root=PRICE_STORE_DIR):
+    """Store a run's products in the configured format(s)
+
+    csv_writer is the CSV append function; it is also used when Parquet
+    is selected but pyarrow is not installed.
+    """
+    use_parquet = STORAGE_FORMAT in ('parquet', 'both') and PARQUET_AVAILABLE
+    if STORAGE_FORMAT in ('parquet', 'both') and not PARQUET_AVAILABLE:
+        print("⚠️ pyarrow not installed, storing prices in CSV instead")
+    if use_parquet and products:
+        paths = write_partitions(products, root)
+        print(f"✅ Saved {len(products)} products to {len(paths)} partition(s) in {root}")
+    if (not use_parquet or STORAGE_FORMAT == 'both') and csv_writer:
+        csv_writer(products)
+
+def export_csv(filename, start=None, end=None, root=PRICE_STORE_DIR):
+    """Write stored rows (optionally a date range) to a CSV file"""
+    df = read_prices(start, end, root=root)
+    df.to_csv(filename, index=False)
+    print(f"✅ Exported {len(df)} rows to {filename}")
+
+def import_csv(filename, root=PRICE_STORE_DIR):
+    """Load an existing CSV price file into the partitioned store"""
+    df = pd.read_csv(filename)
+    paths = write_partitions(df.to_dict('records'), root)
+    print(f"✅ Imported {len(df)} rows from {filename} into {len(paths)} partition(s)")
+
+def summary(root=PRICE_STORE_DIR, latest=5):
+    """Row counts from file metadata, plus the latest products from the newest partition only"""
+    files = partition_files(root=root)
+    if not files:
+        print("No Parquet price data found")
+        return
+    rows = sum(pq.ParquetFile(path).metadata.num_rows for path in files)
+    size = sum(os.path.getsize(path) for path in files)
+    days = sorted({partition_day(os.path.dirname(path)) for path in files})
+    print(f"Parquet store: {len(days)} days, {len(files)} files, {size / 1024:.1f} KB")
+    print(f"Total records: {rows}")
+    print("Latest products found:")
+    newest = read_prices(start=days[-1], end=days[-1], root=root).tail(latest)
+    for _, row in newest.iterrows():
+        print(f"  • {row['Product Name']} - {row['Price']}")
+
+if __name__ == "__main__":
+    # python scripts/price_store.py import|export|summary ...
+    if not PARQUET_AVAILABLE:
+        print("❌ pyarrow is required: pip install pyarrow")
+        sys.exit(1)
+    command = sys.argv[1] if len(sys.argv) > 1 else 'summary'
+    if command == 'import':
+        import_csv(sys.argv[2] if len(sys.argv) > 2 else CSV_FILE)
+    elif command == 'export' and len(sys.argv) > 2:
+        # The scraper appends to CSV_FILE; an export must never replace it
+        if os.path.abspath(sys.argv[2]) == os.path.abspath(CSV_FILE):
+            print(f"❌ Refusing to overwrite {CSV_FILE}, export to another file")
+            sys.exit(1)
+        export_csv(sys.argv[2],
+                   sys.argv[3] if len(sys.argv) > 3 else None,
+                   sys.argv[4] if len(sys.argv) > 4 else None)
+    elif command == 'summary':
+        summary()
+    else:
+        print("Usage: price_store.py import [csv] | export csv [start] [end] | summary")
+        sys.exit(1)
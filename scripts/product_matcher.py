@@ -0,0 +1,268 @@
+# scripts/product_matcher.py
+
+import os
+import re
+import json
+from collections import Counter
+import numpy as np
+
+# scipy is optional; batch matching falls back to dense NumPy blocks without it
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Bump when matching rules change, so cached match decisions are dropped
+MATCHER_VERSION = 2
+
+# Cards scoring below this are not tracked products
+MATCH_THRESHOLD = float(os.getenv('MATCH_THRESHOLD', '0.6'))
+# Tracked entries re-scored per card, taken from the best trigram similarities
+MATCH_CANDIDATES = 10
+# Weight of character similarity against word overlap
+TRIGRAM_WEIGHT = 0.5
+# Score multiplier for each brand/product-type keyword a tracked entry calls for that the card lacks
+KEYWORD_MISMATCH_PENALTY = 0.7
+
+WORD_PATTERN = re.compile(r"[\w.'-]+")
+
+# Brand and product-type keyword tables: {table: [[keyword in tracked name, keyword in scraped name], ...]}
+MATCH_KEYWORDS_FILE = os.getenv(
+    'MATCH_KEYWORDS_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'match_keywords.json')
+)
+
+def load_keyword_tables(filename=MATCH_KEYWORDS_FILE):
+    """Keyword pair tables from the config file, in file order"""
+    try:
+        with open(filename, 'r') as f:
+            tables = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        print(f"⚠️ Could not load match keywords from {filename}: {e}")
+        return {}
+    return {
+        table: [
+            (tracked_keyword.lower(), product_keyword.lower())
+            for tracked_keyword, product_keyword in pairs
+            if tracked_keyword and product_keyword
+        ]
+        for table, pairs in tables.items()
+    }
+
+class KeywordAutomaton:
+    """Find every keyword occurring in a text with one regex scan
+
+    The keywords are compiled into a single alternation inside a lookahead,
+    longest first, so the scan reports the longest keyword starting at each
+    position without consuming it. Shorter keywords contained in a hit are
+    added from a precomputed table, which makes the result the full set of
+    keywords that are substrings of the text.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.contained = {k: {other for other in self.keywords if other in k} for k in self.keywords}
+        alternation = '|'.join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        self.pattern = re.compile(f'(?=({alternation}))') if self.keywords else None
+
+    def find(self, text):
+        """Set of keywords occurring in text"""
+        hits = set()
+        if self.pattern is None:
+            return hits
+        for longest in set(self.pattern.findall(text)):
+            hits |= self.contained[longest]
+        return hits
+
+# Tracked entries scored per dense block when scipy is not installed
+DENSE_BLOCK_ROWS = 2048
+# Subtracted per tracked index when ranking, so equal similarities keep the earlier
+# entry on both the scipy and NumPy paths (far above float rounding, far below real gaps)
+TIE_BREAK = 1e-12
+
+def trigrams(text):
+    """Character trigram counts of a name, padded so word starts and ends count"""
+    padded = f"  {' '.join(text.lower().split())} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+class TrigramIndex:
+    """L2-normalized character trigram vectors of the tracked names
+
+    Scoring a batch of scraped names is a single sparse matrix product,
+    whose entries are the cosine similarities between every scraped and
+    every tracked name.
+    """
+
+    def __init__(self, names):
+        self.vocabulary = {}
+        rows, cols, vals = [], [], []
+        for row, name in enumerate(names):
+            counts = trigrams(name)
+            norm = sum(c * c for c in counts.values()) ** 0.5 or 1.0
+            for gram, count in counts.items():
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+                vals.append(count / norm)
+        self.shape = (len(names), len(self.vocabulary))
+        self.rows = np.array(rows, dtype=np.int64)
+        self.cols = np.array(cols, dtype=np.int64)
+        self.vals = np.array(vals, dtype=np.float64)
+        self.matrix = sparse.csr_matrix((self.vals, (self.rows, self.cols)), shape=self.shape) if SCIPY_AVAILABLE else None
+
+    def vectorize(self, names):
+        """Sparse (rows, cols, vals) of names over the tracked vocabulary
+
+        Trigrams no tracked name has cannot add to a dot product, so they are
+        dropped after counting towards the vector's norm.
+        """
+        rows, cols, vals = [], [], []
+        for row, name in enumerate(names):
+            counts = trigrams(name)
+            norm = sum(c * c for c in counts.values()) ** 0.5 or 1.0
+            for gram, count in counts.items():
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    vals.append(count / norm)
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(vals, dtype=np.float64)
+
+    def top_matches(self, names, k=MATCH_CANDIDATES):
+        """The k most similar tracked names for every name, as [(index, cosine), ...] best first"""
+        rows, cols, vals = self.vectorize(names)
+        if not len(names) or not self.shape[0] or not len(vals):
+            return [[] for _ in names]
+
+        if SCIPY_AVAILABLE and self.matrix is not None:
+            queries = sparse.csr_matrix((vals, (rows, cols)), shape=(len(names), self.shape[1]))
+            scores = (queries @ self.matrix.T).tocsr()
+            top = []
+            for r in range(len(names)):
+                start, end = scores.indptr[r], scores.indptr[r + 1]
+                data, indices = scores.data[start:end], scores.indices[start:end]
+                ranked = data - indices * TIE_BREAK
+                if len(data) > k:
+                    keep = np.argpartition(-ranked, k - 1)[:k]
+                    data, indices, ranked = data[keep], indices[keep], ranked[keep]
+                order = np.argsort(-ranked)
+                top.append([(int(indices[j]), float(data[j])) for j in order if data[j] > 0])
+            return top
+
+        # Dense fallback restricted to the trigrams these names actually use
+        used, local_cols = np.unique(cols, return_inverse=True)
+        queries = np.zeros((len(names), len(used)))
+        queries[rows, local_cols] = vals
+        lookup = np.full(self.shape[1], -1, dtype=np.int64)
+        lookup[used] = np.arange(len(used))
+        keep = lookup[self.cols] >= 0
+        t_rows, t_cols, t_vals = self.rows[keep], lookup[self.cols[keep]], self.vals[keep]
+
+        best = np.zeros((len(names), 0), dtype=np.int64)
+        best_scores = np.zeros((len(names), 0))
+        for start in range(0, self.shape[0], DENSE_BLOCK_ROWS):
+            stop = min(start + DENSE_BLOCK_ROWS, self.shape[0])
+            in_block = (t_rows >= start) & (t_rows < stop)
+            block = np.zeros((stop - start, len(used)))
+            block[t_rows[in_block] - start, t_cols[in_block]] = t_vals[in_block]
+            scores = queries @ block.T
+            ranked = scores - np.arange(start, stop) * TIE_BREAK
+            if scores.shape[1] > k:
+                block_top = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+            else:
+                block_top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best = np.hstack([best, block_top + start])
+            best_scores = np.hstack([best_scores, np.take_along_axis(scores, block_top, axis=1)])
+            if best.shape[1] > k:
+                keep_top = np.argpartition(-(best_scores - best * TIE_BREAK), k - 1, axis=1)[:, :k]
+                best = np.take_along_axis(best, keep_top, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep_top, axis=1)
+
+        top = []
+        for indices, data in zip(best, best_scores):
+            order = np.argsort(-(data - indices * TIE_BREAK))
+            top.append([(int(indices[j]), float(data[j])) for j in order if data[j] > 0])
+        return top
+
+class ProductMatcher:
+    """Assign scraped product names to their best tracked product, with a confidence
+
+    For each scraped name the tracked entries with the most similar
+    character trigrams are re-scored by blending that similarity with the
+    word overlap (Dice coefficient) of the two names. The keyword tables
+    then act as agreement checks: every brand or product-type keyword a
+    tracked entry calls for that the scraped name lacks costs a penalty,
+    so a generic word like 'rice' or 'dal' no longer ties every rice on the
+    page to a tracked rice. The best entry is kept if its score reaches
+    the threshold.
+    """
+
+    def __init__(self, tracked, keyword_tables=None, threshold=MATCH_THRESHOLD):
+        self.tracked = list(tracked)
+        self.names = [entry.lower() for entry in self.tracked]
+        self.words = [set(WORD_PATTERN.findall(name)) for name in self.names]
+        self.threshold = threshold
+        self.keyword_tables = load_keyword_tables() if keyword_tables is None else dict(keyword_tables)
+        self.keyword_pairs = [pair for pairs in self.keyword_tables.values() for pair in pairs]
+        self.trigram_index = None  # built on the first match
+
+        # Per tracked entry and table, the scraped-name keywords the entry calls for
+        tracked_automaton = KeywordAutomaton(t for t, _ in self.keyword_pairs)
+        self.expected = []
+        for name in self.names:
+            found = tracked_automaton.find(name)
+            self.expected.append([
+                {p for t, p in pairs if t in found} for pairs in self.keyword_tables.values()
+            ])
+        self.automaton = KeywordAutomaton(p for _, p in self.keyword_pairs)
+
+    @property
+    def settings(self):
+        """Scoring settings a cached match decision depends on"""
+        return {
+            'threshold': self.threshold,
+            'candidates': MATCH_CANDIDATES,
+            'trigram_weight': TRIGRAM_WEIGHT,
+            'keyword_mismatch_penalty': KEYWORD_MISMATCH_PENALTY
+        }
+
+    def score(self, i, similarity, words, keywords):
+        """Confidence that a scraped name (its words and keyword hits) is tracked entry i"""
+        tracked_words = self.words[i]
+        total = len(tracked_words) + len(words)
+        overlap = 2 * len(tracked_words & words) / total if total else 0.0
+        score = TRIGRAM_WEIGHT * similarity + (1 - TRIGRAM_WEIGHT) * overlap
+        for expected in self.expected[i]:
+            score *= KEYWORD_MISMATCH_PENALTY ** len(expected - keywords)
+        return min(score, 1.0)
+
+    def match_batch(self, product_names):
+        """Best tracked entry and score for every name of a page at once
+
+        Returns (entry, score) pairs in the order of product_names; entry is
+        None when the best score is below the threshold.
+        """
+        if self.trigram_index is None:
+            self.trigram_index = TrigramIndex(self.names)
+        names = [(name or "").lower() for name in product_names]
+        results = []
+        for name, candidates in zip(names, self.trigram_index.top_matches(names)):
+            if not candidates:
+                results.append((None, 0.0))
+                continue
+            words, keywords = set(WORD_PATTERN.findall(name)), self.automaton.find(name)
+            best, best_score = None, -1.0
+            for i, similarity in candidates:
+                score = self.score(i, similarity, words, keywords)
+                if score > best_score:
+                    best, best_score = i, score
+            best_score = round(best_score, 4)
+            results.append((self.tracked[best] if best_score >= self.threshold else None, best_score))
+        return results
+
+    def match(self, product_name):
+        """The tracked entry a product name is assigned to (or None) and its score"""
+        return self.match_batch([product_name])[0]
+
+    def is_tracked(self, product_name):
+        return self.match(product_name)[0] is not None
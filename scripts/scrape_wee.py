@@ -2,17 +2,40 @@
 # scripts/scrape_wee.py
 
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 import os
+import sys
 import time
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import re
 import json
-from difflib import SequenceMatcher
+from crawler import crawl_catalog, content_hash
+from http_session import fetch
+from fetch_state import (
+    load_fetch_state, save_fetch_state, conditional_headers, record_fetch, record_parse, known_products
+)
+from snapshot_archive import SNAPSHOT_ENABLED, archive_pages, load_snapshot_runs
+from extraction_engine import (
+    CONTAINER_SELECTORS, NAME_SELECTORS, PRICE_SELECTORS, UNIT_PRICE_SELECTORS
+)
+from selector_profile import (
+    load_selector_profiles, save_selector_profiles, profile_key,
+    ordered_selectors, update_profile, SelectorHits
+)
+from parser_backends import get_backend
+from embedded_data import extract_embedded_products
+from product_matcher import ProductMatcher, MATCHER_VERSION
+from match_cache import MatchCache, MISS, tracked_fingerprint
+from canonical import canonical_product_key
+from unit_price import compute_unit_prices
+from price_parsing import parse_price_series
+from price_store import save_products
+from sqlite_store import SQLiteManager
+from price_log import PriceHistoryLog, write_snapshot
+from change_detection import STORE_CHANGES_ONLY, ChangeDetector
 
 # Try to import Firebase manager
 try:
@@ -156,119 +179,93 @@ if os.getenv('DEBUG_MODE', 'false').lower() == 'true':
 # 📌 Updated URL to a valid product category page
 BASE_URL = os.getenv('BASE_URL', "https://www.sayweee.com/en/category/sale")  # Deals/Sale page
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1"
-}
+# 📌 Category listings to crawl besides BASE_URL (every page of each is fetched)
+category_urls_str = os.getenv('CATEGORY_URLS', '[]')
+try:
+    CATEGORY_URLS = [BASE_URL] + [url for url in json.loads(category_urls_str) if url != BASE_URL]
+except json.JSONDecodeError:
+    CATEGORY_URLS = [BASE_URL]
+
+# 📌 Parse every product card on a page, within a per-page time and size budget
+PARSE_FULL_PAGE = os.getenv('PARSE_FULL_PAGE', 'true').lower() == 'true'
+PARSE_TIME_BUDGET_SECONDS = float(os.getenv('PARSE_TIME_BUDGET_SECONDS', '10'))
+PARSE_MAX_PAGE_CHARS = int(os.getenv('PARSE_MAX_PAGE_CHARS', '5000000'))
+PARSE_CARD_LIMIT = 30  # Cards read per selector when full-page mode is off
+PARSE_MATCH_CHUNK = 50  # Cards read and matched between time budget checks
+
+# 📌 Where prices and drops are tracked without Firebase: sqlite (indexed database) or json (price_history.json)
+LOCAL_STORE = os.getenv('LOCAL_STORE', 'sqlite').lower()
+
+# Columns written to the CSV file, in order
+CSV_COLUMNS = ["Product Name", "Price", "Unit", "Brand", "Category", "Timestamp", "Source"]
+
+_product_matcher = None
+_product_matcher_source = None
+_match_cache = None
+_match_cache_source = None
+_firebase_manager = None
 
-def similar(a, b):
-    """Calculate similarity between two strings"""
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+def get_product_matcher():
+    """The matcher for TRACKED_PRODUCTS, rebuilt if the list is replaced"""
+    global _product_matcher, _product_matcher_source
+    if _product_matcher is None or _product_matcher_source is not TRACKED_PRODUCTS:
+        _product_matcher = ProductMatcher(TRACKED_PRODUCTS)
+        _product_matcher_source = TRACKED_PRODUCTS
+    return _product_matcher
+
+def get_match_cache():
+    """The on-disk match cache for the current TRACKED_PRODUCTS"""
+    global _match_cache, _match_cache_source
+    if _match_cache is None or _match_cache_source is not TRACKED_PRODUCTS:
+        flush_match_cache()
+        matcher = get_product_matcher()
+        fingerprint = tracked_fingerprint(TRACKED_PRODUCTS, MATCHER_VERSION, matcher.keyword_pairs, matcher.settings)
+        _match_cache = MatchCache(fingerprint).load()
+        _match_cache_source = TRACKED_PRODUCTS
+    return _match_cache
+
+def match_products(product_names):
+    """(tracked entry or None, score) for each name, using remembered decisions where possible
+
+    Names not decided on an earlier run are scored together in one batch.
+    """
+    cache = get_match_cache()
+    keys = [(name or "").lower() for name in product_names]
+    results = {}
+    pending = []  # names to score, in page order
+    pending_keys = set()
+    for key in keys:
+        if key in results or key in pending_keys:
+            continue
+        cached = cache.get(key) if key else (None, 0.0)
+        if cached is MISS:
+            pending.append(key)
+            pending_keys.add(key)
+        else:
+            results[key] = tuple(cached)
+    
+    if pending:
+        for key, (entry, score) in zip(pending, get_product_matcher().match_batch(pending)):
+            cache.put(key, entry, score)
+            results[key] = (entry, score)
+    return [results[key] for key in keys]
+
+def match_product(product_name):
+    """The tracked entry a product name is assigned to (or None) and the match score"""
+    return match_products([product_name])[0]
+
+def flush_match_cache():
+    """Save match decisions made during this run"""
+    if _match_cache is not None:
+        if _match_cache.hits or _match_cache.misses:
+            print(f"🧠 Match cache: {_match_cache.hits} hits, {_match_cache.misses} misses")
+        _match_cache.save()
 
 def is_tracked_product(product_name):
     """Check if a product name matches any tracked product (with fuzzy matching)"""
     if not product_name:
         return False
-    
-    for tracked in TRACKED_PRODUCTS:
-        # Exact match or high similarity (>0.6 for more flexible matching)
-        if tracked.lower() == product_name.lower() or similar(tracked, product_name) > 0.6:
-            return True
-        
-        # Check if key words match
-        tracked_words = set(tracked.lower().split())
-        product_words = set(product_name.lower().split())
-        
-        # If more than 40% of words match, consider it a match
-        common_words = tracked_words.intersection(product_words)
-        if len(common_words) >= len(tracked_words) * 0.4:
-            return True
-        
-        # Check for specific brand/product keywords
-        brand_keywords = [
-            ('maggi', 'maggi'),
-            ('lee kum', 'lee kum'),
-            ('soy sauce', 'soy'),
-            ('noodles', 'noodles'),
-            ('barramundi', 'barramundi'),
-            ('tsf', 'tsf'),
-            ('laxmi', 'laxmi'),
-            ('deep', 'deep'),
-            ('aashirvaad', 'aashirvaad'),
-            ('india gate', 'india gate'),
-            ('regal', 'regal'),
-            ('pavel', 'pavel'),
-            ('amul', 'amul'),
-            ('vadilal', 'vadilal'),
-            ('nanak', 'nanak'),
-            ('garvi gujarat', 'garvi'),
-            ('kurkure', 'kurkure'),
-            ('lay', 'lay'),
-            ('ching', 'ching'),
-            ('aara', 'aara'),
-            ('shastha', 'shastha'),
-            ('franco', 'franco')
-        ]
-        
-        for tracked_keyword, product_keyword in brand_keywords:
-            if tracked_keyword in tracked.lower() and product_keyword in product_name.lower():
-                return True
-        
-        # Check for specific product type keywords
-        product_type_keywords = [
-            ('paneer', 'paneer'),
-            ('ghee', 'ghee'),
-            ('yogurt', 'yogurt'),
-            ('rice', 'rice'),
-            ('flour', 'flour'),
-            ('atta', 'atta'),
-            ('besan', 'besan'),
-            ('dal', 'dal'),
-            ('chana', 'chana'),
-            ('urad', 'urad'),
-            ('moong', 'moong'),
-            ('toor', 'toor'),
-            ('sabudana', 'sabudana'),
-            ('poha', 'poha'),
-            ('paratha', 'paratha'),
-            ('naan', 'naan'),
-            ('thepla', 'thepla'),
-            ('phulka', 'phulka'),
-            ('dosa', 'dosa'),
-            ('idli', 'idli'),
-            ('chakri', 'chakri'),
-            ('chips', 'chips'),
-            ('cumin', 'cumin'),
-            ('eggplant', 'eggplant'),
-            ('okra', 'okra'),
-            ('onion', 'onion'),
-            ('tomato', 'tomato'),
-            ('ginger', 'ginger'),
-            ('garlic', 'garlic'),
-            ('cabbage', 'cabbage'),
-            ('cucumber', 'cucumber'),
-            ('potato', 'potato'),
-            ('bell pepper', 'pepper'),
-            ('squash', 'squash'),
-            ('beans', 'beans'),
-            ('carrot', 'carrot'),
-            ('cilantro', 'cilantro'),
-            ('curry leaves', 'curry'),
-            ('mint', 'mint'),
-            ('banana', 'banana'),
-            ('chilies', 'chili'),
-            ('chilli', 'chili')
-        ]
-        
-        for tracked_keyword, product_keyword in product_type_keywords:
-            if tracked_keyword in tracked.lower() and product_keyword in product_name.lower():
-                return True
-    
-    return False
+    return match_product(product_name)[0] is not None
 
 def extract_price_value(price_str):
     """Extract numeric price value from price string"""
@@ -284,33 +281,30 @@ def extract_price_value(price_str):
             return None
     return None
 
-def load_price_history(filename="data/processed/price_history.json"):
-    """Load historical price data"""
-    if os.path.exists(filename):
-        try:
-            with open(filename, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
-    return {}
-
-def save_price_history(history, filename="data/processed/price_history.json"):
-    """Save historical price data"""
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as f:
-        json.dump(history, f, indent=2)
+PRICE_HISTORY_FILE = "data/processed/price_history.json"
+
+def load_price_history(filename=PRICE_HISTORY_FILE):
+    """Load historical price data (snapshot plus logged changes)"""
+    return PriceHistoryLog(filename).entries
+
+def save_price_history(history, filename=PRICE_HISTORY_FILE):
+    """Replace the whole price history with a new snapshot"""
+    write_snapshot(history, filename)
+
+def get_firebase_manager():
+    """One FirebaseManager per process, so its product and latest-price cache is shared"""
+    global _firebase_manager
+    if _firebase_manager is None:
+        _firebase_manager = FirebaseManager()
+    return _firebase_manager
 
 def get_latest_price_firebase(product_name):
     """Get latest price from Firebase"""
     if FIREBASE_ENABLED:
         try:
-            firebase = FirebaseManager()
-            # Get product ID first
-            products = firebase.get_tracked_products()
-            for product in products:
-                if product['name'] == product_name:
-                    return firebase.get_latest_price(product['id'])
-            return None
+            firebase = get_firebase_manager()
+            product_id = firebase.get_product_id(product_name)
+            return firebase.get_latest_price(product_id) if product_id else None
         except Exception as e:
             print(f"⚠️ Error getting price from Firebase: {e}")
             return None
@@ -320,39 +314,48 @@ def save_price_to_firebase(product_name, price_data):
     """Save price data to Firebase"""
     if FIREBASE_ENABLED:
         try:
-            firebase = FirebaseManager()
-            # Save or get product
-            product_id = firebase.save_product({
-                'name': product_name,
-                'brand': price_data.get('brand'),
-                'category': price_data.get('category'),
-                'unit_size': price_data.get('unit')
-            })
-            
-            if product_id:
-                # Save price record
-                firebase.save_price_record(product_id, {
-                    'price': price_data.get('price'),
-                    'price_str': price_data.get('price_str'),
-                    'unit_price': price_data.get('unit_price'),
-                    'unit_price_str': price_data.get('unit_price_str'),
-                    'source_url': price_data.get('source_url'),
-                    'source_selector': price_data.get('source_selector')
-                })
-                
-                # Check for price drops
-                current_price = price_data.get('price')
-                if current_price:
-                    alert = firebase.check_price_drop(product_id, current_price)
-                    if alert:
-                        print(f"💰 Price drop detected: {product_name} - ${alert['old_price']} → ${alert['new_price']} (Save ${alert['savings']:.2f})")
-                
-                return True
+            return get_firebase_manager().save_price_to_firebase(product_name, price_data)
         except Exception as e:
             print(f"⚠️ Error saving to Firebase: {e}")
             return False
     return False
 
+def saved_products(products, saved):
+    """The products whose (product_name, price_data) records a store reports as saved"""
+    saved_keys = {canonical_product_key(product_name) for product_name, _ in saved}
+    return [product for product in products if canonical_product_key(product['Product Name']) in saved_keys]
+
+def save_prices_to_firebase(products, check_drops=True):
+    """Save a whole run's prices to Firebase with batched reads and writes; returns the products saved"""
+    try:
+        firebase = get_firebase_manager()
+        saved, alerts = firebase.save_prices_bulk([(product['Product Name'], price_record(product)) for product in products],
+                                                  check_drops)
+    except Exception as e:
+        print(f"⚠️ Error saving to Firebase: {e}")
+        return []
+    for alert in alerts:
+        print(f"💰 Price drop detected: {alert['product_name']} - ${alert['old_price']} → ${alert['new_price']} (Save ${alert['savings']:.2f})")
+    return saved_products(products, saved)
+
+def save_prices_to_sqlite(products, check_drops=True):
+    """Store prices in the local SQLite database and alert on drops; returns the products saved"""
+    store = SQLiteManager()
+    try:
+        saved, alerts = store.save_prices([(product['Product Name'], price_record(product)) for product in products],
+                                          check_drops)
+    finally:
+        store.close()
+    for alert in alerts:
+        send_price_alert(alert['product_name'], alert['old_price'], alert['new_price'])
+    
+    print(f"🗄️ Saved {len(saved)} products to the SQLite price store")
+    if alerts:
+        print(f"📧 Sent {len(alerts)} price drop alert(s)")
+    elif check_drops:
+        print("💰 No price drops detected for tracked products")
+    return saved_products(products, saved)
+
 def send_price_alert(product_name, old_price, new_price, email_config=None):
     """Send email alert for price drop to multiple recipients"""
     try:
@@ -476,223 +479,376 @@ def send_single_email(product_name, old_price, new_price, savings_amount, saving
     return True
 
 def check_price_drops(products):
-    """Check for price drops and send alerts"""
+    """Check for price drops and send alerts; returns the products recorded, none if the history could not be written"""
     if not products:
-        return
+        return []
     
-    history = load_price_history()
-    alerts_sent = 0
+    try:
+        history = PriceHistoryLog(PRICE_HISTORY_FILE)
+        alerts_sent = record_price_history(history, products)
+        history.close()
+    except OSError as e:
+        print(f"❌ Error writing the price history: {e}")
+        return []
     
+    if alerts_sent > 0:
+        print(f"📧 Sent {alerts_sent} price drop alert(s)")
+    else:
+        print("💰 No price drops detected for tracked products")
+    return products
+
+def record_price_history(history, products):
+    """Append the products' new prices to the history log, alerting on drops; returns the alerts sent"""
+    alerts_sent = 0
     for product in products:
         name = product['Product Name']
+        key = canonical_product_key(name)
         price_str = product['Price']
         current_price = extract_price_value(price_str)
         
         if not current_price:
             continue
-            
+        
+        # History written before canonical keys is keyed on the exact name
+        if key not in history and name in history:
+            history.record(key, history.get(name))
+            history.delete(name)
+        
         # Check if we have historical data for this product
-        if name in history:
-            last_price = history[name].get('price')
+        last = history.get(key)
+        if last:
+            last_price = last.get('price')
             if last_price and current_price < last_price:
                 # Price dropped!
                 send_price_alert(name, last_price, current_price)
                 alerts_sent += 1
+            if last_price == current_price and last.get('price_str') == price_str:
+                continue  # unchanged; the entry keeps the time this price was first seen
         
-        # Update price history
-        history[name] = {
+        # Record the new price (one log line, not a rewrite of the history)
+        history.record(key, {
+            'name': name,
             'price': current_price,
             'timestamp': product['Timestamp'],
             'price_str': price_str
-        }
-    
-    # Save updated history
-    save_price_history(history)
-    
-    if alerts_sent > 0:
-        print(f"📧 Sent {alerts_sent} price drop alert(s)")
-    else:
-        print("💰 No price drops detected for tracked products")
+        })
+    return alerts_sent
 
-def fetch_html(url):
+def fetch_page(url, fetch_state=None, match_fingerprint=None):
+    """Fetch a page with a conditional GET and report whether it needs parsing
+
+    A page last parsed under another match cache fingerprint (tracked
+    products, keywords or match settings) is fetched in full and reported
+    as changed even if its content is the same.
+    """
+    entry = (fetch_state or {}).get(url, {})
+    page = {'url': url, 'status': None, 'html': None, 'content_hash': None, 'changed': False,
+            'fetched_at': datetime.now().isoformat()}
+    stale = match_fingerprint is not None and entry.get('match_fingerprint') != match_fingerprint
+    
     try:
         print(f"Fetching URL: {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = fetch(url, headers={} if stale else conditional_headers(entry))
         print(f"Response status: {response.status_code}")
+        page['status'] = response.status_code
+        
+        if response.status_code == 304:
+            # Not modified since the last run, the stored hash still describes it
+            page['content_hash'] = entry.get('content_hash')
+            return page
+        
         response.raise_for_status()
-        return response.text
     except requests.exceptions.RequestException as e:
         print(f"❌ Error fetching {url}: {e}")
+        return page
+    
+    page['html'] = response.text
+    page['content_hash'] = content_hash(page['html'])
+    page['changed'] = stale or page['content_hash'] != entry.get('content_hash')
+    
+    if fetch_state is not None:
+        record_fetch(fetch_state, url, response, page['content_hash'])
+    
+    return page
+
+def fetch_html(url):
+    """Fetch a page unconditionally and return its HTML"""
+    return fetch_page(url)['html']
+
+# Selector profiles learned from earlier runs, loaded on first use
+_selector_profiles = None
+_selector_profiles_changed = False
+
+def get_selector_profile(url):
+    """Return the selectors that worked last time for pages like url"""
+    global _selector_profiles
+    if _selector_profiles is None:
+        _selector_profiles = load_selector_profiles()
+    return _selector_profiles.get(profile_key(url), {})
+
+def learn_selector_profile(url, hits):
+    """Remember which selectors worked for url"""
+    global _selector_profiles_changed
+    get_selector_profile(url)
+    if update_profile(_selector_profiles, url, hits):
+        _selector_profiles_changed = True
+
+def flush_selector_profiles():
+    """Save selector profiles if parsing taught us anything new"""
+    global _selector_profiles_changed
+    if _selector_profiles_changed:
+        save_selector_profiles(_selector_profiles)
+        _selector_profiles_changed = False
+
+def tracked_product_record(fields, timestamp, source, match):
+    """Build the product record for extracted fields, or None if the product isn't tracked
+
+    match is the (tracked entry, score) the product name was assigned.
+    """
+    name = fields['name']
+    
+    # 🎯 Only process tracked products
+    if not name:
+        return None
+    
+    tracked_entry, score = match
+    is_tracked = tracked_entry is not None
+    
+    # Debug: Show product matching (only in debug mode)
+    if os.getenv('DEBUG_MODE', 'false').lower() == 'true' and name and len(name) > 5:
+        if is_tracked:
+            print(f"✅ Matched: '{name}' -> '{tracked_entry}' ({score:.2f})")
+        else:
+            print(f"❌ Not matched: '{name}' (best score {score:.2f})")
+    
+    if not is_tracked:
         return None
+    
+    return {
+        "Product Name": name or "N/A",
+        "Price": fields['price'] or "N/A",
+        "Unit": fields['unit'] or "",
+        "Brand": fields.get('brand') or "",
+        "Category": fields.get('category') or "",
+        "Timestamp": timestamp or datetime.now().isoformat(),
+        "Source": source,  # Track which selector (or embedded blob) worked
+        "Product URL": fields['link'] or "",
+        "Tracked Product": tracked_entry,
+        "Match Score": score
+    }
+
+def add_product(products, seen_products, product):
+    """Append a product unless the same name and price was already found"""
+    product_id = f"{product['Product Name']}_{product['Price']}"
+    if product_id in seen_products:
+        return
+    seen_products.add(product_id)
+    products.append(product)
+    print(f"✅ Found product {len(products)}: {product['Product Name']} - {product['Price']}")
+
+def new_parse_stats():
+    """Counters describing how much of a page was parsed"""
+    return {'cards': 0, 'seen': 0, 'matched': 0, 'skipped': 0, 'truncated': False, 'out_of_time': False}
+
+def report_parse_stats(stats):
+    reasons = []
+    if stats['truncated']:
+        reasons.append("page truncated")
+    if stats['out_of_time']:
+        reasons.append("time budget spent")
+    if not PARSE_FULL_PAGE and stats['skipped']:
+        reasons.append(f"{PARSE_CARD_LIMIT}-card limit")
+    print(f"📊 Cards: {stats['seen']}/{stats['cards']} seen, {stats['matched']} matched, "
+          f"{stats['skipped']} skipped" + (f" ({', '.join(reasons)})" if reasons else ""))
 
-def parse_product_data(html):
+def parse_embedded_products(html, timestamp=None, url=None, stats=None):
+    """Products from JSON embedded in the page, or None if the page has none"""
+    source, embedded = extract_embedded_products(html, url)
+    if not embedded:
+        return None
+    
+    print(f"🧩 Found {len(embedded)} products in embedded {source} data")
+    products = []
+    seen_products = set()
+    matches = match_products([fields['name'] for fields in embedded])
+    for fields, match in zip(embedded, matches):
+        product = tracked_product_record(fields, timestamp, f"embedded:{source}", match)
+        if product:
+            add_product(products, seen_products, product)
+    
+    stats.update(cards=len(embedded), seen=len(embedded), matched=len(products))
+    report_parse_stats(stats)
+    print(f"📊 Total unique products found: {len(products)}")
+    return products
+
+def parse_product_data(html, timestamp=None, url=None, stats=None):
+    """Extract tracked products from a page, filling stats with the cards seen, matched and skipped
+
+    In full-page mode every card is read until PARSE_TIME_BUDGET_SECONDS is
+    spent; otherwise only the first PARSE_CARD_LIMIT cards per selector are.
+    Cards are read and matched PARSE_MATCH_CHUNK at a time, so matching is
+    part of the budget. Stats describe the last container selector tried.
+    Pages longer than PARSE_MAX_PAGE_CHARS are cut before parsing, which
+    bounds the size of the parse tree.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(new_parse_stats())
     if not html:
         return []
+    
+    # Embedded state JSON is cheaper to read than the DOM and carries brand/category
+    products = parse_embedded_products(html, timestamp, url, stats)
+    if products is not None:
+        return products
+    
+    deadline = time.perf_counter() + PARSE_TIME_BUDGET_SECONDS if PARSE_TIME_BUDGET_SECONDS > 0 else None
+    if PARSE_MAX_PAGE_CHARS > 0 and len(html) > PARSE_MAX_PAGE_CHARS:
+        print(f"⚠️ Page is {len(html)} characters, parsing only the first {PARSE_MAX_PAGE_CHARS}")
+        html = html[:PARSE_MAX_PAGE_CHARS]
+        stats['truncated'] = True
         
-    soup = BeautifulSoup(html, "html.parser")
+    backend = get_backend()
+    document = backend.parse(html)
     products = []
     seen_products = set()  # To avoid duplicates
     
-    print("🔍 Looking for product containers...")
+    # Try the selectors that matched this kind of page last time first
+    profile = get_selector_profile(url)
+    hits = SelectorHits()
+    extractor = backend.extractor_class(
+        ordered_selectors(NAME_SELECTORS, profile.get('name')),
+        ordered_selectors(PRICE_SELECTORS, profile.get('price')),
+        ordered_selectors(UNIT_PRICE_SELECTORS, profile.get('unit'))
+    )
     
-    # Try multiple selectors that might contain product information
-    selectors_to_try = [
-        'div[data-testid="wid-product-card-container"]',  # Original selector
-        '[data-testid*="product"]',  # Any element with product in data-testid
-        '.product-card',
-        '.product-item',
-        'article',
-        '[class*="product"]',
-        '[class*="Product"]',
-        'div[class*="card"]',
-        'a[href*="/product/"]',  # Links to product pages
-        'div[class*="item"]',  # Generic item containers
-        'div[class*="product-item"]',  # Product items
-        'div[class*="product-card"]'  # Product cards
-    ]
+    print("🔍 Looking for product containers...")
     
-    for selector in selectors_to_try:
-        items = soup.select(selector)
+    for selector in ordered_selectors(CONTAINER_SELECTORS, profile.get('container')):
+        items = backend.select(document, selector)
         print(f"Selector '{selector}': found {len(items)} items")
         
         if items:
-            for i, item in enumerate(items[:30]):  # Increased to 30 for more variety
-                try:
-                    # Try different ways to extract product name
-                    name_selectors = [
-                        'div[data-role="product-name"]',
-                        '[data-testid*="name"]',
-                        '[data-testid*="title"]',
-                        'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-                        '.product-name',
-                        '.title',
-                        '.name',
-                        'a[href*="/product/"]',
-                        'span[class*="name"]',
-                        'span[class*="title"]',
-                        'div[class*="name"]',
-                        'div[class*="title"]',
-                        'p[class*="name"]',
-                        'p[class*="title"]'
-                    ]
-                    
-                    name = None
-                    for name_sel in name_selectors:
-                        name_elem = item.select_one(name_sel)
-                        if name_elem:
-                            name = name_elem.get_text(strip=True)
-                            if name and len(name) > 3:  # Ensure it's a meaningful name
-                                break
-                    
-                    # If no name found, try to get text from the entire item
-                    if not name:
-                        # Get all text from the item and look for product-like text
-                        all_text = item.get_text(strip=True)
-                        lines = all_text.split('\n')
-                        for line in lines:
-                            line = line.strip()
-                            if len(line) > 10 and any(keyword in line.lower() for keyword in ['noodles', 'sauce', 'soy', 'maggi', 'lee kum', 'barramundi', 'fish']):
-                                name = line
-                                break
-                    
-                    # 🎯 Only process tracked products (but be more flexible)
-                    if not name:
+            cards = items[:len(items) if PARSE_FULL_PAGE else PARSE_CARD_LIMIT]
+            stats.update(cards=len(items), seen=0)
+            for start in range(0, len(cards), PARSE_MATCH_CHUNK):
+                if deadline and time.perf_counter() > deadline:
+                    stats['out_of_time'] = True
+                    break
+                extracted = []
+                for i, item in enumerate(cards[start:start + PARSE_MATCH_CHUNK], start):
+                    stats['seen'] += 1
+                    try:
+                        # Read name, price, unit price and link in one pass over the card
+                        extracted.append(extractor.extract(item, url))
+                    except Exception as e:
+                        print(f"⚠️ Error parsing item {i+1}: {e}")
                         continue
-                    
-                    # Check if this product matches any tracked product
-                    is_tracked = is_tracked_product(name)
-                    
-                    # Debug: Show product matching (only in debug mode)
-                    if os.getenv('DEBUG_MODE', 'false').lower() == 'true' and name and len(name) > 5:
-                        if is_tracked:
-                            print(f"✅ Matched: '{name}'")
-                        else:
-                            print(f"❌ Not matched: '{name}'")
-                    
-                    # Debug: Print all products found (only in debug mode)
-                    if os.getenv('DEBUG_MODE', 'false').lower() == 'true' and name and len(name) > 5:
-                        print(f"🔍 Found product: '{name}' - Tracked: {is_tracked}")
-                    
-                    if not is_tracked:
+                
+                # Assign the chunk's cards to their best tracked products in one batch
+                matches = match_products([fields['name'] for fields in extracted])
+                for fields, match in zip(extracted, matches):
+                    product = tracked_product_record(fields, timestamp, selector, match)
+                    if not product:
                         continue
                     
-                    # Try different ways to extract price
-                    price_selectors = [
-                        'div[data-testid="wid-product-card-price"]',
-                        '[data-testid*="price"]',
-                        '.price',
-                        '[class*="price"]',
-                        '[class*="Price"]',
-                        'span[class*="price"]',
-                        'div[class*="price"]',
-                        'p[class*="price"]'
-                    ]
+                    for field in ('name', 'price', 'unit'):
+                        if fields[f'{field}_selector']:
+                            hits.hit(field, fields[f'{field}_selector'])
                     
-                    price = None
-                    for price_sel in price_selectors:
-                        price_elem = item.select_one(price_sel)
-                        if price_elem:
-                            price = price_elem.get_text(strip=True)
-                            if price and ('$' in price or '€' in price or '£' in price):
-                                break
-                    
-                    # If no price found, look for price patterns in all text
-                    if not price:
-                        all_text = item.get_text(strip=True)
-                        price_match = re.search(r'\$[\d,]+\.?\d*', all_text)
-                        if price_match:
-                            price = price_match.group()
-                    
-                    # Try to extract unit price
-                    unit_price_selectors = [
-                        'div[data-role="product-unit-price"]',
-                        '[data-testid*="unit"]',
-                        '.unit-price',
-                        '.unit'
-                    ]
-                    
-                    unit_price = None
-                    for unit_sel in unit_price_selectors:
-                        unit_elem = item.select_one(unit_sel)
-                        if unit_elem:
-                            unit_price = unit_elem.get_text(strip=True)
-                            break
-                    
-                    # Create a unique identifier for the product
-                    product_id = f"{name}_{price}"
-                    
-                    # If we found at least a name or price, and it's not a duplicate
-                    if (name or price) and product_id not in seen_products:
-                        seen_products.add(product_id)
-                        product = {
-                            "Product Name": name or "N/A",
-                            "Price": price or "N/A",
-                            "Unit": unit_price or "",
-                            "Brand": "",
-                            "Category": "",
-                            "Timestamp": datetime.now().isoformat(),
-                            "Source": selector  # Track which selector worked
-                        }
-                        products.append(product)
-                        print(f"✅ Found product {len(products)}: {name} - {price}")
-                        
-                except Exception as e:
-                    print(f"⚠️ Error parsing item {i+1}: {e}")
-                    continue
+                    add_product(products, seen_products, product)
             
             if products:
+                hits.container = selector
                 break  # If we found products with this selector, stop trying others
+            if stats['out_of_time']:
+                break
     
+    stats['skipped'] = stats['cards'] - stats['seen']
+    stats['matched'] = len(products)
+    learn_selector_profile(url, hits)
+    report_parse_stats(stats)
     print(f"📊 Total unique products found: {len(products)}")
     return products
 
+def parse_pages(pages, parse_cache=None):
+    """Parse every crawled page and merge the products found across them
+
+    parse_cache maps (url, content hash) to parsed products, so a page whose
+    body did not change between runs (common when replaying snapshots) is only
+    parsed once. The url is part of the key because the selector profile and
+    the products' Source URL depend on it.
+    """
+    products = []
+    seen_products = set()
+    totals = new_parse_stats()
+    
+    for page in pages:
+        timestamp = page.get('fetched_at')
+        cache_key = (page['url'], page['content_hash'])
+        if parse_cache is not None and cache_key in parse_cache:
+            page_products = [dict(product, Timestamp=timestamp) for product in parse_cache[cache_key]]
+        else:
+            print(f"📄 Parsing {page['url']}")
+            stats = {}
+            page_products = parse_product_data(page['html'], timestamp, page['url'], stats)
+            for key, value in stats.items():
+                totals[key] += value
+            if parse_cache is not None:
+                parse_cache[cache_key] = page_products
+        page['product_names'] = [product['Product Name'] for product in page_products]
+        
+        for product in page_products:
+            product_id = f"{canonical_product_key(product['Product Name'])}_{product['Price']}"
+            if product_id in seen_products:
+                continue
+            seen_products.add(product_id)
+            products.append(dict(product, **{'Source URL': page['url']}))
+    
+    print(f"📊 Cards across all pages: {totals['seen']}/{totals['cards']} seen, "
+          f"{totals['matched']} matched, {totals['skipped']} skipped")
+    print(f"📊 Total unique products across {len(pages)} pages: {len(products)}")
+    return products
+
+def add_unit_prices(products):
+    """Fill in every product's normalized price per lb / fl oz / ct in one pass"""
+    if not products:
+        return products
+    unit_prices = compute_unit_prices(
+        [product['Product Name'] for product in products],
+        [product.get('Unit', '') for product in products],
+        parse_price_series([product['Price'] for product in products])
+    )
+    for product, (unit_price, basis) in zip(products, unit_prices.itertuples(index=False)):
+        product['Unit Price'] = None if pd.isna(unit_price) else float(unit_price)
+        product['Unit Price Basis'] = basis
+    return products
+
+def record_heartbeats(products):
+    """Move the last-seen time of products whose price did not change"""
+    if not products:
+        return
+    seen = [(product['Product Name'], datetime.fromisoformat(product['Timestamp'])) for product in products]
+    if FIREBASE_ENABLED:
+        try:
+            get_firebase_manager().touch_products(seen)
+        except Exception as e:
+            print(f"⚠️ Error updating last seen times in Firebase: {e}")
+    elif LOCAL_STORE == 'sqlite':
+        store = SQLiteManager()
+        try:
+            for product_name, seen_at in seen:
+                store.touch_product(product_name, seen_at)
+        finally:
+            store.close()
+    # the JSON price history keeps no observation times
 
 def save_to_csv(products, filename="data/processed/wee_prices.csv"):
     if not products:
         print("⚠️ No products to save")
         return
         
-    df = pd.DataFrame(products)
+    df = pd.DataFrame(products, columns=CSV_COLUMNS)
 
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(filename), exist_ok=True)
@@ -702,51 +858,181 @@ def save_to_csv(products, filename="data/processed/wee_prices.csv"):
     df.to_csv(filename, mode='a', index=False, header=write_header)
     print(f"✅ Saved {len(products)} products to {filename}")
 
+def price_record(product):
+    """Price data of a found product, as the Firebase and SQLite stores take it"""
+    return {
+        'price': extract_price_value(product['Price']),
+        'price_str': product['Price'],
+        'unit_price': product.get('Unit Price'),
+        'unit_price_basis': product.get('Unit Price Basis'),
+        'unit_price_str': product.get('Unit', ''),
+        'source_url': product.get('Source URL', BASE_URL),
+        'source_selector': product.get('Source', ''),
+        'brand': product.get('Brand', ''),
+        'category': product.get('Category', ''),
+        'unit': product.get('Unit', ''),
+        'scraped_at': datetime.fromisoformat(product['Timestamp'])
+    }
+
+def store_prices(products, check_drops=True):
+    """Write products to the local price store and to Firebase, SQLite or the JSON history
+
+    Without check_drops (a replay) no alerts are raised and the JSON
+    history, which only serves drop checks, is left alone. Returns the
+    products every store kept.
+    """
+    # Save to the local price store (Parquet partitions and/or CSV)
+    try:
+        save_products(products, save_to_csv)
+    except Exception as e:
+        print(f"❌ Error saving to the price store: {e}")
+        return []
+    
+    # Save to Firebase if enabled
+    if FIREBASE_ENABLED:
+        print("🔥 Saving to Firebase...")
+        if _firebase_manager is not None:
+            _firebase_manager.invalidate()  # reload products and prices changed since the last run
+        firebase_saved = save_prices_to_firebase(products, check_drops)
+        
+        print(f"🔥 Saved {len(firebase_saved)} products to Firebase")
+        return firebase_saved
+    elif LOCAL_STORE == 'sqlite':
+        return save_prices_to_sqlite(products, check_drops)
+    elif not check_drops:
+        return products
+    else:
+        # Fallback to JSON price history checking
+        return check_price_drops(products)
+
+def print_replay_drops(detector, products):
+    """Console-only price drops of a replayed run, against the prices replayed before it"""
+    for product in products:
+        state = detector.state.get(canonical_product_key(product['Product Name']))
+        old_price = extract_price_value(state['price_str']) if state else None
+        new_price = extract_price_value(product['Price'])
+        if old_price and new_price and new_price < old_price:
+            print(f"⏪ 💰 {product['Product Name']}: ${old_price} → ${new_price} at {product['Timestamp']}")
+
+def run_pipeline(pages, parse_cache=None, replay_detector=None):
+    """Parse fetched pages, then store the tracked products and check for price drops
+
+    A replay passes replay_detector, an in-memory ChangeDetector shared by
+    the replayed runs: changes are found against the runs replayed before,
+    drops are only printed (no emails or alert records), and neither the
+    live last-seen state nor the stores' last-seen times move back in time.
+    Returns True if every product that needed storing was stored.
+    """
+    product_data = parse_pages(pages, parse_cache)
+    flush_selector_profiles()
+    flush_match_cache()
+
+    if not product_data:
+        print("⚠️ No tracked products found on this page.")
+        print("💡 The products might be out of stock or on different pages.")
+        return True
+    
+    print(f"✅ Found {len(product_data)} tracked products")
+    add_unit_prices(product_data)
+    
+    # Only price changes are stored; unchanged products just get a last-seen heartbeat
+    changed = product_data
+    if STORE_CHANGES_ONLY or replay_detector:
+        detector = replay_detector or ChangeDetector()
+        changed, unchanged = detector.split(product_data)
+        print(f"🔁 {len(changed)} price changes, {len(unchanged)} unchanged")
+    if replay_detector:
+        print_replay_drops(replay_detector, changed)
+    
+    stored = store_prices(changed, check_drops=not replay_detector) if changed else []
+    if len(stored) < len(changed):
+        print(f"⚠️ {len(changed) - len(stored)} products were not stored and will be retried next run")
+    
+    if replay_detector:
+        replay_detector.mark_stored(stored)
+    elif STORE_CHANGES_ONLY:
+        record_heartbeats(unchanged)
+        # Prices that failed to store stay changes for the next run
+        detector.mark_stored(stored)
+        detector.save()
+    
+    return len(stored) == len(changed)
+
+def record_unchanged_pages(pages, fetch_state):
+    """Heartbeat the products last found on pages that did not change, which are not parsed again"""
+    seen = [{'Product Name': name, 'Timestamp': page['fetched_at']}
+            for page in pages for name in known_products(fetch_state, page['url'])]
+    if not seen or not STORE_CHANGES_ONLY:
+        return
+    detector = ChangeDetector()
+    detector.touch(seen)
+    record_heartbeats(seen)
+    detector.save()
+    print(f"💓 {len(seen)} products on unchanged pages marked as seen")
+
+def replay_snapshots(snapshot_dir):
+    """Re-run the parse/match/persist pipeline over archived page snapshots
+
+    Prices are stored, but drops are only printed and the live last-seen
+    state is left alone (see run_pipeline).
+    """
+    parse_cache = {}
+    detector = ChangeDetector(filename=None)
+    runs_replayed = 0
+    
+    for run_id, pages in load_snapshot_runs(snapshot_dir):
+        if not pages:
+            continue
+        print(f"⏪ Replaying run {run_id} ({len(pages)} pages)")
+        run_pipeline(pages, parse_cache, replay_detector=detector)
+        runs_replayed += 1
+    
+    print(f"⏪ Replayed {runs_replayed} runs from {snapshot_dir}")
+
 if __name__ == "__main__":
+    replay_dir = None
+    if len(sys.argv) > 1:
+        # Offline mode: python scripts/scrape_wee.py --replay data/raw
+        if sys.argv[1] != '--replay' or len(sys.argv) != 3:
+            print("Usage: scrape_wee.py [--replay snapshot_dir]")
+            sys.exit(2)
+        replay_dir = sys.argv[2]
+    
     print("🚀 Starting Weee! price tracker...")
     print(f"📋 Tracking {len(TRACKED_PRODUCTS)} products:")
     for i, product in enumerate(TRACKED_PRODUCTS, 1):
         print(f"  {i}. {product}")
     print()
     
-    html = fetch_html(BASE_URL)
+    if replay_dir:
+        replay_snapshots(replay_dir)
+        sys.exit(0)
     
-    if html:
-        print("📄 HTML fetched successfully, parsing products...")
-        product_data = parse_product_data(html)
-
-        if product_data:
-            print(f"✅ Found {len(product_data)} tracked products")
-            
-            # Save to both CSV (fallback) and Firebase
-            save_to_csv(product_data)
-            
-            # Save to Firebase if enabled
-            if FIREBASE_ENABLED:
-                print("🔥 Saving to Firebase...")
-                firebase_saved = 0
-                for product in product_data:
-                    price_data = {
-                        'price': extract_price_value(product['Price']),
-                        'price_str': product['Price'],
-                        'unit_price': None,
-                        'unit_price_str': product.get('Unit', ''),
-                        'source_url': BASE_URL,
-                        'source_selector': product.get('Source', ''),
-                        'brand': product.get('Brand', ''),
-                        'category': product.get('Category', ''),
-                        'unit': product.get('Unit', '')
-                    }
-                    
-                    if save_price_to_firebase(product['Product Name'], price_data):
-                        firebase_saved += 1
-                
-                print(f"🔥 Saved {firebase_saved} products to Firebase")
-            else:
-                # Fallback to CSV-only price checking
-                check_price_drops(product_data)
-        else:
-            print("⚠️ No tracked products found on this page.")
-            print("💡 The products might be out of stock or on different pages.")
-    else:
+    run_id = datetime.now().isoformat()
+    fetch_state = load_fetch_state()
+    match_fingerprint = get_match_cache().fingerprint
+    pages = crawl_catalog(CATEGORY_URLS, lambda url: fetch_page(url, fetch_state, match_fingerprint))
+    changed_pages = [page for page in pages if page['changed']]
+    unchanged_pages = [page for page in pages if not page['changed']]
+    
+    if pages and SNAPSHOT_ENABLED:
+        archive_pages(pages, run_id)
+    
+    stored = True
+    if not pages:
         print("❌ Failed to fetch HTML. Check your internet connection and the URL.")
+    elif not changed_pages:
+        print("✅ No pages changed since the last run, skipping parsing and storage")
+    else:
+        print(f"📄 {len(changed_pages)} of {len(pages)} pages changed, parsing products...")
+        stored = run_pipeline(changed_pages)
+        if stored:
+            for page in changed_pages:
+                record_parse(fetch_state, page['url'], page['product_names'], match_fingerprint)
+    record_unchanged_pages(unchanged_pages, fetch_state)
+    
+    # Only remember page hashes once their products have been stored
+    if stored:
+        save_fetch_state(fetch_state)
+    else:
+        print("⚠️ Not all products were stored, changed pages will be parsed again next run")
@@ -0,0 +1,77 @@
+# scripts/selector_profile.py
+
+import os
+import re
+import json
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlparse
+
+SELECTOR_PROFILE_FILE = os.getenv('SELECTOR_PROFILE_FILE', 'data/processed/selector_profiles.json')
+
+# Fields whose winning selector is remembered for each URL pattern
+PROFILE_FIELDS = ('container', 'name', 'price', 'unit')
+
+def profile_key(url):
+    """Reduce a URL to the site/pattern its pages share a layout with"""
+    if not url:
+        return None
+    parts = urlparse(url)
+    # Numeric path segments (ids, page numbers) don't change the page layout
+    path = re.sub(r'/\d+(?=/|$)', '/*', parts.path.rstrip('/'))
+    return f"{parts.netloc}{path}"
+
+def load_selector_profiles(filename=SELECTOR_PROFILE_FILE):
+    """Load the learned selector profiles"""
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+    return {}
+
+def save_selector_profiles(profiles, filename=SELECTOR_PROFILE_FILE):
+    """Persist learned selector profiles for the next run"""
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump(profiles, f, indent=2)
+
+def ordered_selectors(selectors, preferred):
+    """Put the selector that worked last time first, keeping the rest as fallback"""
+    if preferred not in selectors:
+        return selectors
+    return [preferred] + [s for s in selectors if s != preferred]
+
+class SelectorHits:
+    """Count which selector produced each field while parsing one page"""
+
+    def __init__(self):
+        self.container = None
+        self.counts = {field: Counter() for field in PROFILE_FIELDS if field != 'container'}
+
+    def hit(self, field, selector):
+        self.counts[field][selector] += 1
+
+    def winners(self):
+        """The container selector and the most successful selector per field"""
+        winners = {'container': self.container}
+        for field, counter in self.counts.items():
+            winners[field] = counter.most_common(1)[0][0] if counter else None
+        return winners
+
+def update_profile(profiles, url, hits):
+    """Record the selectors that worked for a page, returning True if anything changed"""
+    key = profile_key(url)
+    winners = hits.winners()
+    if not key or not winners['container']:
+        return False
+
+    profile = profiles.setdefault(key, {})
+    learned = {field: selector for field, selector in winners.items() if selector}
+    if all(profile.get(field) == selector for field, selector in learned.items()):
+        return False
+
+    profile.update(learned)
+    profile['updated_at'] = datetime.now().isoformat()
+    return True
@@ -0,0 +1,96 @@
+# scripts/snapshot_archive.py
+
+import os
+import gzip
+import json
+from itertools import groupby
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'data/raw')
+SNAPSHOT_ENABLED = os.getenv('SNAPSHOT_ENABLED', 'true').lower() == 'true'
+MANIFEST_FILE = 'manifest.jsonl'
+
+def snapshot_path(content_hash, snapshot_dir=SNAPSHOT_DIR):
+    """Path of the compressed snapshot holding a page body with this hash"""
+    return os.path.join(snapshot_dir, 'objects', content_hash[:2], f"{content_hash}.html.gz")
+
+def write_snapshot(html, content_hash, snapshot_dir=SNAPSHOT_DIR):
+    """Write a page body once; identical bodies share the same file"""
+    path = snapshot_path(content_hash, snapshot_dir)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+    return path
+
+def archive_pages(pages, run_id, snapshot_dir=SNAPSHOT_DIR):
+    """Archive a run's fetched pages and append them to the manifest"""
+    entries = []
+    for page in pages:
+        if page['content_hash'] is None:
+            continue
+
+        # Unchanged (304) pages have no body, but their hash points at the
+        # snapshot written when the content was last downloaded
+        if page['html'] is not None:
+            write_snapshot(page['html'], page['content_hash'], snapshot_dir)
+
+        entries.append({
+            'run_id': run_id,
+            'url': page['url'],
+            'fetched_at': page.get('fetched_at'),
+            'status': page.get('status'),
+            'content_hash': page['content_hash']
+        })
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'a') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+
+    print(f"🗄️ Archived {len(entries)} pages to {snapshot_dir}")
+    return entries
+
+def load_manifest(snapshot_dir=SNAPSHOT_DIR):
+    """Read all manifest entries in the order they were archived"""
+    manifest_file = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return []
+
+    entries = []
+    with open(manifest_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+def load_snapshot_runs(snapshot_dir=SNAPSHOT_DIR):
+    """Yield (run_id, pages) for each archived run, reading bodies from disk"""
+    for run_id, entries in groupby(load_manifest(snapshot_dir), key=lambda e: e.get('run_id')):
+        pages = []
+        for entry in entries:
+            path = snapshot_path(entry['content_hash'], snapshot_dir)
+            if not os.path.exists(path):
+                print(f"⚠️ Missing snapshot for {entry['url']} ({entry['content_hash'][:12]})")
+                continue
+
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                html = f.read()
+
+            pages.append({
+                'url': entry['url'],
+                'status': entry.get('status'),
+                'html': html,
+                'content_hash': entry['content_hash'],
+                'fetched_at': entry.get('fetched_at'),
+                'changed': True
+            })
+        yield run_id, pages
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# scripts/sqlite_store.py
+
+import os
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from itertools import groupby
+from canonical import canonical_product_key
+from change_detection import expand_points
+
+SQLITE_DB_FILE = os.getenv('SQLITE_DB_FILE', 'data/processed/prices.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    product_key TEXT NOT NULL UNIQUE,
+    brand TEXT,
+    category TEXT,
+    unit_size TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    last_seen_at TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    priority INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    price REAL,
+    price_str TEXT,
+    unit_price REAL,
+    unit_price_basis TEXT,
+    unit_price_str TEXT,
+    source_url TEXT,
+    source_selector TEXT,
+    scraped_at TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_product_scraped ON price_history (product_id, scraped_at);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    old_price REAL,
+    new_price REAL,
+    savings_amount REAL,
+    savings_percentage REAL,
+    alert_sent_at TEXT NOT NULL,
+    alert_type TEXT,
+    sent INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_sent_at ON alerts (alert_sent_at);
+CREATE TABLE IF NOT EXISTS system_logs (
+    id INTEGER PRIMARY KEY,
+    level TEXT,
+    message TEXT,
+    component TEXT,
+    execution_time_ms REAL,
+    created_at TEXT NOT NULL
+);
+"""
+
+def to_text(value):
+    """Datetimes are stored as ISO 8601 text, which sorts chronologically"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def to_datetime(value):
+    return datetime.fromisoformat(value) if value else None
+
+class SQLiteManager:
+    """Local price store with the same operations as FirebaseManager
+
+    Used when Firebase isn't configured, and as a fast stand-in for it in
+    tests (pass ':memory:'). Price history is indexed on
+    (product_id, scraped_at), so latest-price and trend lookups are index
+    range scans instead of full scans; the database runs in WAL mode so
+    readers don't block the scraper while it writes.
+    """
+
+    def __init__(self, db_file=SQLITE_DB_FILE):
+        self.logger = logging.getLogger(__name__)
+        if db_file != ':memory:':
+            os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        self.db = sqlite3.connect(db_file, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('PRAGMA foreign_keys=ON')
+        self.db.executescript(SCHEMA)
+        columns = [row['name'] for row in self.db.execute('PRAGMA table_info(products)')]
+        if 'last_seen_at' not in columns:
+            # Databases created before price heartbeats
+            with self.db:
+                self.db.execute('ALTER TABLE products ADD COLUMN last_seen_at TEXT')
+
+    def close(self):
+        self.db.close()
+
+    def save_product(self, product_data):
+        """Save or update product information, keyed on the canonical product name"""
+        try:
+            now = to_text(datetime.now())
+            product_key = canonical_product_key(product_data['name'])
+            with self.db:
+                row = self.db.execute('SELECT id FROM products WHERE product_key = ?', (product_key,)).fetchone()
+                if row:
+                    self.db.execute('UPDATE products SET category = ?, updated_at = ? WHERE id = ?',
+                                    (product_data.get('category'), now, row['id']))
+                    return row['id']
+                cursor = self.db.execute(
+                    'INSERT INTO products (product_name, product_key, brand, category, unit_size, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (product_data['name'], product_key, product_data.get('brand'), product_data.get('category'),
+                     product_data.get('unit_size'), now, now)
+                )
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.logger.error(f"Error saving product: {e}")
+            return None
+
+    def touch_product(self, product_name, seen_at=None):
+        """Record that a product was seen at an unchanged price; no price record is written"""
+        try:
+            with self.db:
+                cursor = self.db.execute(
+                    'UPDATE products SET last_seen_at = MAX(COALESCE(last_seen_at, ?), ?) WHERE product_key = ?',
+                    (to_text(seen_at or datetime.now()), to_text(seen_at or datetime.now()),
+                     canonical_product_key(product_name))
+                )
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            self.logger.error(f"Error updating last seen time: {e}")
+            return False
+
+    def _observations(self, rows, last_seen_at):
+        """Stored price changes of one product expanded into regular observations"""
+        points = [{'price': row['price'], 'price_str': row['price_str'], 'scraped_at': to_datetime(row['scraped_at'])}
+                  for row in rows]
+        return expand_points(points, to_datetime(last_seen_at))
+
+    def save_price_record(self, product_id, price_data):
+        """Save a price record"""
+        try:
+            with self.db:
+                cursor = self.db.execute(
+                    'INSERT INTO price_history (product_id, price, price_str, unit_price, unit_price_basis, unit_price_str, '
+                    'source_url, source_selector, scraped_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (product_id,
+                     float(price_data['price']) if price_data['price'] else None,
+                     price_data['price_str'],
+                     float(price_data.get('unit_price')) if price_data.get('unit_price') else None,
+                     price_data.get('unit_price_basis'),
+                     price_data.get('unit_price_str', ''),
+                     price_data.get('source_url'),
+                     price_data.get('source_selector'),
+                     to_text(price_data.get('scraped_at') or datetime.now()),
+                     to_text(datetime.now()))
+                )
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.logger.error(f"Error saving price record: {e}")
+            return None
+
+    def get_latest_price(self, product_id):
+        """Get the latest price for a product"""
+        row = self.db.execute(
+            'SELECT price, price_str, scraped_at FROM price_history WHERE product_id = ? '
+            'ORDER BY scraped_at DESC LIMIT 1', (product_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return {'price': row['price'], 'price_str': row['price_str'], 'scraped_at': to_datetime(row['scraped_at'])}
+
+    def check_price_drop(self, product_id, current_price):
+        """Check if there's a price drop and create alert"""
+        latest_price = self.get_latest_price(product_id)
+
+        if latest_price and latest_price['price'] and current_price and current_price < latest_price['price']:
+            savings = latest_price['price'] - current_price
+            savings_percentage = (savings / latest_price['price']) * 100
+            self.create_price_alert(product_id, latest_price['price'], current_price, savings, savings_percentage)
+            return {
+                'old_price': latest_price['price'],
+                'new_price': current_price,
+                'savings': savings,
+                'savings_percentage': savings_percentage
+            }
+
+        return None
+
+    def create_price_alert(self, product_id, old_price, new_price, savings, savings_percentage):
+        """Create a price alert record"""
+        try:
+            with self.db:
+                cursor = self.db.execute(
+                    'INSERT INTO alerts (product_id, old_price, new_price, savings_amount, savings_percentage, '
+                    "alert_sent_at, alert_type, sent) VALUES (?, ?, ?, ?, ?, ?, 'email', 0)",
+                    (product_id, float(old_price), float(new_price), float(savings), float(savings_percentage),
+                     to_text(datetime.now()))
+                )
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.logger.error(f"Error creating price alert: {e}")
+            return None
+
+    def get_price_trends(self, product_id, days=30):
+        """Get price trends for a product, newest first
+
+        Only price changes are stored, so the change in effect at the
+        cutoff is read too and the series is expanded up to the product's
+        last-seen time.
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+        rows = self.db.execute(
+            'SELECT price, price_str, scraped_at FROM price_history WHERE product_id = ? AND scraped_at >= ? '
+            'UNION ALL SELECT * FROM (SELECT price, price_str, scraped_at FROM price_history '
+            'WHERE product_id = ? AND scraped_at < ? ORDER BY scraped_at DESC LIMIT 1)',
+            (product_id, to_text(cutoff), product_id, to_text(cutoff))
+        ).fetchall()
+        product = self.db.execute('SELECT last_seen_at FROM products WHERE id = ?', (product_id,)).fetchone()
+        observations = self._observations(rows, product['last_seen_at'] if product else None)
+        trends = [point for point in observations if point['scraped_at'] >= cutoff]
+        trends.sort(key=lambda point: point['scraped_at'], reverse=True)
+        return trends[:days]
+
+    def get_biggest_savings(self, days=7):
+        """Get products with biggest savings"""
+        cutoff_date = to_text(datetime.now() - timedelta(days=days))
+        rows = self.db.execute(
+            "SELECT COALESCE(p.product_name, 'Unknown') AS product_name, a.old_price, a.new_price, a.savings_amount, "
+            'a.savings_percentage, a.alert_sent_at FROM alerts a LEFT JOIN products p ON p.id = a.product_id '
+            'WHERE a.alert_sent_at >= ? ORDER BY a.savings_percentage DESC LIMIT 10', (cutoff_date,)
+        ).fetchall()
+        return [{
+            'product_name': row['product_name'],
+            'old_price': row['old_price'],
+            'new_price': row['new_price'],
+            'savings_amount': row['savings_amount'],
+            'savings_percentage': row['savings_percentage'],
+            'alert_sent_at': to_datetime(row['alert_sent_at'])
+        } for row in rows]
+
+    def get_product_statistics(self):
+        """Get overall product statistics
+
+        total_price_records counts stored price changes; the average is
+        taken over the observations they expand to.
+        """
+        row = self.db.execute(
+            'SELECT (SELECT COUNT(*) FROM products) AS total_products, '
+            '(SELECT COUNT(*) FROM alerts) AS total_alerts, COUNT(*) AS total_price_records FROM price_history'
+        ).fetchone()
+        last_seen = {product['id']: product['last_seen_at']
+                     for product in self.db.execute('SELECT id, last_seen_at FROM products')}
+        history = self.db.execute(
+            'SELECT product_id, price, price_str, scraped_at FROM price_history ORDER BY product_id, scraped_at'
+        ).fetchall()
+        prices = []
+        for product_id, rows in groupby(history, key=lambda row: row['product_id']):
+            observations = self._observations(list(rows), last_seen.get(product_id))
+            prices.extend(point['price'] for point in observations if point['price'])
+        return {
+            'total_products': row['total_products'],
+            'total_price_records': row['total_price_records'],
+            'total_observations': len(prices),
+            'total_alerts': row['total_alerts'],
+            'avg_price': sum(prices) / len(prices) if prices else 0,
+            'min_price': min(prices) if prices else 0,
+            'max_price': max(prices) if prices else 0
+        }
+
+    def save_system_log(self, level, message, component=None, execution_time_ms=None):
+        """Save a system log entry"""
+        try:
+            with self.db:
+                self.db.execute(
+                    'INSERT INTO system_logs (level, message, component, execution_time_ms, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (level, message, component, execution_time_ms, to_text(datetime.now()))
+                )
+        except sqlite3.Error as e:
+            self.logger.error(f"Error saving system log: {e}")
+
+    def get_tracked_products(self):
+        """Get all enabled products, highest priority first"""
+        rows = self.db.execute(
+            'SELECT id, product_name, brand, category, unit_size, priority FROM products '
+            'WHERE enabled = 1 ORDER BY priority DESC, id'
+        ).fetchall()
+        return [{
+            'id': row['id'],
+            'name': row['product_name'],
+            'brand': row['brand'],
+            'category': row['category'],
+            'unit_size': row['unit_size'],
+            'priority': row['priority']
+        } for row in rows]
+
+    def save_price(self, product_name, price_data):
+        """Save a product and its price, and check it for a price drop
+
+        Returns the price-drop alert dict, or None. The drop is checked
+        against the previous record, before the new one is written.
+        """
+        return self._save_price(product_name, price_data)[1]
+
+    def save_prices(self, records, check_drops=True):
+        """Save a run of (product_name, price_data) pairs with save_price
+
+        Returns (the records that were written, alert dicts with the
+        product_name for them), like FirebaseManager.save_prices_bulk.
+        With check_drops False no drop is checked and no alert is created.
+        """
+        saved, alerts = [], []
+        for product_name, price_data in records:
+            written, alert = self._save_price(product_name, price_data, check_drops)
+            if written:
+                saved.append((product_name, price_data))
+                if alert:
+                    alerts.append(dict(alert, product_name=product_name))
+        return saved, alerts
+
+    def _save_price(self, product_name, price_data, check_drops=True):
+        """(whether the price record was written, price-drop alert or None)"""
+        product_id = self.save_product({
+            'name': product_name,
+            'brand': price_data.get('brand'),
+            'category': price_data.get('category'),
+            'unit_size': price_data.get('unit')
+        })
+        if not product_id:
+            return False, None
+        current_price = price_data.get('price')
+        alert = self.check_price_drop(product_id, current_price) if current_price and check_drops else None
+        record_id = self.save_price_record(product_id, {
+            'price': price_data.get('price'),
+            'price_str': price_data.get('price_str'),
+            'unit_price': price_data.get('unit_price'),
+            'unit_price_basis': price_data.get('unit_price_basis'),
+            'unit_price_str': price_data.get('unit_price_str'),
+            'source_url': price_data.get('source_url'),
+            'source_selector': price_data.get('source_selector'),
+            'scraped_at': price_data.get('scraped_at')
+        })
+        return record_id is not None, alert
+
+def print_summary(db_file=SQLITE_DB_FILE):
+    """Statistics and recent savings from the local database"""
+    if not os.path.exists(db_file):
+        print(f"No SQLite price store found at {db_file}")
+        return
+    store = SQLiteManager(db_file)
+    try:
+        stats = store.get_product_statistics()
+        print(f"  Total products: {stats['total_products']}")
+        print(f"  Total price records: {stats['total_price_records']} ({stats['total_observations']} observations)")
+        print(f"  Total alerts: {stats['total_alerts']}")
+        print(f"  Average price: ${stats['avg_price']:.2f}")
+        print(f"  Price range: ${stats['min_price']:.2f} - ${stats['max_price']:.2f}")
+        for saving in store.get_biggest_savings():
+            print(f"  💰 {saving['product_name']}: ${saving['old_price']:.2f} → ${saving['new_price']:.2f} "
+                  f"({saving['savings_percentage']:.1f}% off)")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    print_summary()
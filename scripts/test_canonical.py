@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# scripts/test_canonical.py - Check product name variants collapse to one canonical key
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from canonical import canonical_product_key
+
+# Spellings of one product that must share a key
+SAME_PRODUCT = [
+    ["Yoshinoya Cooked Beef with Onions in Sauce, Frozen 170 g",
+     "Yoshinoya Cooked Beef with Onions in Sauce -  Frozen 170 g",
+     "YOSHINOYA Cooked Beef with Onions in Sauce Frozen 170 Grams"],
+    ["Indian okra 0.9-1.1 lb", "Indian Okra 0.90 - 1.10 lbs", "Indian okra 0.9 to 1.1 pounds"],
+    ["Lay's Magic Masala chips 1.82 oz", "Lays Magic Masala Chips 1.82oz.", "Lay’s Magic Masala chips 1.82 ounces"],
+    ["Deep Paneer Paratha Frozen 4 pcs 13 oz", "Deep Paneer Paratha Frozen 4 ct 13 oz"],
+    ["Lee Kum Kee Supreme Soy Sauce 500 ml", "Lee Kum Kee Supreme Soy Sauce 500mL"],
+    ["Basmati Rice 1,000 g", "Basmati Rice 1000 g"],
+    ["Whole Milk 1 gal", "Whole Milk 1 Gallon", "whole milk 1gal"],
+    ["Ｎｏｏｄｌｅｓ 2ｌｂ", "Noodles 2 lb"]
+]
+
+# Names that differ in something that matters and must keep distinct keys
+DIFFERENT_PRODUCTS = [
+    ("Laxmi Toor Dal 4 lb", "Laxmi Toor Dal 2 lb"),
+    ("Soy Sauce 16 oz", "Soy Sauce 1 lb"),
+    ("Indian okra 0.9-1.1 lb", "Indian okra 0.9 lb"),
+    ("Cola 12 ct", "Cola 12 oz")
+]
+
+def main():
+    """Main test function"""
+    print("🧪 Canonical Product Key Test")
+    print("=" * 40)
+
+    failures = 0
+    for variants in SAME_PRODUCT:
+        keys = {canonical_product_key(name) for name in variants}
+        if len(keys) != 1:
+            failures += 1
+            print(f"❌ Variants of {variants[0]!r} produced {sorted(keys)}")
+    for a, b in DIFFERENT_PRODUCTS:
+        if canonical_product_key(a) == canonical_product_key(b):
+            failures += 1
+            print(f"❌ {a!r} and {b!r} share the key {canonical_product_key(a)!r}")
+
+    assert canonical_product_key("Indian Okra 0.90 - 1.10 lbs") == "indian okra 0.9-1.1 lb"
+    assert canonical_product_key("MAGGI 2-Minute Noodles") == "maggi 2 minute noodles"
+    assert canonical_product_key("") == canonical_product_key(None) == ""
+
+    if failures:
+        print("\n❌ Canonical key checks failed")
+        sys.exit(1)
+    print(f"✅ {len(SAME_PRODUCT)} variant groups collapsed, {len(DIFFERENT_PRODUCTS)} distinct pairs kept apart")
+    print("\n✅ All canonical key checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# scripts/test_change_detection.py - Check change-only storage and its expansion back into observations
+
+import os
+import sys
+import tempfile
+from datetime import datetime, date, timedelta
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from change_detection import ChangeDetector, expand_points, expand_frame, last_seen_times
+from sqlite_store import SQLiteManager
+from price_store import PARQUET_AVAILABLE, write_partitions, load_price_frame
+
+def product(name, price, timestamp):
+    return {'Product Name': name, 'Price': price, 'Unit': '', 'Brand': '', 'Category': '',
+            'Timestamp': timestamp.isoformat(), 'Source': ''}
+
+def main():
+    """Main test function"""
+    print("🧪 Change Detection Test")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'last_seen.json')
+        start = datetime.combine(date.today() - timedelta(days=9), datetime.min.time()).replace(hour=9)
+
+        # Ten daily runs over two products; only three prices ever change
+        stored = []
+        for day in range(10):
+            at = start + timedelta(days=day)
+            detector = ChangeDetector(state_file)
+            changed, unchanged = detector.split([
+                product("Maggi Masala Noodles 9.8 oz", "$4.99" if day < 6 else "$3.99", at),
+                product("Laxmi Besan Gram Flour 2 lb", "$5.49", at),
+            ])
+            assert len(changed) + len(unchanged) == 2
+            stored.extend(changed)
+            detector.mark_stored(changed)
+            detector.save()
+        assert [row['Price'] for row in stored] == ["$4.99", "$5.49", "$3.99"]
+        last_seen = last_seen_times(state_file)
+        assert last_seen['maggi masala noodles 9.8 oz'] == (start + timedelta(days=9)).isoformat()
+        print(f"✅ 20 observations stored as {len(stored)} price changes plus heartbeats")
+
+        # A change that could not be stored is found again on the next run
+        retry = [product("Maggi Masala Noodles 9.8 oz", "$3.49", start + timedelta(days=10))]
+        detector = ChangeDetector(state_file)
+        assert detector.split(retry)[0] == retry
+        detector.save()
+        assert ChangeDetector(state_file).split(retry)[0] == retry
+        assert last_seen_times(state_file) == last_seen
+        print("✅ Unstored price changes are retried on the next run")
+
+        # Products on a page that did not change are only touched, unknown ones are ignored
+        detector = ChangeDetector(state_file)
+        detector.touch([{'Product Name': "Laxmi Besan Gram Flour, 2lb", 'Timestamp': retry[0]['Timestamp']},
+                        {'Product Name': "Unknown Product", 'Timestamp': retry[0]['Timestamp']}])
+        assert detector.state['laxmi besan gram flour 2 lb']['last_seen'] == retry[0]['Timestamp']
+        assert detector.state['laxmi besan gram flour 2 lb']['price_str'] == "$5.49"
+        assert len(detector.state) == 2
+        print("✅ Products on unchanged pages get a heartbeat")
+
+        # A replay's detector keeps its state in memory and never writes the live file
+        replay = ChangeDetector(filename=None)
+        assert replay.split(retry)[0] == retry
+        replay.mark_stored(retry)
+        replay.save()
+        assert replay.split(retry)[0] == [] and last_seen_times(state_file) == last_seen
+        print("✅ In-memory detectors leave the last-seen file alone")
+
+        # Expanding the changes gives back one observation per run
+        expanded = expand_frame(pd.DataFrame(stored), last_seen)
+        assert len(expanded) == 20
+        noodles = expanded[expanded['Product Name'].str.startswith('Maggi')]
+        assert list(noodles['Price']) == ["$4.99"] * 6 + ["$3.99"] * 4
+        points = expand_points([{'price': 4.99, 'scraped_at': start}, {'price': 3.99, 'scraped_at': start + timedelta(days=6)}],
+                               start + timedelta(days=9))
+        assert [point['price'] for point in points] == list(noodles['Price'].str.lstrip('$').astype(float))
+        print("✅ Observations rebuilt from changes and last-seen times")
+
+        # Windowed reads carry in the price set before the window started
+        if PARQUET_AVAILABLE:
+            root = os.path.join(tmp, 'prices')
+            write_partitions(stored, root)
+            df = load_price_frame(days=3, root=root, expand=True, last_seen_file=state_file)
+            assert len(df) == 6 and set(df['Price']) == {"$3.99", "$5.49"}, df
+            assert len(load_price_frame(root=root)) == 3
+            print("✅ Parquet reader expands the last 3 days from changes written before them")
+        else:
+            print("⚠️ pyarrow not installed, skipping the Parquet reader check")
+
+    # SQLite: heartbeats extend the last stored price without new records
+    store = SQLiteManager(':memory:')
+    now = datetime.now()
+    for days_ago, price in ((20, 4.99), (5, 3.99)):
+        store.save_price("Maggi Masala Noodles 9.8 oz", {'price': price, 'price_str': f"${price:.2f}",
+                                                         'scraped_at': now - timedelta(days=days_ago)})
+    assert store.touch_product("Maggi Masala Noodles, 9.8oz", now)
+    product_id = store.get_tracked_products()[0]['id']
+    trends = store.get_price_trends(product_id, days=10)
+    assert trends[0]['scraped_at'] == now and trends[0]['price'] == 3.99
+    assert [t['price'] for t in trends].count(4.99) == 4 and len(trends) == 10
+    stats = store.get_product_statistics()
+    assert stats['total_price_records'] == 2 and stats['total_observations'] == 21
+    assert stats['min_price'] == 3.99 and stats['max_price'] == 4.99
+    store.close()
+    print("✅ SQLite trends and statistics include heartbeat-only days")
+
+    print("\n✅ All change detection checks passed")
+
+if __name__ == "__main__":
+    main()
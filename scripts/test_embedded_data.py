@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# scripts/test_embedded_data.py - Check products are read from embedded JSON state blobs
+
+import os
+import sys
+import json
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from embedded_data import extract_embedded_products
+from benchmark_extraction import sample_page
+import scrape_wee
+
+BASE_URL = "https://www.sayweee.com/en/category/sale"
+TRACKED = ["Maggi Masala Instant Noodles", "Lee Kum Kee Supreme Soy Sauce", "Nissin Cup Noodles"]
+
+NEXT_DATA = {
+    "props": {"pageProps": {"category": {"name": "Sale", "title": "Weekly Sale"}, "products": [
+        {"id": 1, "name": "Maggi Masala Instant Noodles 9.8 oz", "price": 3.49, "base_price": 4.99,
+         "unit_price": 0.36, "unit": "oz", "brand_name": "Maggi", "category_name": "Noodles",
+         "view_link": "/en/product/Maggi-Masala/1"},
+        {"id": 2, "name": "Lee Kum Kee Supreme Soy Sauce 500 ml", "price": "5.29",
+         "brand": {"name": "Lee Kum Kee"}, "category": ["Pantry", "Sauces"],
+         "view_link": "/en/product/LKK-Soy/2"},
+        {"id": 3, "name": "Amul Ghee Clarified Butter 1 L", "price": 19.99}
+    ]}}
+}
+
+JSON_LD = {
+    "@context": "https://schema.org", "@type": "ItemList",
+    "itemListElement": [
+        {"@type": "ListItem", "position": 1, "item": {
+            "@type": "Product", "name": "Maggi Masala Instant Noodles 9.8 oz",
+            "brand": {"@type": "Brand", "name": "Maggi"}, "category": "Noodles",
+            "url": "https://www.sayweee.com/en/product/Maggi-Masala/1",
+            "offers": {"@type": "Offer", "price": "3.49", "priceCurrency": "USD"}}}
+    ]
+}
+
+def page_with(*scripts):
+    return "<html><head>" + "".join(scripts) + "</head><body><div class='product-card'>" \
+           "<h3>Nissin Cup Noodles Shrimp</h3><span class='price'>$1.29</span></div></body></html>"
+
+def test_next_data():
+    """__NEXT_DATA__ products map to full records"""
+    html = page_with(f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(NEXT_DATA)}</script>')
+    source, products = extract_embedded_products(html, BASE_URL)
+    assert source == '__NEXT_DATA__', source
+    assert len(products) == 3, products
+    maggi, lkk, _ = products
+    assert maggi == {
+        'name': "Maggi Masala Instant Noodles 9.8 oz", 'price': "$3.49", 'unit': "$0.36/oz",
+        'brand': "Maggi", 'category': "Noodles",
+        'link': "https://www.sayweee.com/en/product/Maggi-Masala/1"
+    }, maggi
+    assert lkk['price'] == "$5.29" and lkk['brand'] == "Lee Kum Kee" and lkk['category'] == "Sauces", lkk
+    print("✅ __NEXT_DATA__ products decoded")
+
+def test_window_state_and_json_ld():
+    """window.__INITIAL_STATE__ objects and JSON-LD Product offers are understood"""
+    state = {"catalog": {"items": NEXT_DATA["props"]["pageProps"]["products"][:1]}}
+    html = page_with(f'<script>window.__INITIAL_STATE__ = {json.dumps(state)};var x = 1;</script>')
+    source, products = extract_embedded_products(html, BASE_URL)
+    assert source == 'window state' and len(products) == 1, (source, products)
+
+    html = page_with(f'<script type="application/ld+json">{json.dumps(JSON_LD)}</script>')
+    source, products = extract_embedded_products(html, BASE_URL)
+    assert source == 'json-ld' and len(products) == 1, (source, products)
+    assert products[0]['price'] == "$3.49" and products[0]['brand'] == "Maggi", products
+    print("✅ Window state and JSON-LD products decoded")
+
+def test_parse_product_data():
+    """parse_product_data prefers the blob and falls back to the CSS cascade without one"""
+    scrape_wee.TRACKED_PRODUCTS = TRACKED
+    html = page_with(f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(NEXT_DATA)}</script>')
+    products = scrape_wee.parse_product_data(html, "2025-01-01T00:00:00", BASE_URL)
+    names = [p["Product Name"] for p in products]
+    assert names == ["Maggi Masala Instant Noodles 9.8 oz", "Lee Kum Kee Supreme Soy Sauce 500 ml"], names
+    assert products[0]["Brand"] == "Maggi" and products[0]["Category"] == "Noodles", products[0]
+    assert products[0]["Source"] == "embedded:__NEXT_DATA__", products[0]
+
+    products = scrape_wee.parse_product_data(page_with('<script>{"not": "a blob"}</script>'), "2025-01-01T00:00:00")
+    assert [p["Product Name"] for p in products] == ["Nissin Cup Noodles Shrimp"], products
+    print("✅ parse_product_data uses embedded data first and falls back to selectors")
+
+def test_speed():
+    """Decoding a blob beats walking the DOM for the same products"""
+    cards = [{"name": f"Maggi Masala Instant Noodles {i}", "price": 3.49, "view_link": f"/en/product/{i}"}
+             for i in range(200)]
+    blob_page = page_with(f'<script id="__NEXT_DATA__" type="application/json">{json.dumps({"products": cards})}</script>')
+    dom_page = sample_page()
+
+    start = time.perf_counter()
+    extract_embedded_products(blob_page, BASE_URL)
+    blob_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scrape_wee.parse_product_data(dom_page, "2025-01-01T00:00:00")
+    dom_time = time.perf_counter() - start
+    print(f"⏱️ 200 products: embedded JSON {blob_time * 1000:.2f} ms, DOM {dom_time * 1000:.2f} ms")
+
+def main():
+    """Main test function"""
+    print("🧪 Embedded Data Extraction Test")
+    print("=" * 40)
+
+    test_next_data()
+    test_window_state_and_json_ld()
+    test_parse_product_data()
+    test_speed()
+    print("\n✅ All embedded data checks passed")
+
+if __name__ == "__main__":
+    main()
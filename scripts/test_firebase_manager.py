@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# scripts/test_firebase_manager.py - Check bulk price saves against an in-memory Firestore
+
+import os
+import sys
+import types
+import itertools
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+class Snapshot:
+    def __init__(self, ref):
+        self.reference, self.id = ref, ref.id
+        self.exists = ref.id in ref.collection.docs
+        self.create_time = None
+
+    def to_dict(self):
+        return dict(self.reference.collection.docs.get(self.id, {}))
+
+class DocumentRef:
+    def __init__(self, collection, doc_id):
+        self.collection, self.id = collection, doc_id
+
+    def get(self, transaction=None):
+        return Snapshot(self)
+
+    def set(self, data):
+        self.collection.docs[self.id] = {}
+        self.update(data)
+
+    def update(self, data):
+        doc = self.collection.docs[self.id]
+        for field, value in data.items():
+            # Increment / Minimum / Maximum transforms, real or stand-in, carry .value
+            kind = type(value).__name__
+            if kind == 'Increment':
+                doc[field] = (doc.get(field) or 0) + value.value
+            elif kind in ('Minimum', 'Maximum'):
+                pick = min if kind == 'Minimum' else max
+                doc[field] = value.value if doc.get(field) is None else pick(doc[field], value.value)
+            else:
+                doc[field] = value
+
+    def delete(self):
+        self.collection.docs.pop(self.id, None)
+
+class Collection:
+    ids = itertools.count()
+    queries = []  # filters of every query streamed
+
+    def __init__(self, filters=(), docs=None):
+        self.docs = {} if docs is None else docs
+        self.filters = list(filters)
+
+    def document(self, doc_id=None):
+        return DocumentRef(self, doc_id or f"doc{next(Collection.ids)}")
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+    def where(self, field, op, value):
+        assert op in ('==', 'in')
+        return Collection(self.filters + [(field, value if op == 'in' else [value])], self.docs)
+
+    def stream(self):
+        self.queries.append(self.filters)
+        base = Collection(docs=self.docs)
+        return iter([Snapshot(DocumentRef(base, doc_id)) for doc_id, doc in list(self.docs.items())
+                     if all(doc.get(field) in values for field, values in self.filters)])
+
+class Batch:
+    def __init__(self, db):
+        self.db, self.writes = db, []
+
+    def set(self, ref, data):
+        self.writes.append(lambda: ref.set(data))
+
+    def update(self, ref, data):
+        self.writes.append(lambda: ref.update(data))
+
+    def delete(self, ref):
+        self.writes.append(ref.delete)
+
+    def commit(self):
+        assert len(self.writes) <= 500, "Firestore rejects batches over 500 writes"
+        if self.db.fail_on_commit == len(self.db.batch_sizes) + 1:
+            raise RuntimeError("commit failed")
+        self.db.batch_sizes.append(len(self.writes))
+        for write in self.writes:
+            write()
+
+class FakeFirestore:
+    """Just enough of the Firestore client for FirebaseManager's bulk paths"""
+
+    def __init__(self):
+        self.collections = {}
+        self.batch_sizes = []
+        self.fail_on_commit = None
+
+    def collection(self, name):
+        return self.collections.setdefault(name, Collection())
+
+    def batch(self):
+        return Batch(self)
+
+def install_fake_firestore():
+    """Point config.firebase_config at an in-memory database; stand in for the SDK if it is not installed"""
+    try:
+        import firebase_admin.firestore
+    except ImportError:
+        firestore = types.SimpleNamespace(
+            Increment=type('Increment', (), {'__init__': lambda self, value: setattr(self, 'value', value)}),
+            Minimum=type('Minimum', (), {'__init__': lambda self, value: setattr(self, 'value', value)}),
+            Maximum=type('Maximum', (), {'__init__': lambda self, value: setattr(self, 'value', value)}),
+            transactional=lambda function: function,
+            Query=types.SimpleNamespace(ASCENDING='ASCENDING', DESCENDING='DESCENDING')
+        )
+        sys.modules['firebase_admin'] = types.ModuleType('firebase_admin')
+        sys.modules['firebase_admin'].firestore = firestore
+    try:
+        import google.api_core.exceptions
+    except ImportError:
+        exceptions = types.ModuleType('google.api_core.exceptions')
+        exceptions.FailedPrecondition = type('FailedPrecondition', (Exception,), {})
+        sys.modules['google.api_core.exceptions'] = exceptions
+    config = types.ModuleType('config.firebase_config')
+    config.db = FakeFirestore()
+    sys.modules['config.firebase_config'] = config
+    return config.db
+
+def run(manager, names, price, scraped_at, drops=(), check_drops=True):
+    return manager.save_prices_bulk([
+        (name, {'price': price - 1.0 if i in drops else price, 'price_str': f"${price:.2f}", 'scraped_at': scraped_at})
+        for i, name in enumerate(names)
+    ], check_drops)
+
+def main():
+    """Main test function"""
+    print("🧪 Firebase Manager Test")
+    print("=" * 40)
+
+    db = install_fake_firestore()
+    from firebase_manager import FirebaseManager
+    manager = FirebaseManager()
+    names = [f"Laxmi Toor Dal {i} lb" for i in range(1200)]
+    start = datetime(2025, 8, 1, 9)
+
+    # New products: one product document and one price record each, 250 per batch
+    saved, alerts = run(manager, names, 5.0, start)
+    assert len(saved) == 1200 and alerts == []
+    assert db.batch_sizes == [500, 500, 500, 500, 400], db.batch_sizes
+    print(f"✅ 1200 new products saved in {len(db.batch_sizes)} batches of at most 500 writes")
+
+    # A second run where three prices dropped; the product names are other spellings of the same keys
+    del db.batch_sizes[:]
+    saved, alerts = run(manager, [name.upper() for name in names], 5.0, start + timedelta(days=1), drops=(0, 1, 2))
+    assert len(saved) == 1200 and len(db.collection('products').docs) == 1200
+    assert sorted(alert['product_name'] for alert in alerts) == sorted(name.upper() for name in names[:3])
+    assert all(alert['old_price'] == 5.0 and alert['new_price'] == 4.0 for alert in alerts)
+    assert len(db.collection('alerts').docs) == 3 and len(db.collection('priceHistory').docs) == 2400
+    print("✅ Price drops found against the cached latest prices and saved with their alerts")
+
+    # Aggregates on the product documents follow the records
+    product = next(doc for doc in db.collection('products').docs.values() if doc['productName'] == names[0])
+    assert product['observationCount'] == 2
+    assert product['minPrice'] == 4.0 and product['maxPrice'] == 5.0
+    assert product['latestPrice'] == 4.0 and product['latestScrapedAt'] == start + timedelta(days=1)
+    print("✅ Count, min, max and latest price kept on the product document")
+
+    # A failed batch keeps the batches before it, and only those are reported
+    db.fail_on_commit = 2
+    del db.batch_sizes[:]
+    saved, alerts = run(manager, names[:600], 5.0, start + timedelta(days=2), drops=(10, 599))
+    # 248 products of 2 writes and one of 3 (its alert) fill the first batch
+    assert db.batch_sizes == [499] and len(saved) == 249, (db.batch_sizes, len(saved))
+    assert [alert['product_name'] for alert in alerts] == [names[10]]
+    assert len(db.collection('priceHistory').docs) == 2400 + 249
+    print("✅ A failing batch reports only the records and alerts already committed")
+
+    # The product whose writes fill a batch to exactly 500 is reported with that batch
+    db.fail_on_commit = None
+    del db.batch_sizes[:]
+    exact = [f"Aashirvaad Atta {i} lb" for i in range(250)]
+    saved, alerts = run(manager, exact, 5.0, start)
+    assert db.batch_sizes == [500] and len(saved) == 250, (db.batch_sizes, len(saved))
+    print("✅ A batch filled to exactly 500 writes reports all of its products")
+
+    # Replays store prices without checking for drops
+    alert_count = len(db.collection('alerts').docs)
+    saved, alerts = run(manager, exact, 5.0, start + timedelta(days=1), drops=(0,), check_drops=False)
+    assert len(saved) == 250 and alerts == [] and len(db.collection('alerts').docs) == alert_count
+    print("✅ Saves without drop checks create no alerts")
+
+    # Products saved before the aggregates existed get their latest price from history, 30 per query
+    legacy = [f"Deep Frozen Paratha {i} ct" for i in range(40)]
+    for i, name in enumerate(legacy):
+        db.collection('products').document(f"legacy{i}").set({'productName': name})
+        for day, price in ((0, 6.0), (1, 5.0)):
+            db.collection('priceHistory').add({'productId': f"legacy{i}", 'price': price, 'priceStr': f"${price:.2f}",
+                                               'scrapedAt': start + timedelta(days=day)})
+    manager.invalidate()
+    del Collection.queries[:]
+    saved, alerts = run(manager, legacy, 5.0, start + timedelta(days=2), drops=(0,))
+    assert len(saved) == 40 and [(alert['old_price'], alert['new_price']) for alert in alerts] == [(5.0, 4.0)]
+    assert len(Collection.queries) == 3, Collection.queries  # products, then two chunks of ids
+    print("✅ Latest prices of products without aggregates read in 2 batched history queries")
+
+    print("\n✅ All Firebase manager checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# scripts/test_parser_backends.py - Check every parser backend extracts the same products
+
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from extraction_engine import CONTAINER_SELECTORS
+from parser_backends import available_backends, get_backend
+from benchmark_extraction import sample_page, load_recorded_pages
+from snapshot_archive import SNAPSHOT_DIR
+import scrape_wee
+
+FIXED_TIMESTAMP = "2025-01-01T00:00:00"
+
+# Markup the backends could disagree on: comments, scripts, odd whitespace, entities
+EDGE_CASE_PAGE = """<html><head><script>var price = "$0.01";</script></head><body>
+<div data-testid="wid-product-card-container" class="product-card   wrapper">
+  <a href="/en/product/1"><!-- $9.99 --><img src="/1.jpg"></a>
+  <div data-role="product-name">  Maggi   Masala Noodles &amp; Spice 9.8 oz </div>
+  <div data-testid="wid-product-card-price"><span>$3.49</span><style>.x{}</style><del>$4.99</del></div>
+  <div data-role="product-unit-price">$0.36/oz</div>
+</div>
+<div data-testid="wid-product-card-container" class="product-card">
+  <h3>Lee Kum Kee Soy Sauce</h3><p class="price-tag">Now <b>$5.29</b> each</p>
+  <a href="/en/product/2">View</a>
+</div>
+<div data-testid="wid-product-card-container"><span>Only text about noodles here, no price</span></div>
+</body></html>"""
+
+def card_fields(backend, html, url):
+    """Extract every card on a page, as parse_product_data would find them"""
+    document = backend.parse(html)
+    extractor = backend.extractor_class()
+    for selector in CONTAINER_SELECTORS:
+        items = backend.select(document, selector)
+        if items:
+            return selector, [extractor.extract(item, url) for item in items]
+    return None, []
+
+def product_list(backend_name, html):
+    """Run the real parser with the given backend"""
+    scrape_wee.get_backend = lambda: get_backend(backend_name)
+    return scrape_wee.parse_product_data(html, FIXED_TIMESTAMP)
+
+def check_backends_agree(pages):
+    """Every backend must produce the same cards and the same products"""
+    names = available_backends()
+    print(f"🧪 Backends: {', '.join(names)}")
+    failures = 0
+    timings = {name: 0.0 for name in names}
+
+    for url, html in pages:
+        reference = None
+        for name in names:
+            backend = get_backend(name)
+            start = time.perf_counter()
+            result = card_fields(backend, html, url)
+            timings[name] += time.perf_counter() - start
+            if reference is None:
+                reference = (name, result)
+            elif result != reference[1]:
+                failures += 1
+                print(f"❌ {url}: cards from {name} differ from {reference[0]}")
+
+        products = {name: product_list(name, html) for name in names}
+        first = products[names[0]]
+        for name in names[1:]:
+            if products[name] != first:
+                failures += 1
+                print(f"❌ {url}: products from {name} differ from {names[0]}")
+
+        print(f"✅ {url[:60]}: {len(reference[1][1])} cards, {len(first)} products")
+
+    print("\n⏱️ Card extraction time per backend:")
+    for name, elapsed in timings.items():
+        print(f"  {name:<12} {elapsed * 1000:.2f} ms")
+    return failures == 0
+
+def main():
+    """Main test function"""
+    snapshot_dir = sys.argv[1] if len(sys.argv) > 1 else SNAPSHOT_DIR
+
+    print("🧪 Parser Backend Consistency Test")
+    print("=" * 40)
+
+    # Match the sample pages' products regardless of the local .env
+    scrape_wee.TRACKED_PRODUCTS = scrape_wee.TRACKED_PRODUCTS or [
+        "Maggi Masala Instant Noodles", "Lee Kum Kee Supreme Soy Sauce", "Nissin Cup Noodles"
+    ]
+
+    pages = load_recorded_pages(snapshot_dir)
+    print(f"📄 {len(pages)} recorded pages from {snapshot_dir}")
+    pages += [("sample://sale", sample_page()), ("sample://edge-cases", EDGE_CASE_PAGE)]
+
+    success = check_backends_agree(pages)
+    print("\n✅ All backends agree" if success else "\n❌ Backends disagree")
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# scripts/test_price_log.py - Check the append-only price history log and its compaction
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from price_log import PriceHistoryLog, log_path
+
+def entry(price):
+    return {'name': 'x', 'price': price, 'timestamp': '2025-08-07T15:29:12', 'price_str': f"${price:.2f}"}
+
+def main():
+    """Main test function"""
+    print("🧪 Price History Log Test")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'price_history.json')
+        with open(snapshot, 'w') as f:
+            json.dump({f"product {i}": entry(5.0) for i in range(20000)}, f, indent=2)
+        snapshot_size = os.path.getsize(snapshot)
+
+        # A run that sees every product but where only 3 prices changed
+        start = time.perf_counter()
+        history = PriceHistoryLog(snapshot, compact_lines=10)
+        for i in range(20000):
+            history.record(f"product {i}", entry(4.0 if i < 3 else 5.0))
+        history.close()
+        elapsed = time.perf_counter() - start
+        assert history.appended == 3
+        assert os.path.getsize(snapshot) == snapshot_size, "snapshot must not be rewritten"
+        print(f"✅ 3 changes out of 20000 products appended {os.path.getsize(log_path(snapshot))} bytes "
+              f"(snapshot is {snapshot_size} bytes) in {elapsed:.2f} s")
+
+        # Reopening replays the log, including deletions and a torn last line
+        history = PriceHistoryLog(snapshot, compact_lines=10)
+        history.delete("product 5")
+        history.close()
+        with open(log_path(snapshot), 'a') as f:
+            f.write('{"key": "product 6", "val')
+        history = PriceHistoryLog(snapshot, compact_lines=10)
+        assert history.get("product 0")['price'] == 4.0 and history.get("product 3")['price'] == 5.0
+        assert "product 5" not in history and history.get("product 6")['price'] == 5.0
+        history.record("product 7", entry(2.0))
+        history.close()
+        history = PriceHistoryLog(snapshot, compact_lines=10)
+        assert history.get("product 7")['price'] == 2.0
+        print("✅ Log replays changes and deletions, ignoring a torn line")
+
+        # Enough changes trigger compaction into the snapshot
+        for i in range(10, 18):
+            history.record(f"product {i}", entry(3.0))
+        history.close()
+        assert not os.path.exists(log_path(snapshot))
+        with open(snapshot) as f:
+            compacted = json.load(f)
+        assert compacted["product 17"]['price'] == 3.0 and "product 5" not in compacted
+        assert PriceHistoryLog(snapshot).entries == compacted
+        print("✅ Log compacted into a new snapshot")
+
+    print("\n✅ All price history log checks passed")
+
+if __name__ == "__main__":
+    main()
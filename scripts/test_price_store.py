@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# scripts/test_price_store.py - Check the date-partitioned Parquet price store
+
+import os
+import sys
+import tempfile
+from datetime import datetime, date, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from price_store import PARQUET_AVAILABLE, write_partitions, read_prices, partition_dir, partition_files
+
+def product(name, price, timestamp):
+    return {'Product Name': name, 'Price': price, 'Unit': '', 'Brand': 'Laxmi', 'Category': '',
+            'Timestamp': timestamp.isoformat(), 'Source': '', 'Match Score': 0.9}
+
+def main():
+    """Main test function"""
+    print("🧪 Price Store Test")
+    print("=" * 40)
+
+    if not PARQUET_AVAILABLE:
+        print("⚠️ pyarrow not installed, skipping the Parquet store checks")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'prices')
+        today = datetime.combine(date.today(), datetime.min.time()).replace(hour=9)
+
+        # Ten days of one product, written by two runs
+        products = [product("Laxmi Toor Dal 4 lb", f"${5 + day / 100:.2f}", today - timedelta(days=day))
+                    for day in range(10)]
+        written = write_partitions(products[:5], root)
+        written += write_partitions(products[5:], root)
+        assert len(written) == 10, written
+        print(f"✅ {len(products)} rows written to {len(written)} daily partitions")
+
+        # Round trip: the last 3 days come back with their values and types
+        df = read_prices(days=3, root=root)
+        assert len(df) == 3, df
+        assert sorted(df['Price']) == ["$5.00", "$5.01", "$5.02"]
+        assert sorted(df['Price Value']) == [5.0, 5.01, 5.02]
+        assert set(df['Match Score']) == {0.9} and df['Unit Price'].isna().all()
+        assert df['Timestamp'].min().date() == date.today() - timedelta(days=2)
+        print("✅ read_prices(days=3) returns the last 3 days with their types")
+
+        # Partitions outside the range are skipped without being opened
+        with open(os.path.join(partition_dir(date.today() - timedelta(days=8), root), 'part-broken.parquet'), 'w') as f:
+            f.write("not parquet")
+        assert len(partition_files(date.today() - timedelta(days=2), root=root)) == 3
+        assert len(read_prices(days=3, root=root)) == 3
+        assert len(partition_files(root=root)) == 11
+        print("✅ Reads of recent days never open older partitions")
+
+    print("\n✅ All price store checks passed")
+
+if __name__ == "__main__":
+    main()
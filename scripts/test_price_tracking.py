@@ -12,6 +12,7 @@ from scrape_wee import (
     TRACKED_PRODUCTS, extract_price_value, load_price_history, 
     save_price_history, send_price_alert, check_price_drops
 )
+from price_parsing import parse_price_series
 
 def simulate_price_data():
     """Create sample price data to test the tracking system"""
@@ -100,14 +101,18 @@ def test_price_extraction():
         "¥15.99",
         "Price: $8.25",
         "$1,234.56",
+        "$3.99 - $5.99",
         "N/A",
         "",
         "Free"
     ]
     
-    for price_str in test_prices:
+    # The vectorized parser used by bulk paths must agree with the per-record one
+    vectorized = parse_price_series(test_prices)
+    for price_str, bulk in zip(test_prices, vectorized):
         extracted = extract_price_value(price_str)
-        print(f"'{price_str}' -> {extracted}")
+        agree = (extracted is None and bulk != bulk) or extracted == bulk
+        print(f"'{price_str}' -> {extracted} {'✅' if agree else f'❌ (bulk: {bulk})'}")
 
 def main():
     """Main test function"""
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# scripts/test_product_matching.py - Check cards are assigned to the right tracked product
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+import product_matcher
+from product_matcher import ProductMatcher, KeywordAutomaton
+
+TRACKED = [
+    "Indian Eggplant 2 lb", "Indian okra 0.9-1.1 lb", "Red onions 2 lb bag", "Roma tomatoes 2 lb bag",
+    "Fresh ginger 0.95-1.05 lb", "Spinach 1 bunch", "Green bell pepper", "Carrots 2 lb bag",
+    "Cilantro 1 bunch", "Curry leaves 0.25 oz", "Bananas 2.6-3 lb", "Maggi Masala instant noodles 9.8 oz",
+    "Deep Paneer Paratha Frozen 4 pcs 13 oz", "India Gate Basmati Rice", "Laxmi Idli Rice 20 lb",
+    "Regal Sona Masoori Rice 20 lb", "Laxmi Ponni Boiled Rice 20 lb", "Laxmi Besan gram flour 2 lb",
+    "Laxmi Toor Dal Split Pigeon Peas 4 lb", "Laxmi Moong Dal Skinned mung beans 4 lb", "Laxmi Chana Dal 4 lb",
+    "Laxmi Yellow Split Peas 4 lb", "Nanak Plain Paneer 400 g", "Lay's Magic Masala chips 1.82 oz",
+    "Ching's Schezwan chutney", "Lee Kum Kee Supreme Soy Sauce 500 ml", "TSF Barramundi Whole Cleaned 500-550 g"
+]
+
+# Card name -> tracked entry it must be assigned to
+MATCHES = {
+    "Maggi Masala Instant Noodles 9.8 oz": "Maggi Masala instant noodles 9.8 oz",
+    "MAGGI 2-Minute Masala Noodles 9.8 oz": "Maggi Masala instant noodles 9.8 oz",
+    "Laxmi Toor Dal 4 lb": "Laxmi Toor Dal Split Pigeon Peas 4 lb",
+    "Laxmi Besan Gram Flour 2 lb": "Laxmi Besan gram flour 2 lb",
+    "Deep Paneer Paratha 4 pcs 13 oz": "Deep Paneer Paratha Frozen 4 pcs 13 oz",
+    "India Gate Basmati Rice Classic 10 lb": "India Gate Basmati Rice",
+    "Lee Kum Kee Premium Soy Sauce 500 ml": "Lee Kum Kee Supreme Soy Sauce 500 ml",
+    "Fresh Ginger 1 lb": "Fresh ginger 0.95-1.05 lb",
+    "Lay's India's Magic Masala Potato Chips 1.82 oz": "Lay's Magic Masala chips 1.82 oz",
+    "Regal Sona Masoori Rice 20 lb": "Regal Sona Masoori Rice 20 lb",
+    "Nanak Paneer 400 g": "Nanak Plain Paneer 400 g",
+    "Ching's Secret Schezwan Chutney 250 g": "Ching's Schezwan chutney",
+    "Roma Tomato 2 lb": "Roma tomatoes 2 lb bag",
+    "TSF Barramundi Whole 500 g": "TSF Barramundi Whole Cleaned 500-550 g"
+}
+
+# Cards sharing a generic word with a tracked product that must not be tracked
+NON_MATCHES = [
+    "Kokuho Rose Rice 15 lb", "Swad Toor Dal 4 lb", "Swad Basmati Rice 10 lb", "Laxmi Basmati Rice 10 lb",
+    "Laxmi Masoor Dal 4 lb", "Laxmi Rice Flour 2 lb", "Laxmi Sugar 4 lb", "Kikkoman Soy Sauce 10 oz",
+    "Shin Ramyun Noodles 4.2 oz", "Chinese Eggplant 1 lb", "Red Bell Pepper 1 pc", "Thai Basil 1 bunch",
+    "Lay's Classic Potato Chips 8 oz", "Organic Baby Spinach 5 oz"
+]
+
+def test_keyword_automaton():
+    """Every keyword inside a text is found, including ones inside longer hits"""
+    automaton = KeywordAutomaton(['lee kum', 'lee', 'dil', 'vadilal', 'chili'])
+    assert automaton.find("lee kum kee") == {'lee kum', 'lee'}
+    assert automaton.find("vadilal paneer") == {'vadilal', 'dil'}
+    assert automaton.find("green chilies") == {'chili'}
+    assert automaton.find("tofu") == set()
+    print("✅ Keyword automaton finds overlapping keywords")
+
+def check_assignment(matcher):
+    """Cards go to their single best tracked entry; generic-word lookalikes are dropped"""
+    failures = 0
+    for (name, expected), (entry, score) in zip(MATCHES.items(), matcher.match_batch(list(MATCHES))):
+        if entry != expected:
+            failures += 1
+            print(f"❌ {name!r} -> {entry!r} ({score:.2f}), expected {expected!r}")
+    for name, (entry, score) in zip(NON_MATCHES, matcher.match_batch(NON_MATCHES)):
+        if entry is not None:
+            failures += 1
+            print(f"❌ {name!r} should not be tracked, got {entry!r} ({score:.2f})")
+    assert matcher.match("Laxmi Chana Dal 4 lb") == ("Laxmi Chana Dal 4 lb", 1.0)
+    assert matcher.match("") == (None, 0.0)
+    if not failures:
+        print(f"✅ {len(MATCHES)} cards assigned correctly, {len(NON_MATCHES)} lookalikes rejected")
+    return failures == 0
+
+def check_dense_fallback(matcher):
+    """The NumPy path scores exactly like the scipy path"""
+    if not product_matcher.SCIPY_AVAILABLE:
+        print("⚠️ scipy not installed, only the NumPy path was tested")
+        return True
+    names = list(MATCHES) + NON_MATCHES
+    expected = matcher.match_batch(names)
+    product_matcher.SCIPY_AVAILABLE = False
+    try:
+        dense = ProductMatcher(TRACKED).match_batch(names)
+    finally:
+        product_matcher.SCIPY_AVAILABLE = True
+    same = all(a[0] == b[0] and abs(a[1] - b[1]) < 1e-6 for a, b in zip(expected, dense))
+    print("✅ NumPy fallback agrees with scipy" if same else "❌ NumPy fallback disagrees with scipy")
+    return same
+
+def main():
+    """Main test function"""
+    print("🧪 Product Matching Test")
+    print("=" * 40)
+
+    matcher = ProductMatcher(TRACKED, threshold=0.6)
+    test_keyword_automaton()
+    success = check_assignment(matcher) and check_dense_fallback(matcher)
+    print("\n✅ All matching checks passed" if success else "\n❌ Matching checks failed")
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
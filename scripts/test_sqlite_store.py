@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# scripts/test_sqlite_store.py - Check the SQLite store behaves like FirebaseManager
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from sqlite_store import SQLiteManager
+
+def price_data(price, scraped_at):
+    return {'price': price, 'price_str': f"${price:.2f}", 'unit_price': None, 'scraped_at': scraped_at,
+            'brand': 'Maggi', 'category': 'Noodles', 'unit': ''}
+
+def main():
+    """Main test function"""
+    print("🧪 SQLite Price Store Test")
+    print("=" * 40)
+
+    store = SQLiteManager(':memory:')
+    now = datetime.now()
+
+    # Spelling variants land on one product
+    first = store.save_product({'name': "Maggi Masala Noodles, 9.8 oz"})
+    assert store.save_product({'name': "Maggi Masala Noodles - 9.8oz"}) == first
+    assert len(store.get_tracked_products()) == 1
+    print("✅ Name variants share one product")
+
+    # History out of order: latest is by scrape time, not insert order
+    assert store.save_price("Maggi Masala Noodles 9.8 oz", price_data(4.99, now - timedelta(days=2))) is None
+    assert store.save_price("Maggi Masala Noodles 9.8 oz", price_data(5.49, now - timedelta(days=40))) is None
+    assert store.get_latest_price(first)['price'] == 4.99
+    alert = store.save_price("Maggi Masala Noodles 9.8 oz", price_data(3.99, now))
+    assert alert and alert['old_price'] == 4.99 and alert['new_price'] == 3.99
+    assert store.save_price("Maggi Masala Noodles 9.8 oz", price_data(3.99, now + timedelta(hours=1))) is None
+    print("✅ Price drop detected against the latest earlier price")
+
+    trends = store.get_price_trends(first, days=30)
+    # Stored records are expanded into daily observations up to the last one
+    assert [t['price'] for t in trends[:5]] == [3.99, 3.99, 4.99, 4.99, 5.49]
+    assert len(trends) == 30 and trends[0]['scraped_at'] == now + timedelta(hours=1)
+    assert isinstance(trends[0]['scraped_at'], datetime)
+    savings = store.get_biggest_savings()
+    assert len(savings) == 1 and savings[0]['product_name'] == "Maggi Masala Noodles, 9.8 oz"
+    stats = store.get_product_statistics()
+    assert (stats['total_products'], stats['total_price_records'], stats['total_alerts']) == (1, 4, 1)
+    assert stats['min_price'] == 3.99 and stats['max_price'] == 5.49
+    print("✅ Trends, savings and statistics match the Firebase shapes")
+
+    # A run's saves report which records were written; a failed write raises no alert
+    records = [("Laxmi Besan Gram Flour 2 lb", price_data(5.49, now)),
+               ("Maggi Masala Noodles 9.8 oz", price_data(2.99, {'not': 'a time'}))]
+    saved, alerts = store.save_prices(records)
+    assert saved == records[:1] and alerts == []
+    saved, alerts = store.save_prices([("Maggi Masala Noodles 9.8 oz", price_data(2.99, now + timedelta(hours=2)))])
+    assert len(saved) == 1 and [(a['product_name'], a['old_price']) for a in alerts] == [("Maggi Masala Noodles 9.8 oz", 3.99)]
+    print("✅ save_prices returns only the records written and their alerts")
+
+    # Latest-price and trend lookups must be index range scans, not table scans
+    plan = ' '.join(row[3] for row in store.db.execute(
+        'EXPLAIN QUERY PLAN SELECT price FROM price_history WHERE product_id = ? ORDER BY scraped_at DESC LIMIT 1', (first,)))
+    assert 'idx_price_history_product_scraped' in plan, plan
+    print(f"✅ Latest-price query plan: {plan}")
+
+    store.close()
+    print("\n✅ All SQLite store checks passed")
+
+if __name__ == "__main__":
+    main()
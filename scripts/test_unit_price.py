@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# scripts/test_unit_price.py - Check package sizes and normalized unit prices
+
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(__file__))
+
+from unit_price import compute_unit_prices
+
+# (name, unit string, price) -> (expected price per basis unit, basis)
+CASES = [
+    (("Laxmi Toor Dal Split Pigeon Peas 4 lb", "", 8.0), (2.0, 'lb')),
+    (("Indian okra 0.9-1.1 lb", "", 2.5), (2.5, 'lb')),
+    (("Maggi Masala instant noodles 9.8 oz", "", 4.9), (8.0, 'lb')),
+    (("Nanak Plain Paneer 400 g", "", 6.0), (6.8039, 'lb')),
+    (("Deep Paneer Paratha Frozen 4 pcs 13 oz", "", 3.25), (4.0, 'lb')),
+    (("Lee Kum Kee Supreme Soy Sauce 500 ml", "", 5.0), (0.2957, 'fl oz')),
+    (("Sparkling Water 12 x 12 fl oz", "", 7.2), (0.05, 'fl oz')),
+    (("Whole Milk 1 gal", "", 6.4), (0.05, 'fl oz')),
+    (("Amul Lassi 1 quart", "", 3.2), (0.1, 'fl oz')),
+    (("Eggs 12 ct", "", 4.2), (0.35, 'ct')),
+    (("Shin Ramyun Noodles", "4.2 oz", 1.05), (4.0, 'lb')),
+    (("Fresh ginger", "$0.36/oz", 1.0), (5.76, 'lb')),
+    (("Cilantro 1 bunch", "$0.99/bunch", 0.99), (None, None)),
+    (("Green bell pepper", "", None), (None, None)),
+]
+
+def main():
+    """Main test function"""
+    print("🧪 Unit Price Test")
+    print("=" * 40)
+
+    names, units, prices = zip(*(inputs for inputs, _ in CASES))
+    result = compute_unit_prices(names, units, prices)
+    failures = 0
+    for (inputs, (expected, basis)), (unit_price, found_basis) in zip(CASES, result.itertuples(index=False)):
+        if expected is None:
+            ok = unit_price != unit_price and found_basis is None  # NaN
+        else:
+            ok = abs(unit_price - expected) < 1e-3 and found_basis == basis
+        if not ok:
+            failures += 1
+            print(f"❌ {inputs[0]!r}: got {unit_price} per {found_basis}, expected {expected} per {basis}")
+
+    # Bulk timing: a large batch is normalized in one call
+    n = 100000
+    start = time.perf_counter()
+    compute_unit_prices([names[i % len(names)] for i in range(n)], [units[i % len(units)] for i in range(n)],
+                        [prices[i % len(prices)] for i in range(n)])
+    print(f"⏱️ {n} products normalized in {time.perf_counter() - start:.2f} s")
+
+    if failures:
+        print("\n❌ Unit price checks failed")
+        sys.exit(1)
+    print(f"✅ {len(CASES)} products normalized correctly")
+    print("\n✅ All unit price checks passed")
+
+if __name__ == "__main__":
+    main()
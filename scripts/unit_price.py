@@ -0,0 +1,107 @@
+# scripts/unit_price.py
+
+import numpy as np
+import pandas as pd
+from canonical import UNIT_ALIASES, UNITS, NUMBER
+
+UNIT_DIMENSIONS = {
+    'lb': 'weight', 'oz': 'weight', 'kg': 'weight', 'g': 'weight',
+    'fl oz': 'volume', 'ml': 'volume', 'l': 'volume', 'gal': 'volume', 'qt': 'volume', 'ct': 'count'
+}
+# Size of one unit in its dimension's basis unit
+UNIT_SIZES = {
+    'lb': 1.0, 'oz': 1 / 16, 'kg': 2.20462262, 'g': 0.00220462262,
+    'fl oz': 1.0, 'ml': 0.0338140227, 'l': 33.8140227, 'gal': 128.0, 'qt': 32.0, 'ct': 1.0
+}
+# Unit every price is normalized to, per dimension
+BASIS = {'weight': 'lb', 'volume': 'fl oz', 'count': 'ct'}
+# A weight or volume describes the package better than a piece count ("4 pcs 13 oz")
+DIMENSION_PRIORITY = {'count': 0, 'weight': 1, 'volume': 1}
+
+UNIT_GROUPS = '|'.join(f'(?P<u{i}>{UNIT_ALIASES[unit]})' for i, unit in enumerate(UNITS))
+
+# Package size in a name, with an optional multipack count: "12 x 330 ml", "0.9-1.1 lb"
+PACKAGE_PATTERN = (
+    rf'(?i)(?<![\w.])(?:(?P<packs>\d+)\s*[x×]\s*)?(?P<low>{NUMBER})'
+    rf'(?:\s*(?:-|–|to)\s*(?P<high>{NUMBER}))?\s*(?:{UNIT_GROUPS})(?![a-z])'
+)
+# A displayed unit price: "$0.36/oz", "$5.76 / lb"
+DISPLAYED_PATTERN = rf'(?i)(?P<price>{NUMBER})\s*/\s*(?:1\s*)?(?:{UNIT_GROUPS})(?![a-z])'
+
+def _numbers(series):
+    return pd.to_numeric(series.str.replace(',', '', regex=False), errors='coerce')
+
+def _matched_units(matches):
+    """Canonical unit of every extracted match, from whichever unit group matched"""
+    groups = matches[[f'u{i}' for i in range(len(UNITS))]].notna().to_numpy()
+    units = np.array(UNITS, dtype=object)[groups.argmax(axis=1)]
+    return pd.Series(units, index=matches.index)
+
+def package_sizes(texts):
+    """Package size of every text, as a DataFrame of quantity (in basis units) and basis
+
+    Ranges count at their midpoint and multipacks are multiplied out.
+    When a text has several sizes, a weight or volume wins over a piece
+    count, then the last one wins. Texts without a size get NaN / None.
+    """
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+    result = pd.DataFrame({'quantity': np.nan, 'basis': None}, index=texts.index)
+    matches = texts.str.extractall(PACKAGE_PATTERN)
+    if matches.empty:
+        return result
+
+    units = _matched_units(matches)
+    dimensions = units.map(UNIT_DIMENSIONS)
+    low = _numbers(matches['low'])
+    high = _numbers(matches['high']).fillna(low)
+    packs = _numbers(matches['packs']).fillna(1)
+    sizes = pd.DataFrame({
+        'quantity': (low + high) / 2 * packs * units.map(UNIT_SIZES),
+        'basis': dimensions.map(BASIS),
+        'priority': dimensions.map(DIMENSION_PRIORITY)
+    })
+    sizes = sizes[sizes['quantity'] > 0]
+    best = sizes.sort_values('priority', kind='stable').groupby(level=0).last()
+    result.loc[best.index, ['quantity', 'basis']] = best[['quantity', 'basis']].to_numpy()
+    result['quantity'] = result['quantity'].astype(float)
+    return result
+
+def displayed_unit_prices(texts):
+    """Unit prices shown on the page ("$0.36/oz"), converted to the basis unit"""
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+    result = pd.DataFrame({'unit_price': np.nan, 'basis': None}, index=texts.index)
+    matches = texts.str.extract(DISPLAYED_PATTERN)
+    found = matches['price'].notna()
+    if not found.any():
+        return result
+    matches = matches[found]
+    units = _matched_units(matches)
+    result.loc[matches.index, 'unit_price'] = _numbers(matches['price']) / units.map(UNIT_SIZES)
+    result.loc[matches.index, 'basis'] = units.map(UNIT_DIMENSIONS).map(BASIS)
+    result['unit_price'] = result['unit_price'].astype(float)
+    return result
+
+def compute_unit_prices(names, units, prices):
+    """Normalized price per lb / fl oz / ct for a whole batch of products
+
+    The package size is read from the product name, then from the unit
+    string; products without a size fall back to a unit price displayed
+    on the page. Returns a DataFrame of unit_price (rounded to 4 decimals)
+    and basis, aligned with the inputs.
+    """
+    names = pd.Series(names, dtype=object).reset_index(drop=True)
+    units = pd.Series(units, dtype=object).reset_index(drop=True)
+    prices = pd.to_numeric(pd.Series(prices, dtype=object).reset_index(drop=True), errors='coerce')
+
+    sizes = package_sizes(names)
+    missing = sizes['quantity'].isna()
+    if missing.any():
+        sizes.loc[missing] = package_sizes(units[missing]).to_numpy()
+    result = pd.DataFrame({'unit_price': prices / sizes['quantity'].astype(float), 'basis': sizes['basis']})
+
+    missing = result['unit_price'].isna()
+    if missing.any():
+        result.loc[missing] = displayed_unit_prices(units[missing]).to_numpy()
+    result['unit_price'] = result['unit_price'].astype(float).round(4)
+    result.loc[result['unit_price'].isna(), 'basis'] = None
+    return result